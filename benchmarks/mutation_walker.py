@@ -0,0 +1,54 @@
+"""
+Benchmark of mutant enumeration (walking AST with all operators).
+
+Only mutants are generated, no tests are run. MutPy is imported from the
+current directory, so run it from the root of two checkouts (e.g. a git
+worktree of an older commit) to compare them:
+
+    $ python benchmarks/mutation_walker.py example/simple.py
+    $ python benchmarks/mutation_walker.py example/simple.py --repeat 230
+    $ cd ../mutpy-old && python ../mutpy/benchmarks/mutation_walker.py example/simple.py --repeat 230
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+from mutpy import controller, operators, utils  # noqa: E402
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Measure time of generating all mutants of a module.")
+    parser.add_argument("source", help="Python file to mutate")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="concatenate source N times to get a bigger module (default: 1)")
+    parser.add_argument("--rounds", type=int, default=3, help="report the best of N rounds (default: 3)")
+    return parser
+
+
+def enumerate_mutants(source):
+    operators_list = utils.sort_operators(operators.standard_operators | operators.experimental_operators)
+    mutator = controller.FirstOrderMutator(operators_list)
+    target_ast = utils.create_ast(source)
+    start = time.perf_counter()
+    mutants = sum(1 for _ in mutator.mutate(target_ast))
+    return mutants, time.perf_counter() - start
+
+
+def main(args=None):
+    cfg = build_parser().parse_args(args)
+    with open(cfg.source) as source_file:
+        source = source_file.read()
+    source = '\n'.join([source] * cfg.repeat)
+    results = [enumerate_mutants(source) for _ in range(cfg.rounds)]
+    mutants = results[0][0]
+    best = min(duration for _, duration in results)
+    print("{} lines, {} mutants: {:.2f} s ({:.0f} mutants/s, Python {})".format(
+        source.count('\n') + 1, mutants, best, mutants / best, sys.version.split()[0],
+    ))
+
+
+if __name__ == '__main__':
+    main()
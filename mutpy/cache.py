@@ -0,0 +1,108 @@
+import ast
+import hashlib
+import json
+import os
+
+from mutpy import codegen
+from mutpy.test_runners.base import SerializableMutationTestResult
+
+SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+class MutationCache:
+    """
+    On-disk cache of killed and survived mutants.
+
+    Entries are keyed by a hash of the mutated function source, the mutation
+    and the covering tests (see `get_mutant_key`), so an entry is replayed only
+    if none of them changed. Incompetent and timed out mutants are always
+    executed again. Entries of earlier runs are kept, so that modules not
+    mutated by the last run (e.g. skipped by `--since`) are replayed later.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.entries = {}
+        if os.path.exists(file_name):
+            with open(file_name) as cache_file:
+                self.entries = json.load(cache_file)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        result = SerializableMutationTestResult(
+            is_incompetent=False,
+            is_survived=entry['status'] == 'survived',
+            killer=entry['killer'],
+            exception_traceback=entry['exception_traceback'],
+            exception=None,
+            tests_run=entry['tests_run'],
+        )
+        return result, entry['time']
+
+    def set(self, key, result, duration):
+        if not result or result.is_incompetent:
+            return
+        self.entries[key] = {
+            'status': 'survived' if result.is_survived else 'killed',
+            'killer': result.killer,
+            'exception_traceback': result.exception_traceback,
+            'tests_run': result.tests_run,
+            'time': duration,
+        }
+
+    def save(self):
+        with open(self.file_name, 'w') as cache_file:
+            json.dump(self.entries, cache_file, indent=1, sort_keys=True)
+
+
+def get_hash(*values):
+    return hashlib.sha256(json.dumps(values).encode()).hexdigest()
+
+
+def get_test_hashes(runner):
+    test_modules = list(runner.test_loader.load())
+    test_hashes = {}
+    for test in runner.load_test_suite(test_modules):
+        try:
+            source = test.get_source()
+        except (AttributeError, OSError, TypeError):
+            source = None
+        test_hashes[repr(test)] = get_hash(repr(test), source)
+    return test_hashes
+
+
+def find_scope(node):
+    scope = getattr(node, 'parent', None)
+    while scope is not None and not isinstance(scope, SCOPE_NODES):
+        scope = getattr(scope, 'parent', None)
+    return scope
+
+
+def get_mutation_hash(mutation):
+    scope = find_scope(mutation.node)
+    if scope is None:
+        # mutated module level code, so whole module is the scope
+        scope = mutation.node
+        while getattr(scope, 'parent', None) is not None:
+            scope = scope.parent
+    return get_hash(
+        codegen.to_source(scope),
+        mutation.operator.name(),
+        mutation.visitor,
+        getattr(mutation.node, 'lineno', 0) - getattr(scope, 'lineno', 0),
+        getattr(mutation.node, 'col_offset', 0),
+    )
+
+
+def get_mutant_key(module_name, mutations, covering_test_hashes):
+    """
+    Must be called while mutant is applied to the target AST, as the source of
+    the mutated function is a part of the key.
+    """
+    return get_hash(
+        module_name,
+        [get_mutation_hash(mutation) for mutation in mutations],
+        sorted(covering_test_hashes),
+    )
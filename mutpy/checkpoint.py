@@ -0,0 +1,108 @@
+import json
+import os
+
+from mutpy.test_runners.base import SerializableMutationTestResult
+
+
+class JournaledException(Exception):
+    pass
+
+
+class CheckpointJournal:
+    """
+    Append-only journal of finished mutants, one JSON line per mutant.
+
+    It is notified as a view, so every mutant is written as soon as its result
+    is known. When resuming, results of journaled mutants are replayed by the
+    controller instead of running them again, as long as the mutant with the
+    same number is still generated from the same mutations.
+    """
+
+    def __init__(self, file_name, resume=False):
+        self.file_name = file_name
+        self.entries = {}
+        if resume and os.path.exists(file_name):
+            self.load()
+        self.journal_file = open(file_name, 'a' if resume else 'w')
+        self.current_mutation = None
+
+    def load(self):
+        with open(self.file_name) as journal_file:
+            lines = journal_file.readlines()
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # last line is incomplete if run was killed during write
+                continue
+            self.entries[entry['number']] = entry
+        if lines and not lines[-1].endswith('\n'):
+            with open(self.file_name, 'a') as journal_file:
+                journal_file.write('\n')
+
+    def get(self, number, module, mutations):
+        entry = self.entries.get(number)
+        if entry is None:
+            return None
+        if entry['module'] != module.__name__ or entry['mutations'] != get_mutations_info(mutations):
+            # different mutant was generated, so it has to be run and journaled again
+            del self.entries[number]
+            return None
+        if entry['status'] == 'timeout':
+            return None, entry['time']
+        result = SerializableMutationTestResult(
+            is_incompetent=entry['status'] == 'incompetent',
+            is_survived=entry['status'] == 'survived',
+            killer=entry['killer'],
+            exception_traceback=entry['exception_traceback'],
+            exception=JournaledException(entry['exception']) if entry['exception'] else None,
+            tests_run=entry['tests_run'],
+        )
+        return result, entry['time']
+
+    def mutation(self, number, mutations, module, mutant):
+        self.current_mutation = {
+            'number': number,
+            'module': module.__name__,
+            'mutations': get_mutations_info(mutations),
+        }
+
+    def killed(self, time, killer, exception_traceback, tests_run, *args, **kwargs):
+        self.end_mutation('killed', time=time, killer=killer, exception_traceback=exception_traceback,
+                          tests_run=tests_run)
+
+    def survived(self, time, tests_run, *args, **kwargs):
+        self.end_mutation('survived', time=time, tests_run=tests_run)
+
+    def incompetent(self, time, exception, tests_run, *args, **kwargs):
+        self.end_mutation('incompetent', time=time, exception=repr(exception), tests_run=tests_run)
+
+    def timeout(self, time, *args, **kwargs):
+        self.end_mutation('timeout', time=time)
+
+    def end_mutation(self, status, time=None, killer=None, exception_traceback=None, exception=None,
+                     tests_run=None):
+        entry = self.current_mutation
+        if entry['number'] in self.entries:
+            return
+        entry.update(
+            status=status,
+            time=time,
+            killer=killer,
+            exception_traceback=exception_traceback,
+            exception=exception,
+            tests_run=tests_run,
+        )
+        self.entries[entry['number']] = entry
+        self.journal_file.write(json.dumps(entry) + '\n')
+        self.journal_file.flush()
+
+    def end(self, score, duration):
+        self.journal_file.close()
+
+
+def get_mutations_info(mutations):
+    return [
+        [mutation.operator.name(), getattr(mutation.node, 'lineno', None), mutation.visitor]
+        for mutation in mutations
+    ]
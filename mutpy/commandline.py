@@ -1,8 +1,9 @@
 import argparse
+import os
 import sys
 
 from mutpy import __version__ as version
-from mutpy import controller, views, operators, utils
+from mutpy import cache, checkpoint, controller, coverage, diff, history, views, operators, utils, workers
 
 
 # fmt: off
@@ -37,23 +38,101 @@ def build_parser():
                         help="percentage of the generated mutants (mutation sampling)")
     parser.add_argument("--coverage", action="store_true",
                         help="mutate only covered code")
+    parser.add_argument("--coverage-backend", type=str, choices=coverage.COVERAGE_BACKENDS,
+                        default=coverage.AST_BACKEND, metavar="BACKEND",
+                        help="measure coverage by code injected to AST or by sys.monitoring, "
+                             "which falls back to AST before Python 3.12 (default: %(default)s)")
     parser.add_argument("--order", type=int, metavar="ORDER", default=1, help="mutation order")
     parser.add_argument("--hom-strategy", type=str, metavar="HOM_STRATEGY", help="HOM strategy",
                         default="FIRST_TO_LAST")
     parser.add_argument("--list-hom-strategies", action="store_true", help="list available HOM strategies")
     parser.add_argument("--mutation-number", type=int, metavar="MUTATION_NUMBER",
                         help="run only one mutation (debug purpose)")
+    parser.add_argument("--jobs", "-j", type=positive_int, metavar="JOBS", default=1,
+                        help="number of mutants executed concurrently (default: %(default)s)")
+    parser.add_argument("--zygote", action="store_true",
+                        help="fork every mutant from a worker with already imported tests")
+    parser.add_argument("--reuse-workers", action="store_true",
+                        help="run next mutants in the same worker process (faster, but state changed by "
+                             "a mutant can leak to the next ones)")
+    parser.add_argument("--schemata", action="store_true",
+                        help="compile all mutants of a module once and switch between them in workers")
+    parser.add_argument("--hot-patch", action="store_true",
+                        help="swap code of mutated function in target module loaded once by worker and restore it "
+                             "after tests, instead of importing mutant (use with --zygote for a clean module)")
+    parser.add_argument("--skip-equivalent", action="store_true",
+                        help="skip mutants compiled to the same code as original or other mutant")
+    parser.add_argument("--cache", type=str, metavar="CACHE_FILE",
+                        help="reuse results of unchanged mutants from previous run and update them")
+    parser.add_argument("--since", type=str, metavar="GIT_REF",
+                        help="mutate only lines changed since given git revision")
+    parser.add_argument("--checkpoint", type=str, metavar="JOURNAL_FILE",
+                        help="write result of every finished mutant to journal")
+    parser.add_argument("--resume", type=str, metavar="JOURNAL_FILE",
+                        help="skip mutants finished in journal of interrupted run and continue writing it")
+    parser.add_argument("--kill-history", type=str, metavar="HISTORY_FILE",
+                        help="run tests which killed similar mutants first and remember killers in history file")
 
     return parser
+
+
+def build_coordinator_parser():
+    parser = build_parser()
+    parser.prog = "mutpy coordinator"
+    parser.description = "Distribute mutants to MutPy workers."
+    parser.add_argument("--listen", type=str, metavar="ADDRESS", required=True,
+                        help="HOST:PORT or Unix socket path to accept workers on")
+    parser.add_argument("--worker-timeout", type=float, metavar="SECONDS", default=300,
+                        help="stop if no worker connects in given time when one is needed (default: %(default)s)")
+    parser.add_argument("--authkey", type=str, default=os.environ.get("MUTPY_AUTHKEY"),
+                        help="shared secret of coordinator and workers (default: $MUTPY_AUTHKEY)")
+    return parser
+
+
+def build_worker_parser():
+    parser = argparse.ArgumentParser(prog="mutpy worker", description="Run mutants sent by MutPy coordinator.",
+                                     fromfile_prefix_chars="@")
+    parser.add_argument("--connect", type=str, metavar="ADDRESS", required=True,
+                        help="HOST:PORT or Unix socket path of coordinator")
+    parser.add_argument("--authkey", type=str, default=os.environ.get("MUTPY_AUTHKEY"),
+                        help="shared secret of coordinator and workers (default: $MUTPY_AUTHKEY)")
+    parser.add_argument("--target", "-t", type=str, nargs="+", help="target module or package to mutate")
+    parser.add_argument("--unit-test", "-u", type=str, nargs="+", required=True,
+                        help="test class, test method, module or package with unit tests")
+    parser.add_argument("--runner", type=str, choices=["unittest", "pytest"], default="unittest",
+                        metavar="RUNNER", help="test runner")
+    parser.add_argument("--path", "-p", type=str, metavar="DIR", help="extend Python path")
+    parser.add_argument("--disable-stdout", "-d", action="store_true",
+                        help="try disable stdout during mutation "
+                             "(this option can damage your tests if you interact with sys.stdout)")
+    parser.add_argument("--zygote", action="store_true",
+                        help="fork every mutant from a worker with already imported tests")
+    parser.add_argument("--reuse-workers", action="store_true",
+                        help="run next mutants in the same worker process (faster, but state changed by "
+                             "a mutant can leak to the next ones)")
+    return parser
 # fmt: on
 
 
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("{} is not a positive integer".format(value))
+    return number
+
+
 def entry(argv=None):
     """
     Main entry point for the console script.
     """
+    args = argv[1:] if argv else sys.argv[1:]
+    if args and args[0] == "coordinator":
+        coordinator_entry(args[1:])
+        return
+    if args and args[0] == "worker":
+        worker_entry(args[1:])
+        return
     parser = build_parser()
-    args = argv[1:] if argv else None
     cfg = parser.parse_args(args)
 
     if cfg.list_operators:
@@ -67,12 +146,54 @@ def entry(argv=None):
         parser.print_usage()
 
 
-def build_controller(cfg):
+def coordinator_entry(args):
+    parser = build_coordinator_parser()
+    cfg = parser.parse_args(args)
+    if not (cfg.target and cfg.unit_test):
+        parser.print_usage()
+        return
+    worker_pool = workers.RemoteWorkerPool(workers.parse_address(cfg.listen), get_authkey(cfg), cfg.worker_timeout)
+    try:
+        mutation_controller = build_controller(cfg, worker_pool=worker_pool)
+        exit_code = mutation_controller.run()
+    except workers.NoWorkerException as error:
+        print("Can't run mutants: {}.".format(error))
+        exit_code = -1
+    finally:
+        worker_pool.close()
+    sys.exit(exit_code)
+
+
+def worker_entry(args):
+    cfg = build_worker_parser().parse_args(args)
+    authkey = get_authkey(cfg)
+    if cfg.target:
+        list(utils.ModulesLoader(cfg.target, cfg.path).load())
+    test_loader = utils.ModulesLoader(cfg.unit_test, cfg.path)
+    list(test_loader.load())
+    runner = get_runner_cls(cfg.runner)(test_loader, None, utils.StdoutManager(cfg.disable_stdout), False)
+    worker_cls = workers.ZygoteMutationWorker if cfg.zygote else workers.MutationWorker
+    if not workers.run_remote_worker(workers.parse_address(cfg.connect), authkey, runner, worker_cls,
+                                     cfg.reuse_workers):
+        print("Coordinator runs incompatible Python version.")
+        sys.exit(-1)
+
+
+def get_authkey(cfg):
+    if not cfg.authkey:
+        print("Authentication key is required! Use --authkey or MUTPY_AUTHKEY environment variable.")
+        sys.exit(-1)
+    return cfg.authkey.encode()
+
+
+def build_controller(cfg, worker_pool=None):
     runner_cls = get_runner_cls(cfg.runner)
     built_views = build_views(cfg)
     mutant_generator = build_mutator(cfg)
     target_loader = utils.ModulesLoader(cfg.target, cfg.path)
     test_loader = utils.ModulesLoader(cfg.unit_test, cfg.path)
+    mutation_cache = cache.MutationCache(cfg.cache) if cfg.cache else None
+    git_diff = build_git_diff(cfg) if cfg.since else None
     return controller.MutationController(
         runner_cls=runner_cls,
         target_loader=target_loader,
@@ -83,9 +204,37 @@ def build_controller(cfg):
         disable_stdout=cfg.disable_stdout,
         mutate_covered=cfg.coverage,
         mutation_number=cfg.mutation_number,
+        jobs=cfg.jobs,
+        zygote=cfg.zygote,
+        worker_pool=worker_pool,
+        mutation_cache=mutation_cache,
+        git_diff=git_diff,
+        checkpoint=build_checkpoint(cfg),
+        kill_history=history.KillHistory(cfg.kill_history) if cfg.kill_history else None,
+        mutant_schemata=cfg.schemata,
+        hot_patch=cfg.hot_patch,
+        skip_equivalent=cfg.skip_equivalent,
+        coverage_backend=cfg.coverage_backend,
+        reuse_workers=cfg.reuse_workers,
     )
 
 
+def build_git_diff(cfg):
+    try:
+        return diff.GitDiff(cfg.since, cfg.path)
+    except diff.GitDiffException as error:
+        print("Can't read changes: {}".format(error))
+        sys.exit(-1)
+
+
+def build_checkpoint(cfg):
+    if cfg.resume:
+        return checkpoint.CheckpointJournal(cfg.resume, resume=True)
+    if cfg.checkpoint:
+        return checkpoint.CheckpointJournal(cfg.checkpoint)
+    return None
+
+
 def get_runner_cls(runner):
     if runner == "unittest":
         from mutpy.test_runners import UnittestTestRunner
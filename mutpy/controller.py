@@ -1,8 +1,11 @@
+import bisect
+import copy
+import marshal
 import random
 import sys
 import time
 
-from mutpy import views, utils
+from mutpy import cache, coverage, equivalence, hotpatch, operators, schemata, views, utils, workers
 
 
 class TestsFailAtOriginal(Exception):
@@ -18,11 +21,13 @@ class MutationScore:
         self.timeout_mutants = 0
         self.incompetent_mutants = 0
         self.survived_mutants = 0
+        self.equivalent_mutants = 0
+        self.duplicate_mutants = 0
         self.covered_nodes = 0
         self.all_nodes = 0
 
     def count(self):
-        bottom = self.all_mutants - self.incompetent_mutants
+        bottom = self.all_mutants - self.incompetent_mutants - self.equivalent_mutants - self.duplicate_mutants
         return (((self.killed_mutants + self.timeout_mutants) / bottom) * 100) if bottom else 0
 
     def inc_killed(self):
@@ -37,19 +42,29 @@ class MutationScore:
     def inc_survived(self):
         self.survived_mutants += 1
 
+    def inc_equivalent(self):
+        self.equivalent_mutants += 1
+
+    def inc_duplicate(self):
+        self.duplicate_mutants += 1
+
     def update_coverage(self, covered_nodes, all_nodes):
         self.covered_nodes += covered_nodes
         self.all_nodes += all_nodes
 
     @property
     def all_mutants(self):
-        return self.killed_mutants + self.timeout_mutants + self.incompetent_mutants + self.survived_mutants
+        return self.killed_mutants + self.timeout_mutants + self.incompetent_mutants + self.survived_mutants + \
+            self.equivalent_mutants + self.duplicate_mutants
 
 
 class MutationController(views.ViewNotifier):
 
     def __init__(self, runner_cls, target_loader, test_loader, views, mutant_generator,
-                 timeout_factor=5, disable_stdout=False, mutate_covered=False, mutation_number=None):
+                 timeout_factor=5, disable_stdout=False, mutate_covered=False, mutation_number=None, jobs=1,
+                 zygote=False, worker_pool=None, mutation_cache=None, git_diff=None, checkpoint=None,
+                 kill_history=None, mutant_schemata=False, hot_patch=False, skip_equivalent=False,
+                 coverage_backend=coverage.AST_BACKEND, reuse_workers=False):
         super().__init__(views)
         self.target_loader = target_loader
         self.test_loader = test_loader
@@ -57,7 +72,28 @@ class MutationController(views.ViewNotifier):
         self.timeout_factor = timeout_factor
         self.stdout_manager = utils.StdoutManager(disable_stdout)
         self.mutation_number = mutation_number
-        self.runner = runner_cls(self.test_loader, self.timeout_factor, self.stdout_manager, mutate_covered)
+        self.jobs = jobs
+        self.runner = runner_cls(self.test_loader, self.timeout_factor, self.stdout_manager, mutate_covered,
+                                 coverage_backend=coverage_backend)
+        # sequential run starts a new process for every mutant, unless workers are needed or asked for
+        self.use_workers = worker_pool is not None or workers.is_parallel_execution_supported() and (
+            jobs > 1 or zygote or mutant_schemata or reuse_workers or hot_patch
+        )
+        worker_cls = workers.ZygoteMutationWorker if zygote else workers.MutationWorker
+        self.worker_pool = worker_pool or workers.LocalWorkerPool(self.runner, worker_cls, reuse_workers)
+        self.executor = None
+        self.mutation_cache = mutation_cache
+        self.test_hashes = {}
+        self.git_diff = git_diff
+        self.checkpoint = checkpoint
+        if checkpoint:
+            self.add_view(checkpoint)
+        self.kill_history = kill_history
+        if kill_history:
+            self.add_view(kill_history)
+        self.mutant_schemata = mutant_schemata
+        self.hot_patch = hot_patch
+        self.skip_equivalent = skip_equivalent
 
     def run(self) -> int:
         """
@@ -91,57 +127,256 @@ class MutationController(views.ViewNotifier):
 
     def run_mutation_process(self):
         try:
-            test_modules, total_duration, number_of_tests = self.load_and_check_tests()
+            test_modules, total_duration, number_of_tests, target_modules, coverage_by_module = \
+                self.load_and_check_tests()
 
             self.notify_passed(test_modules, number_of_tests)
             self.notify_start()
 
             self.score = MutationScore()
 
-            for target_module, to_mutate in self.target_loader.load([module for module, *_ in test_modules]):
-                self.mutate_module(target_module, to_mutate, total_duration)
+            if self.mutation_cache:
+                self.test_hashes = cache.get_test_hashes(self.runner)
+            if self.use_workers:
+                live_time = self.runner.get_live_time(total_duration)
+                self.executor = workers.MutantExecutor(self.jobs, live_time, self.worker_pool)
+            try:
+                for target_module, to_mutate in target_modules:
+                    target_ast, coverage_injector, coverage_result = coverage_by_module.get(
+                        target_module.__name__, (None, None, None),
+                    )
+                    self.mutate_module(
+                        target_module, to_mutate, total_duration, target_ast, coverage_injector, coverage_result,
+                    )
+            finally:
+                if self.executor:
+                    self.executor.shutdown()
+                if self.mutation_cache:
+                    self.mutation_cache.save()
         except KeyboardInterrupt:
             pass
 
     def load_and_check_tests(self):
+        """
+        Load test and target modules and run every test module once to check it passes.
+
+        Coverage of target modules is measured by the same run of tests.
+        """
+        loaded_test_modules = list(self.test_loader.load())
+        target_modules = list(self.target_loader.load([module for module, _ in loaded_test_modules]))
+        targets = self.create_coverage_targets(target_modules)
+        coverage_result = self.inject_coverage(targets, loaded_test_modules)
         test_modules = []
         number_of_tests = 0
         total_duration = 0
-        for test_module, target_test in self.test_loader.load():
-            result, duration = self.run_test(test_module, target_test)
-            if result.was_successful():
-                test_modules.append((test_module, target_test, duration))
-            else:
-                raise TestsFailAtOriginal(result)
-            number_of_tests += result.tests_run()
-            total_duration += duration
-
-        return test_modules, total_duration, number_of_tests
-
-    def run_test(self, test_module, target_test):
-        return self.runner.run_test(test_module, target_test)
+        try:
+            for test_module, target_test in loaded_test_modules:
+                result, duration = self.run_test(test_module, target_test, coverage_result)
+                if result.was_successful():
+                    test_modules.append((test_module, target_test, duration))
+                else:
+                    raise TestsFailAtOriginal(result)
+                number_of_tests += result.tests_run()
+                total_duration += duration
+        finally:
+            coverage_results = self.runner.finish_coverage(coverage_result) if coverage_result else []
+        coverage_by_module = {
+            target_module.__name__: (target_ast, coverage_injector, module_coverage_result)
+            for (target_ast, target_module), (coverage_injector, module_coverage_result)
+            in zip(targets, coverage_results)
+        }
+        return test_modules, total_duration, number_of_tests, target_modules, coverage_by_module
+
+    def run_test(self, test_module, target_test, coverage_result=None):
+        return self.runner.run_test(test_module, target_test, coverage_result)
 
     @utils.TimeRegister
-    def mutate_module(self, target_module, to_mutate, total_duration):
-        target_ast = self.create_target_ast(target_module)
-        coverage_injector, coverage_result = self.inject_coverage(target_ast, target_module)
+    def mutate_module(self, target_module, to_mutate, total_duration, target_ast=None, coverage_injector=None,
+                      coverage_result=None):
+        changed_lines = self.get_changed_lines(target_module)
+        if changed_lines is not None and not changed_lines:
+            return
+        if target_ast is None:
+            target_ast = self.create_target_ast(target_module)
+        # functions are patched only by workers, full mutants are run without them (e.g. on Windows)
+        function_patcher = None
+        if self.hot_patch and self.executor:
+            function_patcher = hotpatch.FunctionPatcher(target_module, target_ast)
+        equivalence_filter = self.create_equivalence_filter(target_ast, target_module) if self.skip_equivalent else None
         if coverage_injector:
             self.score.update_coverage(*coverage_injector.get_result())
-        for mutations, mutant_ast in self.mutant_generator.mutate(target_ast, to_mutate, coverage_injector,
-                                                                  module=target_module):
+        mutants = self.mutant_generator.mutate(
+            target_ast, to_mutate, coverage_injector, module=target_module, changed_lines=changed_lines,
+        )
+        if self.executor:
+            schema = None
+            if self.mutant_schemata:
+                schema = self.create_mutant_schema(target_module, target_ast, mutants)
+                mutants = schema.iter_mutants()
+            self.mutate_module_with_workers(
+                total_duration, target_module, mutants, coverage_result, schema, function_patcher, equivalence_filter,
+            )
+            return
+        for mutations, mutant_ast in mutants:
             mutation_number = self.score.all_mutants + 1
             if self.mutation_number and self.mutation_number != mutation_number:
                 self.score.inc_incompetent()
                 continue
+            equivalent_to = self.find_equivalent(equivalence_filter, mutation_number, mutations, mutant_ast)
+            if equivalent_to is not None:
+                self.notify_mutation(mutation_number, mutations, target_module, mutant_ast)
+                self.update_equivalent_mutant(equivalent_to)
+                continue
+            cache_key = self.get_cache_key(target_module, mutations, coverage_result)
+            cached_result = self.find_finished_result(mutation_number, target_module, mutations, cache_key)
             self.notify_mutation(mutation_number, mutations, target_module, mutant_ast)
+            if cached_result:
+                self.update_score_and_notify_views(*cached_result)
+                continue
             mutant_module = self.create_mutant_module(target_module, mutant_ast)
             if mutant_module:
-                self.run_tests_with_mutant(total_duration, mutant_module, mutations, coverage_result)
+                self.run_tests_with_mutant(total_duration, mutant_module, mutations, coverage_result, cache_key)
             else:
                 self.score.inc_incompetent()
 
-    def inject_coverage(self, target_ast, target_module):
-        return self.runner.inject_coverage(target_ast, target_module)
+    def mutate_module_with_workers(self, total_duration, target_module, mutants, coverage_result, schema=None,
+                                   function_patcher=None, equivalence_filter=None):
+        for mutant_id, (mutations, mutant_ast) in enumerate(mutants, 1):
+            mutation_number = self.score.all_mutants + len(self.executor.submitted) + 1
+            if self.mutation_number and self.mutation_number != mutation_number:
+                self.score.inc_incompetent()
+                continue
+            if self.jobs > 1:
+                # mutant AST is restored by generator before job finishes, so views need its own copy
+                mutant_ast = copy.deepcopy(mutant_ast)
+            job = workers.MutantJob(mutation_number, mutations, target_module, mutant_ast)
+            job.equivalent_to = self.find_equivalent(equivalence_filter, mutation_number, mutations, mutant_ast)
+            cached_result = None
+            if job.equivalent_to is None:
+                job.cache_key = self.get_cache_key(target_module, mutations, coverage_result)
+                cached_result = self.find_finished_result(mutation_number, target_module, mutations, job.cache_key)
+            if job.equivalent_to is not None:
+                job.finish()
+                task = None
+            elif cached_result:
+                job.finish(*cached_result)
+                task = None
+            else:
+                task = self.create_mutant_task(total_duration, job, coverage_result, schema, mutant_id,
+                                               function_patcher)
+            finished_jobs = self.executor.submit(job, task)
+            if self.jobs == 1:
+                finished_jobs += self.executor.finish()
+            for finished_job in finished_jobs:
+                self.update_score_and_notify_views_with_job(finished_job)
+        for finished_job in self.executor.finish():
+            self.update_score_and_notify_views_with_job(finished_job)
+
+    @utils.TimeRegister
+    def create_mutant_schema(self, target_module, target_ast, mutants):
+        schema = schemata.MutantSchema(target_ast)
+        for mutations, _ in mutants:
+            schema.add(mutations)
+        try:
+            with self.stdout_manager:
+                schema.compile(target_module.__name__)
+        except BaseException:
+            # e.g. some mutant can't be compiled, so every mutant is compiled separately
+            pass
+        return schema
+
+    @utils.TimeRegister
+    def create_mutant_task(self, total_duration, job, coverage_result, schema=None, mutant_id=None,
+                           function_patcher=None):
+        module_name = job.target_module.__name__
+        if not schema or not schema.module:
+            schema, mutant_id = None, None
+        function_patches = None
+        if not schema and function_patcher:
+            function_patches = function_patcher.create_patches(job.mutations)
+        if schema:
+            marshalled_code = schema.marshalled_code
+        elif function_patches:
+            # functions are patched in original module loaded by worker, parent ran tests with its own
+            marshalled_code = function_patcher.marshalled_original_code
+        else:
+            # mutant is executed only by worker, which reports it as incompetent if it can't be imported
+            try:
+                marshalled_code = marshal.dumps(compile(job.mutant_ast, module_name, 'exec'))
+            except BaseException as exception:
+                job.finish(exception=exception)
+                return None
+        covering_tests = self.runner.find_covering_tests(job.mutations, coverage_result) if coverage_result else None
+        test_timeouts = self.runner.get_test_timeouts(covering_tests)
+        return workers.MutantTask(
+            module_name,
+            marshalled_code,
+            covering_tests,
+            live_time=self.runner.get_mutant_live_time(test_timeouts, total_duration),
+            test_timeouts=test_timeouts,
+            likely_killers=self.get_likely_killers(job.target_module, job.mutations),
+            schema_key=schema.key if schema else None,
+            mutant_id=mutant_id,
+            function_patches=function_patches,
+        )
+
+    def update_score_and_notify_views_with_job(self, job):
+        self.notify_mutation(job.number, job.mutations, job.target_module, job.mutant_ast)
+        if job.equivalent_to is not None:
+            self.update_equivalent_mutant(job.equivalent_to)
+        elif job.exception:
+            self.notify_incompetent(0, job.exception, tests_run=0)
+            self.score.inc_incompetent()
+        else:
+            self.update_score_and_notify_views(job.result, job.duration)
+            if job.cache_key:
+                self.mutation_cache.set(job.cache_key, job.result, job.duration)
+
+    def find_finished_result(self, mutation_number, target_module, mutations, cache_key):
+        if self.checkpoint:
+            journaled_result = self.checkpoint.get(mutation_number, target_module, mutations)
+            if journaled_result:
+                return journaled_result
+        if cache_key:
+            return self.mutation_cache.get(cache_key)
+        return None
+
+    @utils.TimeRegister
+    def create_equivalence_filter(self, target_ast, target_module):
+        return equivalence.EquivalenceFilter(target_ast, target_module.__name__)
+
+    @utils.TimeRegister
+    def find_equivalent(self, equivalence_filter, mutation_number, mutations, mutant_ast):
+        if not equivalence_filter:
+            return None
+        return equivalence_filter.find_equivalent(mutation_number, mutations, mutant_ast)
+
+    def get_cache_key(self, target_module, mutations, coverage_result):
+        if not self.mutation_cache:
+            return None
+        covering_tests = set(self.runner.find_covering_tests(mutations, coverage_result)) if coverage_result else None
+        covering_test_hashes = [
+            test_hash for test_id, test_hash in self.test_hashes.items()
+            if covering_tests is None or test_id in covering_tests
+        ]
+        return cache.get_mutant_key(target_module.__name__, mutations, covering_test_hashes)
+
+    def get_changed_lines(self, target_module):
+        return self.git_diff.get_changed_lines(target_module.__file__) if self.git_diff else None
+
+    def create_coverage_targets(self, target_modules):
+        if not self.runner.mutate_covered:
+            return []
+        targets = []
+        for target_module, _ in target_modules:
+            changed_lines = self.get_changed_lines(target_module)
+            if changed_lines is None or changed_lines:
+                targets.append((self.create_target_ast(target_module), target_module))
+        return targets
+
+    @utils.TimeRegister
+    def inject_coverage(self, targets, test_modules):
+        return self.runner.inject_coverage(targets, test_modules)
 
     @utils.TimeRegister
     def create_target_ast(self, target_module):
@@ -160,9 +395,18 @@ class MutationController(views.ViewNotifier):
             self.notify_incompetent(0, exception, tests_run=0)
             return None
 
-    def run_tests_with_mutant(self, total_duration, mutant_module, mutations, coverage_result):
-        result, duration = self.runner.run_tests_with_mutant(total_duration, mutant_module, mutations, coverage_result)
+    def get_likely_killers(self, target_module, mutations):
+        if not self.kill_history:
+            return None
+        return self.kill_history.get_likely_killers(target_module, mutations)
+
+    def run_tests_with_mutant(self, total_duration, mutant_module, mutations, coverage_result, cache_key=None):
+        result, duration = self.runner.run_tests_with_mutant(
+            total_duration, mutant_module, mutations, coverage_result, self.get_likely_killers(mutant_module, mutations),
+        )
         self.update_score_and_notify_views(result, duration)
+        if cache_key:
+            self.mutation_cache.set(cache_key, result, duration)
 
     def update_score_and_notify_views(self, result, mutant_duration):
         if not result:
@@ -190,80 +434,181 @@ class MutationController(views.ViewNotifier):
         self.notify_killed(duration, result.killer, result.exception_traceback, result.tests_run)
         self.score.inc_killed()
 
+    def update_equivalent_mutant(self, equivalent_to):
+        if equivalent_to == equivalence.ORIGINAL:
+            self.notify_equivalent()
+            self.score.inc_equivalent()
+        else:
+            self.notify_duplicate(equivalent_to)
+            self.score.inc_duplicate()
+
+
+class ConflictSet:
+    """
+    Mutations chosen for a higher order mutant, checked against new ones.
+
+    Mutations are in conflict if they mutate the same node or one of the
+    nodes is a descendant of the other one (by pre-order numbers of nodes,
+    see `utils.is_descendant`) or, if same operators aren't allowed, they
+    are made by the same operator.
+    """
+
+    def __init__(self, allow_same_operators=True):
+        self.allow_same_operators = allow_same_operators
+        self.node_ids = set()
+        self.ranges = []
+        self.operators = set()
+
+    def add(self, mutation):
+        self.node_ids.add(id(mutation.node))
+        if hasattr(mutation.node, 'tree_index'):
+            self.ranges.append((mutation.node.tree_index, mutation.node.tree_end))
+        self.operators.add(mutation.operator)
+
+    def is_conflicting(self, mutation):
+        if id(mutation.node) in self.node_ids:
+            return True
+        if not self.allow_same_operators and mutation.operator in self.operators:
+            return True
+        if hasattr(mutation.node, 'tree_index'):
+            # subtrees are either nested or disjoint
+            start, end = mutation.node.tree_index, mutation.node.tree_end
+            return any(start <= other_end and other_start <= end for other_start, other_end in self.ranges)
+        return False
+
+
+class MutationQueue:
+    """
+    Ordered mutations, which can be taken from both ends of the queue.
+
+    Mutations are linked by positions, so taken mutations are skipped
+    without copying the queue.
+    """
+
+    def __init__(self, mutations):
+        self.mutations = mutations
+        self.next_positions = list(range(1, len(mutations))) + [None]
+        self.previous_positions = [None] + list(range(len(mutations) - 1))
+        self.first = 0 if mutations else None
+        self.last = len(mutations) - 1 if mutations else None
+
+    def __bool__(self):
+        return self.first is not None
+
+    def take(self, conflict_set, from_last=False):
+        """
+        Take the first (or the last) mutation which isn't in conflict, or return `None`.
+        """
+        position = self.last if from_last else self.first
+        links = self.previous_positions if from_last else self.next_positions
+        while position is not None:
+            mutation = self.mutations[position]
+            if not conflict_set.is_conflicting(mutation):
+                self.remove(position)
+                return mutation
+            position = links[position]
+        return None
+
+    def remove(self, position):
+        previous_position, next_position = self.previous_positions[position], self.next_positions[position]
+        if previous_position is None:
+            self.first = next_position
+        else:
+            self.next_positions[previous_position] = next_position
+        if next_position is None:
+            self.last = previous_position
+        else:
+            self.previous_positions[next_position] = previous_position
+
 
 class HOMStrategy:
+    """
+    Generates higher order mutants, every mutation is used in exactly one mutant.
+
+    Mutations are taken from the queue of not used mutations (from the first,
+    or from the last if `take_from_last` says so) skipping mutations in
+    conflict with already taken ones.
+    """
 
     def __init__(self, order=2):
         self.order = order
 
-    def remove_bad_mutations(self, mutations_to_apply, available_mutations, allow_same_operators=True):
-        for mutation_to_apply in mutations_to_apply:
-            for available_mutation in available_mutations[:]:
-                if mutation_to_apply.node == available_mutation.node or \
-                        mutation_to_apply.node in available_mutation.node.children or \
-                        available_mutation.node in mutation_to_apply.node.children or \
-                        (not allow_same_operators and mutation_to_apply.operator == available_mutation.operator):
-                    available_mutations.remove(available_mutation)
+    def generate(self, mutations):
+        queue = MutationQueue(mutations)
+        while queue:
+            mutations_to_apply = []
+            conflict_set = ConflictSet()
+            while len(mutations_to_apply) < self.order:
+                mutation = queue.take(conflict_set, from_last=self.take_from_last(len(mutations_to_apply)))
+                if mutation is None:
+                    break
+                mutations_to_apply.append(mutation)
+                conflict_set.add(mutation)
+            yield mutations_to_apply
+
+    def take_from_last(self, taken_number):
+        return False
 
 
 class FirstToLastHOMStrategy(HOMStrategy):
     name = 'FIRST_TO_LAST'
 
-    def generate(self, mutations):
-        mutations = mutations[:]
-        while mutations:
-            mutations_to_apply = []
-            index = 0
-            available_mutations = mutations[:]
-            while len(mutations_to_apply) < self.order and available_mutations:
-                try:
-                    mutation = available_mutations.pop(index)
-                    mutations_to_apply.append(mutation)
-                    mutations.remove(mutation)
-                    index = 0 if index == -1 else -1
-                except IndexError:
-                    break
-                self.remove_bad_mutations(mutations_to_apply, available_mutations)
-            yield mutations_to_apply
+    def take_from_last(self, taken_number):
+        return taken_number % 2 == 1
 
 
 class EachChoiceHOMStrategy(HOMStrategy):
     name = 'EACH_CHOICE'
 
-    def generate(self, mutations):
-        mutations = mutations[:]
-        while mutations:
-            mutations_to_apply = []
-            available_mutations = mutations[:]
-            while len(mutations_to_apply) < self.order and available_mutations:
-                try:
-                    mutation = available_mutations.pop(0)
-                    mutations_to_apply.append(mutation)
-                    mutations.remove(mutation)
-                except IndexError:
-                    break
-                self.remove_bad_mutations(mutations_to_apply, available_mutations)
-            yield mutations_to_apply
-
 
 class BetweenOperatorsHOMStrategy(HOMStrategy):
     name = 'BETWEEN_OPERATORS'
 
     def generate(self, mutations):
-        usage = {mutation: 0 for mutation in mutations}
-        not_used = mutations[:]
-        while not_used:
-            mutations_to_apply = []
-            available_mutations = mutations[:]
-            available_mutations.sort(key=lambda x: usage[x])
-            while len(mutations_to_apply) < self.order and available_mutations:
-                mutation = available_mutations.pop(0)
-                mutations_to_apply.append(mutation)
-                if not usage[mutation]:
-                    not_used.remove(mutation)
-                usage[mutation] += 1
-                self.remove_bad_mutations(mutations_to_apply, available_mutations, allow_same_operators=False)
-            yield mutations_to_apply
+        """
+        Mix mutations of different operators until every mutation is used,
+        least used mutations (first in order) are taken first.
+        """
+        # usage -> operator -> sorted positions of mutations
+        positions_by_usage = {0: {}}
+        for position, mutation in enumerate(mutations):
+            positions_by_usage[0].setdefault(mutation.operator, []).append(position)
+        while positions_by_usage.get(0):
+            taken = []
+            conflict_set = ConflictSet(allow_same_operators=False)
+            for usage in sorted(positions_by_usage):
+                while len(taken) < self.order:
+                    position = self.find_first_position(mutations, positions_by_usage[usage], conflict_set)
+                    if position is None:
+                        break
+                    taken.append((usage, position))
+                    conflict_set.add(mutations[position])
+            for usage, position in taken:
+                self.increment_usage(positions_by_usage, usage, position, mutations[position].operator)
+            yield [mutations[position] for _, position in taken]
+
+    def find_first_position(self, mutations, positions_by_operator, conflict_set):
+        first_position = None
+        for operator, positions in positions_by_operator.items():
+            if operator in conflict_set.operators:
+                continue
+            for position in positions:
+                if first_position is not None and position > first_position:
+                    break
+                if not conflict_set.is_conflicting(mutations[position]):
+                    first_position = position
+                    break
+        return first_position
+
+    def increment_usage(self, positions_by_usage, usage, position, operator):
+        positions_by_operator = positions_by_usage[usage]
+        positions = positions_by_operator[operator]
+        del positions[bisect.bisect_left(positions, position)]
+        if not positions:
+            del positions_by_operator[operator]
+        if not positions_by_operator:
+            del positions_by_usage[usage]
+        bisect.insort(positions_by_usage.setdefault(usage + 1, {}).setdefault(operator, []), position)
 
 
 class RandomHOMStrategy(HOMStrategy):
@@ -276,18 +621,7 @@ class RandomHOMStrategy(HOMStrategy):
     def generate(self, mutations):
         mutations = mutations[:]
         self.shuffler(mutations)
-        while mutations:
-            mutations_to_apply = []
-            available_mutations = mutations[:]
-            while len(mutations_to_apply) < self.order and available_mutations:
-                try:
-                    mutation = available_mutations.pop(0)
-                    mutations_to_apply.append(mutation)
-                    mutations.remove(mutation)
-                except IndexError:
-                    break
-                self.remove_bad_mutations(mutations_to_apply, available_mutations)
-            yield mutations_to_apply
+        return super().generate(mutations)
 
 
 hom_strategies = [
@@ -304,10 +638,14 @@ class FirstOrderMutator:
         self.operators = operators
         self.sampler = utils.RandomSampler(percentage)
 
-    def mutate(self, target_ast, to_mutate=None, coverage_injector=None, module=None):
-        for op in utils.sort_operators(self.operators):
-            for mutation, mutant in op().mutate(target_ast, to_mutate, self.sampler, coverage_injector, module=module):
-                yield [mutation], mutant
+    def mutate(self, target_ast, to_mutate=None, coverage_injector=None, module=None, changed_lines=None):
+        walker = self.create_walker()
+        for mutation, mutant in walker.mutate(target_ast, to_mutate, self.sampler, coverage_injector, module=module,
+                                              changed_lines=changed_lines):
+            yield [mutation], mutant
+
+    def create_walker(self):
+        return operators.MutationWalker([op() for op in utils.sort_operators(self.operators)])
 
 
 class HighOrderMutator(FirstOrderMutator):
@@ -316,41 +654,19 @@ class HighOrderMutator(FirstOrderMutator):
         super().__init__(*args, **kwargs)
         self.hom_strategy = hom_strategy or FirstToLastHOMStrategy(order=2)
 
-    def mutate(self, target_ast, to_mutate=None, coverage_injector=None, module=None):
-        mutations = self.generate_all_mutations(coverage_injector, module, target_ast, to_mutate)
+    def mutate(self, target_ast, to_mutate=None, coverage_injector=None, module=None, changed_lines=None):
+        walker = self.create_walker()
+        mutations = self.generate_all_mutations(coverage_injector, module, target_ast, to_mutate, changed_lines,
+                                                walker=walker)
         for mutations_to_apply in self.hom_strategy.generate(mutations):
-            generators = []
-            applied_mutations = []
-            mutant = target_ast
-            for mutation in mutations_to_apply:
-                generator = mutation.operator().mutate(
-                    mutant,
-                    to_mutate=to_mutate,
-                    sampler=self.sampler,
-                    coverage_injector=coverage_injector,
-                    module=module,
-                    only_mutation=mutation,
-                )
-                try:
-                    new_mutation, mutant = generator.__next__()
-                except StopIteration:
-                    assert False, 'no mutations!'
-                applied_mutations.append(new_mutation)
-                generators.append(generator)
-            yield applied_mutations, mutant
-            self.finish_generators(generators)
-
-    def generate_all_mutations(self, coverage_injector, module, target_ast, to_mutate):
-        mutations = []
-        for op in utils.sort_operators(self.operators):
-            for mutation, _ in op().mutate(target_ast, to_mutate, None, coverage_injector, module=module):
-                mutations.append(mutation)
-        return mutations
-
-    def finish_generators(self, generators):
-        for generator in reversed(generators):
-            try:
-                generator.__next__()
-            except StopIteration:
+            if not self.sampler.is_mutation_time():
                 continue
-            assert False, 'too many mutations!'
+            descriptors = [mutation.descriptor for mutation in mutations_to_apply]
+            with walker.apply(target_ast, descriptors, module=module) as (applied_mutations, mutant):
+                yield applied_mutations, mutant
+
+    def generate_all_mutations(self, coverage_injector, module, target_ast, to_mutate, changed_lines=None,
+                               walker=None):
+        walker = walker or self.create_walker()
+        return list(walker.describe(target_ast, to_mutate, None, coverage_injector, module=module,
+                                    changed_lines=changed_lines))
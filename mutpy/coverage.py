@@ -4,7 +4,11 @@ import sys
 
 from mutpy import utils
 
-COVERAGE_SET_NAME = "__covered_nodes__"
+COVERAGE_PROBES_NAME = "__coverage_probes__"
+COVER_FUNCTION_NAME = "__cover__"
+AST_BACKEND = "ast"
+MONITORING_BACKEND = "monitoring"
+COVERAGE_BACKENDS = [AST_BACKEND, MONITORING_BACKEND]
 
 
 class MarkerNodeTransformer(ast.NodeTransformer):
@@ -15,7 +19,10 @@ class MarkerNodeTransformer(ast.NodeTransformer):
     def visit(self, node):
         node.marker = self.last_marker
         self.last_marker += 1
-        return super().visit(node)
+        result_node = super().visit(node)
+        # markers are given in pre-order, so the subtree has markers from `marker` to `end_marker`
+        node.end_marker = self.last_marker - 1
+        return result_node
 
 
 class AbstractCoverageNodeTransformer(ast.NodeTransformer):
@@ -25,6 +32,8 @@ class AbstractCoverageNodeTransformer(ast.NodeTransformer):
 
     def __init__(self):
         super().__init__()
+        # markers recorded by every probe, probe is an index of this list
+        self.probe_markers = []
         for node_class in self.get_coverable_nodes():
             visit_method_name = "visit_" + node_class.__name__
             if not hasattr(self, visit_method_name):
@@ -47,12 +56,15 @@ class AbstractCoverageNodeTransformer(ast.NodeTransformer):
         return node
 
     def generate_coverage_node(self, node):
-        if hasattr(node, "body"):
-            markers = self.get_markers_from_body_node(node)
-        else:
-            markers = self.get_included_markers(node)
+        """
+        Generate probe, which reports its markers only when its flag isn't set yet.
+        """
+        probe = len(self.probe_markers)
+        self.probe_markers.append(self.get_markers(node))
         coverage_node = utils.create_ast(
-            "{}.update({})".format(COVERAGE_SET_NAME, repr(markers))
+            "{probes}[{probe}] or {cover}({probe})".format(
+                probes=COVERAGE_PROBES_NAME, cover=COVER_FUNCTION_NAME, probe=probe,
+            )
         ).body[0]
         coverage_node.lineno = node.lineno
         coverage_node.col_offset = node.col_offset
@@ -60,14 +72,23 @@ class AbstractCoverageNodeTransformer(ast.NodeTransformer):
             coverage_node.end_lineno = node.end_lineno
         return coverage_node
 
+    def get_markers(self, node):
+        if hasattr(node, "body"):
+            return self.get_markers_from_body_node(node)
+        return self.get_included_markers(node)
+
     def is_future_statement(self, node):
         return isinstance(node, ast.ImportFrom) and node.module == "__future__"
 
     def get_included_markers(self, node, without=None):
-        markers = {n.marker for n in ast.walk(node) if hasattr(n, "marker")}
-        if without:
-            for n in without:
-                markers.difference_update(self.get_included_markers(n))
+        markers = set()
+        if not hasattr(node, "marker"):
+            return markers
+        start = node.marker
+        for excluded in sorted((n for n in without or [] if hasattr(n, "marker")), key=lambda n: n.marker):
+            markers.update(range(start, excluded.marker))
+            start = max(start, excluded.end_marker + 1)
+        markers.update(range(start, node.end_marker + 1))
         return markers
 
     def get_markers_from_body_node(self, node):
@@ -170,24 +191,195 @@ CoverageNodeTransformer = utils.get_by_python_version(
 
 
 class CoverageInjector:
+    """
+    Injects probes to the module, every probe calls `cover` only once (until `restart`).
+    """
+
     def __init__(self):
         self.covered_nodes = set()
+        self.probes = []
+        self.probe_markers = []
 
     def inject(self, node, module_name="coverage"):
         self.covered_nodes.clear()
         self.marker_transformer = MarkerNodeTransformer()
         marker_node = self.marker_transformer.visit(node)
-        coverage_node = CoverageNodeTransformer().visit(copy.deepcopy(marker_node))
+        coverage_transformer = CoverageNodeTransformer()
+        coverage_node = coverage_transformer.visit(copy.deepcopy(marker_node))
+        self.probe_markers = coverage_transformer.probe_markers
+        self.probes = [False] * len(self.probe_markers)
         self.covered_nodes.add(coverage_node.marker)
         with utils.StdoutManager():
             return utils.create_module(
                 ast_node=coverage_node,
                 module_name=module_name,
-                module_dict={COVERAGE_SET_NAME: self.covered_nodes},
+                module_dict={COVERAGE_PROBES_NAME: self.probes, COVER_FUNCTION_NAME: self.cover},
             )
 
+    def cover(self, probe):
+        self.probes[probe] = True
+        self.covered_nodes.update(self.probe_markers[probe])
+
     def is_covered(self, child_node):
         return child_node.marker in self.covered_nodes
 
+    def restart(self):
+        # module keeps reference to the list
+        self.probes[:] = [False] * len(self.probes)
+
+    def stop(self):
+        pass
+
     def get_result(self):
         return len(self.covered_nodes), self.marker_transformer.last_marker
+
+
+class MonitoringCoverageInjector(CoverageInjector):
+    """
+    Coverage injector using `sys.monitoring` (PEP 669) instead of AST rewriting, Python 3.12+.
+
+    Module is executed as is. Line events of the module are mapped to the
+    same markers as recorded by code injected by `CoverageNodeTransformer`.
+    Every location is disabled after its first event and enabled again by
+    `restart` (before every test). All started injectors share a single tool,
+    line events are dispatched to them by the file name of the code.
+    """
+
+    # `sys.monitoring.COVERAGE_ID` or ids without predefined purpose
+    TOOL_IDS = [1, 3, 4]
+    tool_id = None
+    started_injectors = {}
+
+    def __init__(self):
+        super().__init__()
+        self.filename = None
+        self.markers_by_line = {}
+
+    @classmethod
+    def is_available(cls):
+        monitoring = getattr(sys, "monitoring", None)
+        return monitoring is not None and (
+            cls.tool_id is not None or any(monitoring.get_tool(tool_id) is None for tool_id in cls.TOOL_IDS)
+        )
+
+    def inject(self, node, module_name="coverage"):
+        self.covered_nodes.clear()
+        self.marker_transformer = MarkerNodeTransformer()
+        marker_node = self.marker_transformer.visit(node)
+        self.markers_by_line = self.get_markers_by_line(marker_node)
+        self.covered_nodes.add(marker_node.marker)
+        self.filename = module_name
+        code = compile(marker_node, self.filename, "exec")
+        self.start()
+        with utils.StdoutManager():
+            return utils.create_module_from_code(code, module_name=module_name)
+
+    def get_markers_by_line(self, node):
+        transformer = CoverageNodeTransformer()
+        coverable_nodes = tuple(transformer.get_coverable_nodes())
+        markers_by_line = {}
+        for child_node in ast.walk(node):
+            if not isinstance(child_node, coverable_nodes) or transformer.is_future_statement(child_node):
+                continue
+            markers = transformer.get_markers(child_node)
+            for line in self.get_lines(child_node):
+                markers_by_line.setdefault(line, set()).update(markers)
+        return markers_by_line
+
+    def get_lines(self, node):
+        if isinstance(node, ast.ExceptHandler):
+            # injected code is inside the handler, so it isn't covered by matching an exception only
+            return self.get_lines(node.body[0])
+        decorators = getattr(node, "decorator_list", None)
+        lines = list(range(decorators[0].lineno if decorators else node.lineno, node.lineno + 1))
+        if self.has_no_code(node):
+            # statement without bytecode is covered with the next one or with the header of its block
+            following_node = self.get_following_node(node)
+            if following_node:
+                lines += self.get_lines(following_node)
+            elif hasattr(node.parent, "lineno"):
+                lines.append(node.parent.lineno)
+        return lines
+
+    def has_no_code(self, node):
+        return isinstance(node, (ast.Global, ast.Nonlocal)) or \
+            (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant))
+
+    def get_following_node(self, node):
+        for _, value in ast.iter_fields(node.parent):
+            if isinstance(value, list):
+                for position, child_node in enumerate(value):
+                    if child_node is node:
+                        return value[position + 1] if position + 1 < len(value) else None
+        return None
+
+    def start(self):
+        if MonitoringCoverageInjector.tool_id is None:
+            monitoring = sys.monitoring
+            tool_id = next(tool_id for tool_id in self.TOOL_IDS if monitoring.get_tool(tool_id) is None)
+            monitoring.use_tool_id(tool_id, "mutpy")
+            monitoring.register_callback(tool_id, monitoring.events.LINE, MonitoringCoverageInjector.on_line)
+            monitoring.set_events(tool_id, monitoring.events.LINE)
+            MonitoringCoverageInjector.tool_id = tool_id
+        self.started_injectors[self.filename] = self
+
+    @classmethod
+    def on_line(cls, code, line_number):
+        injector = cls.started_injectors.get(code.co_filename)
+        if injector is not None:
+            injector.covered_nodes.update(injector.markers_by_line.get(line_number, ()))
+        return sys.monitoring.DISABLE
+
+    def is_started(self):
+        return self.started_injectors.get(self.filename) is self
+
+    def restart(self):
+        if self.is_started():
+            sys.monitoring.restart_events()
+
+    def stop(self):
+        if not self.is_started():
+            return
+        del self.started_injectors[self.filename]
+        if self.started_injectors:
+            return
+        monitoring = sys.monitoring
+        tool_id = MonitoringCoverageInjector.tool_id
+        monitoring.set_events(tool_id, monitoring.events.NO_EVENTS)
+        monitoring.register_callback(tool_id, monitoring.events.LINE, None)
+        monitoring.free_tool_id(tool_id)
+        MonitoringCoverageInjector.tool_id = None
+
+
+def to_bitset(positions):
+    """
+    Pack non-negative numbers into an int with bits at these positions set.
+    """
+    positions = list(positions)
+    if not positions:
+        return 0
+    bits = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+def iter_bitset(bitset):
+    """
+    Yield positions of set bits in ascending order.
+    """
+    # binary digits from the lowest bit, without "0b" prefix
+    digits = bin(bitset)[:1:-1]
+    position = digits.find("1")
+    while position != -1:
+        yield position
+        position = digits.find("1", position + 1)
+
+
+def create_coverage_injector(backend=AST_BACKEND):
+    """
+    Create coverage injector of the backend, AST injector is used if `sys.monitoring` isn't available.
+    """
+    if backend == MONITORING_BACKEND and MonitoringCoverageInjector.is_available():
+        return MonitoringCoverageInjector()
+    return CoverageInjector()
@@ -0,0 +1,101 @@
+import os
+import re
+import subprocess
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+class GitDiffException(Exception):
+
+    def __init__(self, since, message):
+        self.since = since
+        self.message = message
+
+    def __str__(self):
+        return "can't diff against {}: {}".format(self.since, self.message)
+
+
+class ChangedLines:
+    """
+    Line ranges of a single file changed since some git revision.
+    """
+
+    def __init__(self, ranges=None):
+        self.ranges = ranges or []
+
+    def __bool__(self):
+        return bool(self.ranges)
+
+    def add(self, start, end):
+        self.ranges.append((start, end))
+
+    def intersects(self, node):
+        lines = get_node_lines(node)
+        if lines is None:
+            return True
+        first, last = lines
+        return any(start <= last and first <= end for start, end in self.ranges)
+
+
+def get_node_lines(node):
+    if not hasattr(node, 'lineno'):
+        return None
+    first = node.lineno
+    for decorator in getattr(node, 'decorator_list', []):
+        first = min(first, getattr(decorator, 'lineno', first))
+    return first, getattr(node, 'end_lineno', None) or node.lineno
+
+
+class GitDiff:
+    """
+    Changes of the working tree since `since` git revision, read with local `git diff`.
+    """
+
+    def __init__(self, since, path=None):
+        self.since = since
+        path = path or '.'
+        top_level = self.git(path, 'rev-parse', '--show-toplevel').strip()
+        output = self.git(
+            path, '-c', 'core.quotepath=off', 'diff', '--no-color', '--no-ext-diff', '--unified=0',
+            '--src-prefix=a/', '--dst-prefix=b/', since, '--',
+        )
+        self.changed_files = {
+            os.path.realpath(os.path.join(top_level, file_name)): changed_lines
+            for file_name, changed_lines in parse_diff(output).items()
+        }
+
+    def git(self, path, *args):
+        try:
+            process = subprocess.run(['git'] + list(args), cwd=path, capture_output=True, text=True)
+        except OSError as error:
+            raise GitDiffException(self.since, error)
+        if process.returncode:
+            raise GitDiffException(self.since, process.stderr.strip())
+        return process.stdout
+
+    def get_changed_lines(self, file_name):
+        return self.changed_files.get(os.path.realpath(file_name), ChangedLines())
+
+
+def parse_diff(output):
+    changed_files = {}
+    changed_lines = None
+    for line in output.splitlines():
+        if line.startswith('+++ '):
+            file_name = line[len('+++ '):]
+            if file_name.startswith('b/'):
+                changed_lines = changed_files.setdefault(file_name[len('b/'):], ChangedLines())
+            else:
+                # file was deleted
+                changed_lines = None
+            continue
+        match = HUNK_HEADER.match(line)
+        if match and changed_lines is not None:
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            if count:
+                changed_lines.add(start, start + count - 1)
+            else:
+                # lines were only removed after `start` line
+                changed_lines.add(max(start, 1), max(start, 1))
+    return changed_files
@@ -0,0 +1,80 @@
+import types
+
+from mutpy import hotpatch
+
+ORIGINAL = 0
+
+
+class EquivalenceFilter(hotpatch.FunctionCompiler):
+    """
+    Finds mutants compiled to the same code as original or as another mutant
+    (trivial compiler equivalence).
+
+    Only functions containing mutations are compiled, or the whole module if
+    some mutation is outside of the function body. It has to be created
+    before mutation, as original code is compiled here.
+    """
+
+    def __init__(self, target_ast, module_name):
+        super().__init__(target_ast, module_name)
+        self.target_ast = target_ast
+        self.original_keys = {}
+        for function_node in {id(node): node for node in self.functions.values() if node is not None}.values():
+            self.original_keys[id(function_node)] = get_code_key(self.compile_function(function_node))
+        self.original_keys[None] = get_code_key(self.compile_module(target_ast))
+        self.mutant_numbers = {}
+
+    def compile_module(self, module_ast):
+        try:
+            return compile(module_ast, self.module_name, 'exec')
+        except (SyntaxError, ValueError, TypeError):
+            return None
+
+    def find_equivalent(self, number, mutations, mutant_ast):
+        """
+        Return number of the equivalent mutant (`ORIGINAL` for original code) or `None`.
+        """
+        functions = []
+        for mutation in mutations:
+            function = self.get_function(mutation.node)
+            if function is None:
+                functions = [None]
+                break
+            if function not in functions:
+                functions.append(function)
+        keys = []
+        for function in functions:
+            code = self.compile_function(function) if function else self.compile_module(mutant_ast)
+            if code is None:
+                # e.g. incompetent mutant, it will be reported as usual
+                return None
+            keys.append((id(function) if function else None, get_code_key(code)))
+        if all(self.original_keys[function_id] == key for function_id, key in keys):
+            return ORIGINAL
+        mutant_key = tuple(keys)
+        if mutant_key in self.mutant_numbers:
+            return self.mutant_numbers[mutant_key]
+        self.mutant_numbers[mutant_key] = number
+        return None
+
+
+def get_code_key(code):
+    if code is None:
+        return None
+    return (
+        code.co_code,
+        code.co_flags,
+        code.co_argcount,
+        code.co_posonlyargcount,
+        code.co_kwonlyargcount,
+        code.co_names,
+        code.co_varnames,
+        code.co_freevars,
+        code.co_cellvars,
+        getattr(code, 'co_exceptiontable', None),
+        tuple(
+            # type is a part of key, because e.g. 1 == 1.0 == True
+            get_code_key(const) if isinstance(const, types.CodeType) else (type(const), repr(const))
+            for const in code.co_consts
+        ),
+    )
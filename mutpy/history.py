@@ -0,0 +1,56 @@
+import json
+import os
+from collections import Counter
+
+
+class KillHistory:
+    """
+    Remembers which tests killed mutants of every node and operator.
+
+    It is notified as a view, so it learns from previous runs (if saved to
+    a file) and from mutants already finished in the current run. Tests which
+    killed mutants of the same node with the same operator come first, then
+    tests which killed other mutants of the node and then all other killers.
+    """
+
+    def __init__(self, file_name=None):
+        self.file_name = file_name
+        self.kills = {}
+        self.current_mutations = None
+        if file_name and os.path.exists(file_name):
+            with open(file_name) as history_file:
+                self.kills = {key: Counter(killers) for key, killers in json.load(history_file).items()}
+
+    def get_likely_killers(self, module, mutations):
+        operator_kills = Counter()
+        node_kills = Counter()
+        for mutation in mutations:
+            node_key, operator_key = get_keys(module, mutation)
+            operator_kills.update(self.kills.get(operator_key, {}))
+            node_kills.update(self.kills.get(node_key, {}))
+        all_kills = self.kills.get('', {})
+        return sorted(
+            all_kills,
+            key=lambda killer: (operator_kills[killer], node_kills[killer], all_kills[killer]),
+            reverse=True,
+        )
+
+    def mutation(self, number, mutations, module, mutant):
+        self.current_mutations = [get_keys(module, mutation) for mutation in mutations]
+
+    def killed(self, time, killer, *args, **kwargs):
+        keys = {''}
+        for node_key, operator_key in self.current_mutations:
+            keys |= {node_key, operator_key}
+        for key in keys:
+            self.kills.setdefault(key, Counter())[killer] += 1
+
+    def end(self, score, duration):
+        if self.file_name:
+            with open(self.file_name, 'w') as history_file:
+                json.dump(self.kills, history_file, indent=1, sort_keys=True)
+
+
+def get_keys(module, mutation):
+    node_key = '{}:{}'.format(module.__name__, getattr(mutation.node, 'lineno', None))
+    return node_key, '{}:{}'.format(node_key, mutation.operator.name())
@@ -0,0 +1,223 @@
+import ast
+import copy
+import marshal
+import types
+
+from mutpy import utils
+
+
+class FunctionPatch:
+    """
+    Code of a single mutated function or method, swapped into its original function object.
+    """
+
+    def __init__(self, class_names, name, first_lineno, code):
+        self.class_names = class_names
+        self.name = name
+        self.first_lineno = first_lineno
+        self.code = marshal.dumps(code)
+
+    def find_function(self, module):
+        namespace = module
+        for class_name in self.class_names:
+            namespace = getattr(namespace, '__dict__', {}).get(class_name)
+        for function in iter_functions(getattr(namespace, '__dict__', {}).get(self.name)):
+            if function.__code__.co_name == self.name and function.__code__.co_firstlineno == self.first_lineno:
+                return function
+        return None
+
+
+def iter_functions(value):
+    if isinstance(value, types.FunctionType):
+        yield value
+    elif isinstance(value, (staticmethod, classmethod)):
+        yield from iter_functions(value.__func__)
+    elif isinstance(value, property):
+        for accessor in [value.fget, value.fset, value.fdel]:
+            yield from iter_functions(accessor)
+
+
+class PatchLoader:
+    """
+    Keeps original modules loaded by a worker and patches their functions for one mutant at a time.
+
+    Module is executed only once per worker (from original code sent with
+    the task), not by the parent which already ran tests with it. Code of
+    patched functions, module globals and contents of module level
+    containers (e.g. caches) are restored after the mutant, but other
+    objects changed in place (e.g. class attributes) are shared by mutants
+    run in the same process.
+    """
+
+    restored_container_types = (dict, list, set, bytearray)
+
+    def __init__(self):
+        self.modules = {}
+        self.patched_module = None
+        self.original_globals = None
+        self.original_contents = []
+        self.original_codes = []
+
+    def load(self, module_name, marshalled_code):
+        if module_name not in self.modules:
+            self.modules[module_name] = utils.create_module_from_code(marshal.loads(marshalled_code), module_name)
+        return self.modules[module_name]
+
+    def activate(self, task):
+        module = self.load(task.module_name, task.code)
+        functions = [patch.find_function(module) for patch in task.function_patches]
+        original_codes = [(function, function.__code__) for function in functions]
+        self.patched_module = module
+        self.original_globals = dict(module.__dict__)
+        self.original_contents = [
+            (value, copy.copy(value)) for name, value in module.__dict__.items()
+            if not name.startswith('__') and isinstance(value, self.restored_container_types)
+        ]
+        self.original_codes = original_codes
+        for function, patch in zip(functions, task.function_patches):
+            function.__code__ = marshal.loads(patch.code)
+        return module
+
+    def restore(self):
+        if self.patched_module is None:
+            return
+        for function, code in self.original_codes:
+            function.__code__ = code
+        module_dict = self.patched_module.__dict__
+        for name in set(module_dict) - set(self.original_globals):
+            # special names (e.g. `__file__`) are set by injection to tests
+            if not name.startswith('__'):
+                del module_dict[name]
+        module_dict.update(self.original_globals)
+        for container, contents in self.original_contents:
+            if isinstance(container, (dict, set)):
+                container.clear()
+                container.update(contents)
+            else:
+                container[:] = contents
+        self.patched_module = None
+        self.original_globals = None
+        self.original_contents = []
+        self.original_codes = []
+
+
+class FunctionCompiler:
+    """
+    Compiles single functions and methods of a module without the rest of it.
+
+    Only functions defined directly in module or class body are compiled,
+    for nodes inside the function body (so that nothing but its code object
+    depends on them). Target AST is indexed before mutation, because mutated
+    nodes are not a part of the tree anymore.
+    """
+
+    def __init__(self, target_ast, module_name):
+        self.module_name = module_name
+        self.functions = {}
+        self.scopes = {}
+        self.future_imports = [
+            node for node in target_ast.body if isinstance(node, ast.ImportFrom) and node.module == '__future__'
+        ]
+        self.index(target_ast)
+
+    def index(self, target_ast):
+        # (node, compiled function with node in its body, classes of top level scope or None if not top level)
+        stack = [(target_ast, None, [])]
+        while stack:
+            node, function, classes = stack.pop()
+            self.functions[id(node)] = function
+            for field, value in ast.iter_fields(node):
+                for child in value if isinstance(value, list) else [value]:
+                    if not isinstance(child, ast.AST):
+                        continue
+                    if classes is None or field != 'body':
+                        stack.append((child, function, None))
+                    elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        self.scopes[id(node)] = classes
+                        stack.append((child, node, None))
+                    elif isinstance(node, ast.Module):
+                        stack.append((child, None, classes))
+                    elif isinstance(node, ast.ClassDef):
+                        stack.append((child, None, classes + [node]))
+                    else:
+                        stack.append((child, None, None))
+
+    def get_function(self, node):
+        return self.functions.get(id(node))
+
+    def get_class_names(self, function_node):
+        return [class_node.name for class_node in self.scopes[id(function_node)]]
+
+    def compile_function(self, function_node):
+        wrapper = function_node
+        for class_node in reversed(self.scopes[id(function_node)]):
+            # methods are compiled in class of the same name, because of name mangling and `__class__` cell
+            class_wrapper = copy.copy(class_node)
+            class_wrapper.body = [wrapper]
+            class_wrapper.decorator_list = []
+            wrapper = class_wrapper
+        try:
+            module_ast = ast.Module(body=self.future_imports + [wrapper], type_ignores=[])
+            module_code = compile(module_ast, self.module_name, 'exec')
+        except (SyntaxError, ValueError, TypeError):
+            return None
+        return find_code(module_code, function_node.name, get_first_lineno(function_node))
+
+
+class FunctionPatcher(FunctionCompiler):
+    """
+    Creates patches of functions and methods containing mutations of a loaded module.
+
+    Patches can't be created (`None` is returned) for mutations outside of
+    compiled functions, which have to be executed with a full mutant module.
+    Workers load the module from `marshalled_original_code`, which is
+    compiled only once, before target AST is mutated (see `PatchLoader`).
+    """
+
+    def __init__(self, module, target_ast):
+        super().__init__(target_ast, module.__name__)
+        self.module = module
+        self.marshalled_original_code = marshal.dumps(compile(target_ast, module.__name__, 'exec'))
+
+    def create_patches(self, mutations):
+        functions = []
+        for mutation in mutations:
+            function = self.get_function(mutation.node)
+            if function is None:
+                return None
+            if function not in functions:
+                functions.append(function)
+        patches = []
+        for function in functions:
+            patch = self.create_patch(function)
+            if patch is None:
+                return None
+            patches.append(patch)
+        return patches
+
+    def create_patch(self, function_node):
+        code = self.compile_function(function_node)
+        if code is None:
+            return None
+        patch = FunctionPatch(
+            self.get_class_names(function_node), function_node.name, get_first_lineno(function_node), code,
+        )
+        function = patch.find_function(self.module)
+        if function is None or function.__code__.co_freevars != code.co_freevars:
+            return None
+        return patch
+
+
+def get_first_lineno(function_node):
+    return min([function_node.lineno] + [decorator.lineno for decorator in function_node.decorator_list])
+
+
+def find_code(code, name, first_lineno):
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            if const.co_name == name and const.co_firstlineno == first_lineno:
+                return const
+            found = find_code(const, name, first_lineno)
+            if found:
+                return found
+    return None
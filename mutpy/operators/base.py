@@ -1,7 +1,9 @@
 import ast
-import copy
+import bisect
+import functools
 import re
 import sys
+from contextlib import ExitStack, contextmanager
 
 from mutpy import utils
 
@@ -11,15 +13,17 @@ class MutationResign(Exception):
 
 
 class Mutation:
-    def __init__(self, operator, node, visitor=None):
+    def __init__(self, operator, node, visitor=None, descriptor=None):
         self.operator = operator
         self.node = node
         self.visitor = visitor
+        self.descriptor = descriptor
 
 
 def copy_node(mutate):
+    @functools.wraps(mutate)
     def f(self, node):
-        copied_node = copy.deepcopy(node, memo={
+        copied_node = utils.copy_ast(node, memo={
             id(node.parent): node.parent,
         })
         return mutate(self, copied_node)
@@ -28,80 +32,24 @@ def copy_node(mutate):
 
 
 class MutationOperator:
-    def mutate(self, node, to_mutate=None, sampler=None, coverage_injector=None, module=None, only_mutation=None):
+    def mutate(self, node, to_mutate=None, sampler=None, coverage_injector=None, module=None, changed_lines=None):
+        walker = MutationWalker([self])
+        yield from walker.mutate(node, to_mutate, sampler, coverage_injector, module, changed_lines)
+
+    def prepare(self, to_mutate=None, sampler=None, coverage_injector=None, module=None, changed_lines=None):
         self.to_mutate = to_mutate
         self.sampler = sampler
-        self.only_mutation = only_mutation
         self.coverage_injector = coverage_injector
+        self.changed_lines = changed_lines
         self.module = module
-        for new_node in self.visit(node):
-            yield Mutation(operator=self.__class__, node=self.current_node, visitor=self.visitor), new_node
 
-    def visit(self, node):
+    def is_skipped(self, node):
+        """
+        Check if node and its subtree shouldn't be mutated (by `notmutate`, coverage or changed lines).
+        """
         if self.has_notmutate(node) or (self.coverage_injector and not self.coverage_injector.is_covered(node)):
-            return
-        if self.only_mutation and self.only_mutation.node != node and self.only_mutation.node not in node.children:
-            return
-        self.fix_lineno(node)
-        visitors = self.find_visitors(node)
-        if visitors:
-            for visitor in visitors:
-                try:
-                    if self.sampler and not self.sampler.is_mutation_time():
-                        raise MutationResign
-                    if self.only_mutation and \
-                            (self.only_mutation.node != node or self.only_mutation.visitor != visitor.__name__):
-                        raise MutationResign
-                    new_node = visitor(node)
-                    self.visitor = visitor.__name__
-                    self.current_node = node
-                    self.fix_node_internals(node, new_node)
-                    ast.fix_missing_locations(new_node)
-                    yield new_node
-                except MutationResign:
-                    pass
-                finally:
-                    for new_node in self.generic_visit(node):
-                        yield new_node
-        else:
-            for new_node in self.generic_visit(node):
-                yield new_node
-
-    def generic_visit(self, node):
-        for field, old_value in ast.iter_fields(node):
-            if isinstance(old_value, list):
-                generator = self.generic_visit_list(old_value)
-            elif isinstance(old_value, ast.AST):
-                generator = self.generic_visit_real_node(node, field, old_value)
-            else:
-                generator = []
-
-            for _ in generator:
-                yield node
-
-    def generic_visit_list(self, old_value):
-        old_values_copy = old_value[:]
-        for position, value in enumerate(old_values_copy):
-            if isinstance(value, ast.AST):
-                for new_value in self.visit(value):
-                    if not isinstance(new_value, ast.AST):
-                        old_value[position:position + 1] = new_value
-                    elif value is None:
-                        del old_value[position]
-                    else:
-                        old_value[position] = new_value
-
-                    yield
-                    old_value[:] = old_values_copy
-
-    def generic_visit_real_node(self, node, field, old_value):
-        for new_node in self.visit(old_value):
-            if new_node is None:
-                delattr(node, field)
-            else:
-                setattr(node, field, new_node)
-            yield
-            setattr(node, field, old_value)
+            return True
+        return self.changed_lines is not None and not self.changed_lines.intersects(node)
 
     def has_notmutate(self, node):
         try:
@@ -121,8 +69,10 @@ class MutationOperator:
 
     def fix_node_internals(self, old_node, new_node):
         if not hasattr(new_node, 'parent'):
-            new_node.children = old_node.children
             new_node.parent = old_node.parent
+            if hasattr(old_node, 'tree_index'):
+                new_node.tree_index = old_node.tree_index
+                new_node.tree_end = old_node.tree_end
         if not hasattr(new_node, 'lineno') and hasattr(old_node, 'lineno'):
             new_node.lineno = old_node.lineno
         if sys.version_info[:2] >= (3, 9):
@@ -132,12 +82,24 @@ class MutationOperator:
             new_node.marker = old_node.marker
 
     def find_visitors(self, node):
-        method_prefix = 'mutate_' + node.__class__.__name__
-        return self.getattrs_like(method_prefix)
+        return [getattr(self, name) for name in self.get_visitor_names().get(node.__class__.__name__, ())]
 
-    def getattrs_like(ob, attr_like):
-        pattern = re.compile(attr_like + r"($|(_\w+)+$)")
-        return [getattr(ob, attr) for attr in dir(ob) if pattern.match(attr)]
+    @classmethod
+    def get_visitor_names(cls):
+        """
+        Return names of visitors by node class name, e.g. `mutate_Gt` and `mutate_Gt_to_GtE` for `Gt`.
+
+        Visitors are found once per operator class, in alphabetical order.
+        """
+        if '_visitor_names' not in cls.__dict__:
+            visitor_names = {}
+            pattern = re.compile(r"mutate_([^_]+)($|(_\w+)+$)")
+            for attr in dir(cls):
+                match = pattern.match(attr)
+                if match:
+                    visitor_names.setdefault(match.group(1), []).append(attr)
+            cls._visitor_names = visitor_names
+        return cls._visitor_names
 
     def set_lineno(self, node, lineno):
         for n in ast.walk(node):
@@ -162,6 +124,241 @@ class MutationOperator:
         return ' '.join(map(str.lower, (re.split('([A-Z][a-z]*)', cls.__name__)[1::2])))
 
 
+class MutationDescriptor:
+    """
+    Picklable description of a single mutation, which can be applied later with `MutationWalker.apply`.
+
+    Node is identified by its path from the module node, i.e. list of
+    `(field, position)` pairs (position is `None` if field isn't a list).
+    """
+
+    def __init__(self, module_name, path, operator, visitor, lineno=None, end_lineno=None):
+        self.module_name = module_name
+        self.path = path
+        self.operator = operator
+        self.visitor = visitor
+        self.lineno = lineno
+        self.end_lineno = end_lineno
+
+    def key(self):
+        return self.module_name, tuple(self.path), self.operator, self.visitor
+
+    def __eq__(self, other):
+        return isinstance(other, MutationDescriptor) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return '<{} {}:{} {}>'.format(self.operator, self.module_name, self.lineno, self.visitor)
+
+
+class IndexedNode:
+
+    def __init__(self, index, node, parent, field, position, parent_indexed_node=None):
+        self.index = index
+        self.end = index
+        self.node = node
+        self.parent = parent
+        self.field = field
+        self.position = position
+        self.parent_indexed_node = parent_indexed_node
+
+    def get_path(self):
+        path = []
+        indexed_node = self
+        while indexed_node.parent_indexed_node:
+            path.append((indexed_node.field, indexed_node.position))
+            indexed_node = indexed_node.parent_indexed_node
+        return list(reversed(path))
+
+
+class MutationWalker:
+    """
+    Generates mutations of many operators with a single walk over the tree.
+
+    Nodes which can be mutated are indexed by class during the walk, then
+    every operator visits only nodes of classes with its visitors. Mutations
+    are generated in the same order as by `MutationOperator.mutate` of every
+    operator (one after another) and every mutant is the target tree with a
+    single node replaced (and restored in its parent after the mutant is
+    used). Tree is walked with explicit stacks instead of recursion, so
+    deeply nested code doesn't hit the recursion limit.
+
+    Mutations can also be only described (`describe`) and applied later to
+    the same tree or to a tree parsed from the same source (`apply`).
+    """
+
+    def __init__(self, operators):
+        self.operators = operators
+        self.operators_by_name = {operator.name(): operator for operator in operators}
+        # plain operator checks skipped nodes and fixes line numbers for all operators
+        self.base_operator = MutationOperator()
+
+    def mutate(self, node, to_mutate=None, sampler=None, coverage_injector=None, module=None, changed_lines=None):
+        for operator, indexed_node, visitor, new_node in self.generate(node, to_mutate, sampler, coverage_injector,
+                                                                       module, changed_lines):
+            mutation = Mutation(operator=operator.__class__, node=indexed_node.node, visitor=visitor.__name__)
+            with replace_node(indexed_node, new_node) as mutant:
+                yield mutation, mutant or node
+
+    def describe(self, node, to_mutate=None, sampler=None, coverage_injector=None, module=None, changed_lines=None):
+        """
+        Generate mutations with descriptors, without mutants.
+        """
+        module_name = module.__name__ if module else None
+        for operator, indexed_node, visitor, _ in self.generate(node, to_mutate, sampler, coverage_injector, module,
+                                                                changed_lines):
+            descriptor = MutationDescriptor(
+                module_name=module_name,
+                path=indexed_node.get_path(),
+                operator=operator.name(),
+                visitor=visitor.__name__,
+                lineno=getattr(indexed_node.node, 'lineno', None),
+                end_lineno=getattr(indexed_node.node, 'end_lineno', None),
+            )
+            yield Mutation(operator=operator.__class__, node=indexed_node.node, visitor=visitor.__name__,
+                           descriptor=descriptor)
+
+    @contextmanager
+    def apply(self, node, descriptors, module=None):
+        """
+        Apply described mutations to the tree, yield mutations and mutant, and restore the tree.
+
+        Mutated nodes can't be descendants of each other.
+        """
+        mutated_nodes = []
+        for descriptor in descriptors:
+            indexed_node = self.find(node, descriptor.path)
+            operator = self.operators_by_name[descriptor.operator]
+            operator.prepare(module=module)
+            visitor = getattr(operator, descriptor.visitor)
+            new_node = self.create_mutated_node(operator, indexed_node.node, visitor)
+            mutation = Mutation(operator=operator.__class__, node=indexed_node.node, visitor=visitor.__name__,
+                                descriptor=descriptor)
+            mutated_nodes.append((mutation, indexed_node, new_node))
+        mutant = node
+        with ExitStack() as stack:
+            # from the last node, so positions of next nodes in the same list stay valid
+            for _, indexed_node, new_node in sorted(mutated_nodes, key=lambda item: item[0].descriptor.path,
+                                                    reverse=True):
+                mutant = stack.enter_context(replace_node(indexed_node, new_node)) or mutant
+            yield [mutation for mutation, _, _ in mutated_nodes], mutant
+
+    def find(self, root, path):
+        indexed_node = IndexedNode(0, root, None, None, None)
+        for field, position in path:
+            value = getattr(indexed_node.node, field)
+            child = value if position is None else value[position]
+            self.base_operator.fix_lineno(child)
+            indexed_node = IndexedNode(0, child, indexed_node.node, field, position, indexed_node)
+        return indexed_node
+
+    def generate(self, node, to_mutate=None, sampler=None, coverage_injector=None, module=None, changed_lines=None):
+        for operator in [self.base_operator] + self.operators:
+            operator.prepare(to_mutate, sampler, coverage_injector, module, changed_lines=changed_lines)
+        nodes_by_class = self.index(node)
+        for operator in self.operators:
+            indexed_nodes = []
+            for class_name in operator.get_visitor_names():
+                indexed_nodes += nodes_by_class.get(class_name, [])
+            indexed_nodes.sort(key=lambda indexed_node: indexed_node.index)
+            yield from self.visit(operator, indexed_nodes)
+
+    def index(self, root):
+        nodes_by_class = {}
+        last_index = -1
+        stack = [(root, None, None, None, None)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, IndexedNode):
+                # all descendants are already indexed
+                item.end = last_index
+                continue
+            node, parent, field, position, parent_indexed_node = item
+            if self.base_operator.is_skipped(node):
+                continue
+            self.base_operator.fix_lineno(node)
+            last_index += 1
+            indexed_node = IndexedNode(last_index, node, parent, field, position, parent_indexed_node)
+            nodes_by_class.setdefault(node.__class__.__name__, []).append(indexed_node)
+            stack.append(indexed_node)
+            children = []
+            for child_field, value in ast.iter_fields(node):
+                if isinstance(value, list):
+                    children += [
+                        (child, node, child_field, child_position, indexed_node)
+                        for child_position, child in enumerate(value) if isinstance(child, ast.AST)
+                    ]
+                elif isinstance(value, ast.AST):
+                    children.append((value, node, child_field, None, indexed_node))
+            stack.extend(reversed(children))
+        return nodes_by_class
+
+    def visit(self, operator, indexed_nodes):
+        indexes = [indexed_node.index for indexed_node in indexed_nodes]
+        # (start, stop) range of indexed nodes or (indexed node, visitor) mutation
+        stack = [(0, len(indexed_nodes))]
+        while stack:
+            first, second = stack.pop()
+            if isinstance(first, IndexedNode):
+                indexed_node, visitor = first, second
+                try:
+                    if operator.sampler and not operator.sampler.is_mutation_time():
+                        raise MutationResign
+                    new_node = self.create_mutated_node(operator, indexed_node.node, visitor)
+                except MutationResign:
+                    continue
+                yield operator, indexed_node, visitor, new_node
+                continue
+            start, stop = first, second
+            if start >= stop:
+                continue
+            indexed_node = indexed_nodes[start]
+            subtree_stop = bisect.bisect_right(indexes, indexed_node.end, start + 1, stop)
+            stack.append((subtree_stop, stop))
+            # like in `MutationOperator.visit`, subtree is visited after every visitor of the node
+            for visitor in reversed(operator.find_visitors(indexed_node.node)):
+                stack.append((start + 1, subtree_stop))
+                stack.append((indexed_node, visitor))
+
+    def create_mutated_node(self, operator, node, visitor):
+        new_node = visitor(node)
+        operator.fix_node_internals(node, new_node)
+        utils.fix_missing_locations(new_node)
+        return new_node
+
+
+@contextmanager
+def replace_node(indexed_node, new_node):
+    """
+    Replace node in its parent and yield `None`, or yield new node if node has no parent.
+    """
+    parent, field, position = indexed_node.parent, indexed_node.field, indexed_node.position
+    if parent is None:
+        yield new_node
+    elif position is None:
+        if new_node is None:
+            delattr(parent, field)
+        else:
+            setattr(parent, field, new_node)
+        try:
+            yield None
+        finally:
+            setattr(parent, field, indexed_node.node)
+    else:
+        values = getattr(parent, field)
+        old_values = values[:]
+        if isinstance(new_node, ast.AST):
+            values[position] = new_node
+        else:
+            values[position:position + 1] = new_node
+        try:
+            yield None
+        finally:
+            values[:] = old_values
+
+
 class AbstractUnaryOperatorDeletion(MutationOperator):
     def mutate_UnaryOp(self, node):
         if isinstance(node.op, self.get_operator_type()):
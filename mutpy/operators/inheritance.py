@@ -42,6 +42,7 @@ class HidingVariableDeletion(AbstractOverriddenElementModification):
         else:
             raise MutationResign()
 
+    @copy_node
     def mutate_unpack(self, node):
         target = node.targets[0]
         value = node.value
@@ -0,0 +1,165 @@
+import ast
+import copy
+import hashlib
+import marshal
+from contextlib import contextmanager
+
+from mutpy import utils
+
+MUTANT_SWITCH_NAME = '__mutpy_mutant__'
+
+
+class MutantSchema:
+    """
+    All mutants of a single module compiled into one instrumented module.
+
+    Every statement containing a mutation is guarded by a switch on the
+    `__mutpy_mutant__` global, e.g. mutants 3 and 7 of `return x + y` become:
+
+        if __mutpy_mutant__ == 3:
+            return x - y
+        elif __mutpy_mutant__ == 7:
+            return x * y
+        else:
+            return x + y
+
+    Mutants have to be added while they are applied to the target AST (i.e.
+    directly from the mutant generator). Only copies of the mutated
+    statements are kept, so the mutant AST can be recreated later with `apply`.
+    """
+
+    def __init__(self, target_ast):
+        self.target_ast = target_ast
+        self.locations = get_statement_locations(target_ast)
+        self.mutants = []
+        self.marshalled_code = None
+        self.key = None
+        self.module = None
+
+    def add(self, mutations):
+        statements = []
+        for mutation in mutations:
+            statement = get_statement(mutation.node)
+            if statement not in statements:
+                statements.append(statement)
+        patches = []
+        for statement in statements:
+            if any(ancestor in statements for ancestor in get_ancestors(statement)):
+                # mutated statement is already a part of mutated outer statement
+                continue
+            parent, field, index = self.locations[id(statement)]
+            mutated_statement = getattr(parent, field)[index]
+            patches.append((statement, copy.deepcopy(mutated_statement, memo={id(parent): parent})))
+        self.mutants.append((mutations, patches))
+        return len(self.mutants)
+
+    @contextmanager
+    def apply(self, mutant_id):
+        _, patches = self.mutants[mutant_id - 1]
+        for statement, mutated_statement in patches:
+            parent, field, index = self.locations[id(statement)]
+            getattr(parent, field)[index] = mutated_statement
+        try:
+            yield self.target_ast
+        finally:
+            for statement, _ in patches:
+                parent, field, index = self.locations[id(statement)]
+                getattr(parent, field)[index] = statement
+
+    def iter_mutants(self):
+        for mutant_id, (mutations, _) in enumerate(self.mutants, 1):
+            with self.apply(mutant_id) as mutant_ast:
+                yield mutations, mutant_ast
+
+    def create_schema_ast(self):
+        memo = {}
+        schema_ast = copy.deepcopy(self.target_ast, memo)
+        switches = {}
+        for mutant_id, (_, patches) in enumerate(self.mutants, 1):
+            for statement, mutated_statement in patches:
+                switches.setdefault(id(statement), (statement, []))[1].append((mutant_id, mutated_statement))
+        for statement, branches in switches.values():
+            parent, field, index = self.locations[id(statement)]
+            getattr(memo[id(parent)], field)[index] = create_switch(memo[id(statement)], branches)
+        return ast.fix_missing_locations(schema_ast)
+
+    def compile(self, module_name):
+        code = compile(self.create_schema_ast(), module_name, 'exec')
+        self.module = SchemaModule(module_name, code)
+        self.marshalled_code = marshal.dumps(code)
+        self.key = hashlib.sha1(self.marshalled_code).hexdigest()
+
+
+def get_statement(node):
+    while not isinstance(node, ast.stmt):
+        node = node.parent
+    return node
+
+
+def get_ancestors(node):
+    while getattr(node, 'parent', None) is not None:
+        node = node.parent
+        yield node
+
+
+def get_statement_locations(tree):
+    locations = {}
+    for node in ast.walk(tree):
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                for index, item in enumerate(value):
+                    if isinstance(item, ast.stmt):
+                        locations[id(item)] = (node, field, index)
+    return locations
+
+
+def create_switch(statement, branches):
+    orelse = [statement]
+    for mutant_id, mutated_statement in reversed(branches):
+        switch = ast.If(
+            test=ast.Compare(
+                left=ast.Name(id=MUTANT_SWITCH_NAME, ctx=ast.Load()),
+                ops=[ast.Eq()],
+                comparators=[ast.Constant(value=mutant_id)],
+            ),
+            body=[mutated_statement],
+            orelse=orelse,
+        )
+        orelse = [ast.copy_location(switch, statement)]
+    return orelse[0]
+
+
+class SchemaModule:
+    """
+    Compiled schema module which activates mutants by setting the switch.
+
+    Every mutant is executed in a fresh module, so that no state (e.g.
+    mutable globals) is shared by mutants, but the code is compiled only once.
+    """
+
+    def __init__(self, module_name, code):
+        self.module_name = module_name
+        self.code = code
+
+    def activate(self, mutant_id):
+        return utils.create_module_from_code(self.code, self.module_name, {MUTANT_SWITCH_NAME: mutant_id})
+
+
+class SchemaLoader:
+    """
+    Keeps the last schema module loaded by a worker.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.schema_module = None
+
+    def load(self, module_name, marshalled_code, key):
+        if key != self.key:
+            self.schema_module = None
+            self.schema_module = SchemaModule(module_name, marshal.loads(marshalled_code))
+            self.key = key
+        return self.schema_module
+
+    def activate(self, task):
+        return self.load(task.module_name, task.code, task.schema_key).activate(task.mutant_id)
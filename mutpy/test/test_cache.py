@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+from mutpy import cache, operators, utils
+from mutpy.test_runners.base import SerializableMutationTestResult
+
+
+class MutationCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_file = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        self.cache_file.close()
+        os.remove(self.cache_file.name)
+
+    def tearDown(self):
+        if os.path.exists(self.cache_file.name):
+            os.remove(self.cache_file.name)
+
+    @staticmethod
+    def create_result(is_incompetent=False, is_survived=False):
+        return SerializableMutationTestResult(
+            is_incompetent=is_incompetent,
+            is_survived=is_survived,
+            killer='test_mul',
+            exception_traceback='AssertionError',
+            exception=None,
+            tests_run=2,
+        )
+
+    def test_get_if_empty(self):
+        mutation_cache = cache.MutationCache(self.cache_file.name)
+
+        self.assertIsNone(mutation_cache.get('key'))
+
+    def test_save_and_load(self):
+        mutation_cache = cache.MutationCache(self.cache_file.name)
+        mutation_cache.set('killed', self.create_result(), 0.5)
+        mutation_cache.set('survived', self.create_result(is_survived=True), 0.25)
+        mutation_cache.save()
+
+        mutation_cache = cache.MutationCache(self.cache_file.name)
+        killed_result, killed_duration = mutation_cache.get('killed')
+        survived_result, survived_duration = mutation_cache.get('survived')
+
+        self.assertEqual(killed_result, self.create_result())
+        self.assertEqual(killed_duration, 0.5)
+        self.assertEqual(survived_result, self.create_result(is_survived=True))
+        self.assertEqual(survived_duration, 0.25)
+
+    def test_timeout_and_incompetent_not_cached(self):
+        mutation_cache = cache.MutationCache(self.cache_file.name)
+        mutation_cache.set('timeout', None, 1)
+        mutation_cache.set('incompetent', self.create_result(is_incompetent=True), 1)
+        mutation_cache.save()
+
+        mutation_cache = cache.MutationCache(self.cache_file.name)
+
+        self.assertIsNone(mutation_cache.get('timeout'))
+        self.assertIsNone(mutation_cache.get('incompetent'))
+
+    def test_unused_entries_kept(self):
+        mutation_cache = cache.MutationCache(self.cache_file.name)
+        mutation_cache.set('used', self.create_result(), 1)
+        mutation_cache.set('unused', self.create_result(), 1)
+        mutation_cache.save()
+        mutation_cache = cache.MutationCache(self.cache_file.name)
+        mutation_cache.get('used')
+        mutation_cache.set('new', self.create_result(is_survived=True), 1)
+        mutation_cache.save()
+
+        mutation_cache = cache.MutationCache(self.cache_file.name)
+
+        self.assertIsNotNone(mutation_cache.get('used'))
+        self.assertIsNotNone(mutation_cache.get('unused'))
+        self.assertIsNotNone(mutation_cache.get('new'))
+
+
+class GetMutantKeyTest(unittest.TestCase):
+
+    @staticmethod
+    def get_keys(source, test_hashes=('test_mul',)):
+        target_ast = utils.create_ast(source)
+        return [
+            cache.get_mutant_key('target', [mutation], test_hashes)
+            for mutation, _ in operators.ArithmeticOperatorReplacement().mutate(target_ast)
+        ]
+
+    def test_keys_of_mutants_differ(self):
+        keys = self.get_keys(utils.f("""
+        def mul(x):
+            return x * x + 1
+        """))
+
+        self.assertEqual(len(keys), len(set(keys)))
+
+    def test_key_not_changed_if_function_moved(self):
+        keys = self.get_keys(utils.f("""
+        def mul(x):
+            return x * x
+        """))
+        moved_keys = self.get_keys(utils.f("""
+        def add(x):
+            return x + x
+
+        def mul(x):
+            return x * x
+        """))
+
+        self.assertTrue(set(keys) < set(moved_keys))
+
+    def test_key_changed_if_function_changed(self):
+        keys = self.get_keys('def mul(x): return x * x')
+        changed_keys = self.get_keys('def mul(x): return x * x * 1')
+
+        self.assertTrue(set(keys).isdisjoint(changed_keys))
+
+    def test_key_changed_if_tests_changed(self):
+        keys = self.get_keys('def mul(x): return x * x')
+        changed_keys = self.get_keys('def mul(x): return x * x', test_hashes=('test_mul_changed',))
+
+        self.assertTrue(set(keys).isdisjoint(changed_keys))
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import types
+import unittest
+
+from mutpy import checkpoint, operators, utils
+
+
+class CheckpointJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.journal_file = tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False)
+        self.journal_file.close()
+        self.module = types.ModuleType('target')
+        target_ast = utils.create_ast('x = 1 + 2 - 3')
+        self.mutations = [
+            [mutation] for mutation, _ in operators.ArithmeticOperatorReplacement().mutate(target_ast)
+        ]
+
+    def tearDown(self):
+        os.remove(self.journal_file.name)
+
+    def write_journal(self):
+        journal = checkpoint.CheckpointJournal(self.journal_file.name)
+        journal.mutation(1, self.mutations[0], self.module, None)
+        journal.killed(0.5, 'test_add', 'AssertionError', 2)
+        journal.mutation(2, self.mutations[0], self.module, None)
+        journal.timeout(1.0)
+        journal.end(None, 1.5)
+
+    def test_resume(self):
+        self.write_journal()
+
+        journal = checkpoint.CheckpointJournal(self.journal_file.name, resume=True)
+        killed_result, killed_duration = journal.get(1, self.module, self.mutations[0])
+        timeout_result, timeout_duration = journal.get(2, self.module, self.mutations[0])
+
+        self.assertFalse(killed_result.is_survived)
+        self.assertEqual(killed_result.killer, 'test_add')
+        self.assertEqual(killed_result.tests_run, 2)
+        self.assertEqual(killed_duration, 0.5)
+        self.assertIsNone(timeout_result)
+        self.assertEqual(timeout_duration, 1.0)
+        self.assertIsNone(journal.get(3, self.module, self.mutations[0]))
+
+    def test_new_journal_overwrites_old_one(self):
+        self.write_journal()
+
+        journal = checkpoint.CheckpointJournal(self.journal_file.name)
+
+        self.assertIsNone(journal.get(1, self.module, self.mutations[0]))
+
+    def test_different_mutant_not_resumed(self):
+        self.write_journal()
+
+        journal = checkpoint.CheckpointJournal(self.journal_file.name, resume=True)
+
+        self.assertIsNone(journal.get(1, self.module, self.mutations[1]))
+
+    def test_incomplete_line_skipped(self):
+        self.write_journal()
+        with open(self.journal_file.name) as journal_file:
+            first_line, second_line = journal_file.readlines()
+        with open(self.journal_file.name, 'w') as journal_file:
+            journal_file.write(first_line + second_line[:10])
+
+        journal = checkpoint.CheckpointJournal(self.journal_file.name, resume=True)
+        journal.mutation(2, self.mutations[0], self.module, None)
+        journal.survived(0.1, 2)
+        journal.end(None, 0.1)
+        journal = checkpoint.CheckpointJournal(self.journal_file.name, resume=True)
+
+        self.assertIsNotNone(journal.get(1, self.module, self.mutations[0]))
+        self.assertTrue(journal.get(2, self.module, self.mutations[0])[0].is_survived)
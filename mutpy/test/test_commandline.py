@@ -1,5 +1,15 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
 import unittest
-from mutpy import commandline
+
+import yaml
+
+import mutpy
+from mutpy import commandline, utils, workers
 
 
 class CommandLineTest(unittest.TestCase):
@@ -18,3 +28,101 @@ class CommandLineTest(unittest.TestCase):
         mutator = commandline.build_mutator(
             parser.parse_args(['--operator', 'AOR']))
         self.assertEqual(1, len(mutator.operators))
+
+    def test_build_coordinator_parser(self):
+        parser = commandline.build_coordinator_parser()
+        cfg = parser.parse_args(['--listen', 'localhost:8765', '--authkey', 'secret', '--jobs', '2'])
+        self.assertEqual('localhost:8765', cfg.listen)
+        self.assertEqual(2, cfg.jobs)
+        self.assertEqual(b'secret', commandline.get_authkey(cfg))
+
+    def test_jobs_must_be_positive(self):
+        parser = commandline.build_parser()
+        self.assertEqual(1, parser.parse_args([]).jobs)
+        self.assertEqual(3, parser.parse_args(['--jobs', '3']).jobs)
+        for jobs in ['0', '-1', 'x']:
+            with self.assertRaises(SystemExit):
+                parser.parse_args(['--jobs', jobs])
+
+
+class ReportLoader(yaml.SafeLoader):
+    """Loads report without importing modules referenced by it."""
+
+
+ReportLoader.add_multi_constructor('tag:yaml.org,2002:python/', lambda loader, suffix, node: None)
+
+
+@unittest.skipUnless(workers.is_parallel_execution_supported(), 'worker processes are not supported')
+class DistributedExecutionTest(unittest.TestCase):
+    """
+    Runs MutPy in separate processes, as example project can't be mutated twice by the same process.
+    """
+
+    TARGET_ARGS = ['--target', 'example/simple.py', '--unit-test', 'example/test/simple_good_test.py']
+    AUTHKEY = 'mutpy'
+
+    def setUp(self):
+        self.report_dir = tempfile.mkdtemp()
+        self.address = os.path.join(self.report_dir, 'mutpy.sock')
+        self.env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            [os.path.dirname(os.path.dirname(mutpy.__file__))] + sys.path
+        ))
+
+    def tearDown(self):
+        shutil.rmtree(self.report_dir)
+
+    def start_mutpy(self, args):
+        return subprocess.Popen([sys.executable, '-m', 'mutpy.mut'] + args, env=self.env,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+
+    def run_mutpy(self, args, name):
+        report_file = os.path.join(self.report_dir, name + '.yaml')
+        return self.start_mutpy(args + self.TARGET_ARGS + ['--quiet', '--report', report_file]), report_file
+
+    def read_report(self, report_file):
+        with open(report_file) as report:
+            mutations = yaml.load(report, Loader=ReportLoader)['mutations']
+        return sorted(
+            (mutation['number'], mutation['status'], mutation.get('killer'), mutation.get('tests_run'))
+            for mutation in mutations
+        )
+
+    def wait_for_coordinator(self, coordinator):
+        timer = utils.Timer()
+        while not os.path.exists(self.address):
+            if coordinator.poll() is not None or timer.stop() > 30:
+                self.fail('coordinator is not listening')
+            time.sleep(0.05)
+
+    def test_report_same_as_single_node_run(self):
+        coordinator, distributed_report = self.run_mutpy(
+            ['coordinator', '--listen', self.address, '--authkey', self.AUTHKEY, '--worker-timeout', '30'],
+            'distributed',
+        )
+        try:
+            self.wait_for_coordinator(coordinator)
+            worker = self.start_mutpy(
+                ['worker', '--connect', self.address, '--authkey', self.AUTHKEY] + self.TARGET_ARGS,
+            )
+            try:
+                coordinator.communicate(timeout=60)
+                worker.communicate(timeout=10)
+            finally:
+                worker.kill()
+        finally:
+            coordinator.kill()
+        single_node, single_node_report = self.run_mutpy([], 'single_node')
+        single_node.communicate(timeout=60)
+
+        self.assertEqual(worker.returncode, 0)
+        single_node_mutations = self.read_report(single_node_report)
+        self.assertTrue(single_node_mutations)
+        self.assertEqual(self.read_report(distributed_report), single_node_mutations)
+
+    def test_coordinator_stops_without_workers(self):
+        coordinator = self.start_mutpy(['coordinator', '--listen', self.address, '--authkey', self.AUTHKEY,
+                                        '--worker-timeout', '0.1', '--quiet'] + self.TARGET_ARGS)
+        output, _ = coordinator.communicate(timeout=60)
+
+        self.assertNotEqual(coordinator.returncode, 0)
+        self.assertIn('no worker connected in 0.1 seconds', output)
@@ -1,11 +1,15 @@
 import ast
+import json
+import os
 import pytest
+import random
 import sys
+import tempfile
 import unittest
 from unittest import mock
 
-from mutpy import controller, operators, utils, codegen
-from mutpy.test.utils import MockModulesLoader
+from mutpy import cache, checkpoint, controller, coverage, operators, utils, codegen
+from mutpy.test.utils import MockModulesLoader, MultiMockModulesLoader
 from mutpy.test_runners import UnittestTestRunner
 
 
@@ -45,6 +49,15 @@ class MutationScoreTest(unittest.TestCase):
 
         self.assertEqual(self.score.count(), 50)
 
+    def test_count_if_equivalent_and_duplicate(self):
+        self.score.survived_mutants = 5
+        self.score.killed_mutants = 5
+        self.score.inc_equivalent()
+        self.score.inc_duplicate()
+
+        self.assertEqual(self.score.all_mutants, 12)
+        self.assertEqual(self.score.count(), 50)
+
     def test_update_coverage(self):
         self.score.update_coverage(1, 1)
 
@@ -54,7 +67,7 @@ class MutationScoreTest(unittest.TestCase):
 
 class MockMutationController(controller.MutationController):
     def create_target_ast(self, target_module):
-        return utils.create_ast(self.target_loader.get_source())
+        return utils.create_ast(self.target_loader.get_source(target_module.__name__))
 
 
 class MutationScoreStoreView:
@@ -144,6 +157,407 @@ class MutationControllerTest_ConstantReplacement(unittest.TestCase):
         self.assertEqual(score.incompetent_mutants, 0)
 
 
+class MutationStatusStoreView:
+    def __init__(self):
+        self.statuses = []
+
+    def mutation(self, number, mutations, module, mutant):
+        self.statuses.append([number, codegen.to_source(mutant)])
+
+    def killed(self, *args, **kwargs):
+        self.statuses[-1].append('killed')
+
+    def survived(self, *args, **kwargs):
+        self.statuses[-1].append('survived')
+
+    def timeout(self, *args, **kwargs):
+        self.statuses[-1].append('timeout')
+
+    def incompetent(self, *args, **kwargs):
+        self.statuses[-1].append('incompetent')
+
+    def equivalent(self, *args, **kwargs):
+        self.statuses[-1].append('equivalent')
+
+    def duplicate(self, duplicate_of, *args, **kwargs):
+        self.statuses[-1].append('duplicate of {}'.format(duplicate_of))
+
+
+class MutationTestsRunStoreView:
+    def __init__(self):
+        self.tests_run = []
+
+    def killed(self, time, killer, exception_traceback, tests_run, *args, **kwargs):
+        self.tests_run.append(tests_run)
+
+    def survived(self, time, tests_run, *args, **kwargs):
+        self.tests_run.append(tests_run)
+
+
+class MutationControllerTestCase(unittest.TestCase):
+    CONTROLLER_CLS = MockMutationController
+    MUTATION_OPERATORS = [operators.ArithmeticOperatorReplacement, operators.AssignmentOperatorReplacement]
+    TARGET_SRC = utils.f("""
+    def mul(x):
+        return x * x
+
+    def countdown(x):
+        while x > 0:
+            x -= 1
+        return x
+    """)
+    TEST_SRC = utils.f("""
+    import target
+    from unittest import TestCase
+    class MulTest(TestCase):
+        def test_mul(self):
+            self.assertEqual(target.mul(2), 4)
+        def test_countdown(self):
+            self.assertEqual(target.countdown(2), 0)
+    """)
+
+    def run_controller(self, jobs, zygote=False, target_loader=None, test_loader=None, views=(), **kwargs):
+        target_loader = target_loader or MockModulesLoader('target', self.TARGET_SRC)
+        test_loader = test_loader or MockModulesLoader('test', self.TEST_SRC)
+        score_view = MutationScoreStoreView()
+        status_view = MutationStatusStoreView()
+        mutator = controller.FirstOrderMutator(self.MUTATION_OPERATORS, percentage=100)
+        mutation_controller = self.CONTROLLER_CLS(
+            runner_cls=UnittestTestRunner,
+            target_loader=target_loader,
+            test_loader=test_loader,
+            views=[score_view, status_view, *views],
+            mutant_generator=mutator,
+            timeout_factor=0.5,
+            jobs=jobs,
+            zygote=zygote,
+            **kwargs
+        )
+        mutation_controller.run()
+        return score_view.score, status_view.statuses
+
+
+@pytest.mark.skipif(sys.version_info[:2] >= (3,12), reason="MutPy mock loaders fail on Python 3.12 due to importlib changes")
+class MutationControllerTest_Jobs(MutationControllerTestCase):
+    def test_parallel_run_matches_sequential_run(self):
+        sequential_score, sequential_statuses = self.run_controller(jobs=1)
+        parallel_score, parallel_statuses = self.run_controller(jobs=3)
+
+        self.assertEqual(parallel_statuses, sequential_statuses)
+        self.assertEqual([number for number, *_ in parallel_statuses], [1, 2, 3, 4])
+        self.assertEqual(parallel_score.all_mutants, 4)
+        self.assertEqual(parallel_score.killed_mutants, sequential_score.killed_mutants)
+        self.assertEqual(parallel_score.survived_mutants, sequential_score.survived_mutants)
+        self.assertEqual(parallel_score.timeout_mutants, 1)
+
+    def test_zygote_run_matches_sequential_run(self):
+        sequential_score, sequential_statuses = self.run_controller(jobs=1)
+        zygote_score, zygote_statuses = self.run_controller(jobs=2, zygote=True)
+
+        self.assertEqual(zygote_statuses, sequential_statuses)
+        self.assertEqual(zygote_score.killed_mutants, sequential_score.killed_mutants)
+        self.assertEqual(zygote_score.timeout_mutants, 1)
+
+    def test_schemata_run_matches_sequential_run(self):
+        sequential_score, sequential_statuses = self.run_controller(jobs=1)
+        schemata_score, schemata_statuses = self.run_controller(jobs=1, mutant_schemata=True)
+        zygote_score, zygote_statuses = self.run_controller(jobs=2, zygote=True, mutant_schemata=True)
+
+        self.assertEqual(schemata_statuses, sequential_statuses)
+        self.assertEqual(zygote_statuses, sequential_statuses)
+        self.assertEqual(schemata_score.killed_mutants, sequential_score.killed_mutants)
+        self.assertEqual(schemata_score.timeout_mutants, 1)
+
+    def test_hot_patch_run_matches_sequential_run(self):
+        sequential_score, sequential_statuses = self.run_controller(jobs=1)
+        hot_patch_score, hot_patch_statuses = self.run_controller(jobs=1, hot_patch=True)
+        zygote_score, zygote_statuses = self.run_controller(jobs=2, zygote=True, hot_patch=True)
+
+        self.assertEqual(hot_patch_statuses, sequential_statuses)
+        self.assertEqual(zygote_statuses, sequential_statuses)
+        self.assertEqual(hot_patch_score.killed_mutants, sequential_score.killed_mutants)
+        self.assertEqual(hot_patch_score.timeout_mutants, 1)
+
+
+@pytest.mark.skipif(sys.version_info[:2] >= (3,12), reason="MutPy mock loaders fail on Python 3.12 due to importlib changes")
+class MutationControllerTest_HotPatchModuleState(MutationControllerTestCase):
+    TARGET_SRC = utils.f("""
+    CACHE = {}
+
+    def double(x):
+        if x not in CACHE:
+            CACHE[x] = x * 2
+        return CACHE[x]
+    """)
+    TEST_SRC = utils.f("""
+    import target
+    from unittest import TestCase
+    class DoubleTest(TestCase):
+        def test_double(self):
+            self.assertEqual(target.double(3), 6)
+    """)
+
+    def test_mutants_do_not_see_state_of_original_module(self):
+        sequential_score, sequential_statuses = self.run_controller(jobs=1)
+        hot_patch_score, hot_patch_statuses = self.run_controller(jobs=1, hot_patch=True)
+        zygote_score, zygote_statuses = self.run_controller(jobs=2, zygote=True, hot_patch=True)
+        reused_score, reused_statuses = self.run_controller(jobs=1, reuse_workers=True, hot_patch=True)
+
+        self.assertEqual(sequential_score.killed_mutants, sequential_score.all_mutants)
+        self.assertEqual(hot_patch_statuses, sequential_statuses)
+        self.assertEqual(zygote_statuses, sequential_statuses)
+        self.assertEqual(reused_statuses, sequential_statuses)
+
+
+@pytest.mark.skipif(sys.version_info[:2] >= (3,12), reason="MutPy mock loaders fail on Python 3.12 due to importlib changes")
+class MutationControllerTest_SkipEquivalent(MutationControllerTestCase):
+    MUTATION_OPERATORS = [operators.ArithmeticOperatorDeletion, operators.ArithmeticOperatorReplacement]
+    TARGET_SRC = utils.f("""
+    def mul(x):
+        if False:
+            return x + 1
+        return x * x
+
+    def last(x):
+        return x[-1:]
+    """)
+    TEST_SRC = utils.f("""
+    import target
+    from unittest import TestCase
+    class MulTest(TestCase):
+        def test_mul(self):
+            self.assertEqual(target.mul(3), 9)
+        def test_last(self):
+            self.assertEqual(target.last([1, 2, 3]), [3])
+    """)
+
+    def run_controller(self, jobs):
+        score, statuses = super().run_controller(jobs, skip_equivalent=True)
+        return score, [status for _, _, status in statuses]
+
+    def test_run(self):
+        score, statuses = self.run_controller(jobs=1)
+
+        self.assertEqual(statuses, ['killed', 'equivalent', 'killed', 'killed', 'killed', 'duplicate of 1'])
+        self.assertEqual(score.all_mutants, 6)
+        self.assertEqual(score.equivalent_mutants, 1)
+        self.assertEqual(score.duplicate_mutants, 1)
+        self.assertEqual(score.count(), 100)
+
+    def test_parallel_run_matches_sequential_run(self):
+        sequential_score, sequential_statuses = self.run_controller(jobs=1)
+        parallel_score, parallel_statuses = self.run_controller(jobs=2)
+
+        self.assertEqual(parallel_statuses, sequential_statuses)
+        self.assertEqual(parallel_score.count(), sequential_score.count())
+
+
+@pytest.mark.skipif(sys.version_info[:2] >= (3,12), reason="MutPy mock loaders fail on Python 3.12 due to importlib changes")
+class MutationControllerTest_Cache(MutationControllerTestCase):
+    def setUp(self):
+        self.cache_file = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        self.cache_file.close()
+        os.remove(self.cache_file.name)
+
+    def tearDown(self):
+        if os.path.exists(self.cache_file.name):
+            os.remove(self.cache_file.name)
+
+    def mark_cached_mutants_as_survived(self):
+        with open(self.cache_file.name) as cache_file:
+            entries = json.load(cache_file)
+        for entry in entries.values():
+            entry['status'] = 'survived'
+        with open(self.cache_file.name, 'w') as cache_file:
+            json.dump(entries, cache_file)
+
+    def assert_cached_results_replayed(self, jobs):
+        _, statuses = self.run_controller(jobs=jobs, mutation_cache=cache.MutationCache(self.cache_file.name))
+        self.mark_cached_mutants_as_survived()
+
+        score, cached_statuses = self.run_controller(jobs=jobs, mutation_cache=cache.MutationCache(self.cache_file.name))
+
+        self.assertEqual(
+            cached_statuses,
+            [[number, mutant, 'timeout' if status == 'timeout' else 'survived'] for number, mutant, status in statuses],
+        )
+        self.assertEqual(score.timeout_mutants, 1)
+
+    def test_cached_results_replayed(self):
+        self.assert_cached_results_replayed(jobs=1)
+
+    def test_cached_results_replayed_in_parallel_run(self):
+        self.assert_cached_results_replayed(jobs=2)
+
+    def run_controller_with_changed_target(self, old, new):
+        self.run_controller(jobs=1, mutation_cache=cache.MutationCache(self.cache_file.name))
+        self.mark_cached_mutants_as_survived()
+        self.TARGET_SRC = self.TARGET_SRC.replace(old, new)
+        return self.run_controller(jobs=1, mutation_cache=cache.MutationCache(self.cache_file.name))
+
+    def test_changed_function_mutants_executed_again(self):
+        _, statuses = self.run_controller_with_changed_target('return x * x', 'return x * x * 1')
+
+        self.assertEqual([status for *_, status in statuses[:2]], ['killed', 'killed'])
+
+    def test_unchanged_function_mutants_replayed(self):
+        _, statuses = self.run_controller_with_changed_target('while x > 0', 'while x >= 1')
+
+        self.assertEqual([status for *_, status in statuses[:3]], ['survived', 'survived', 'survived'])
+
+    def run_controller_with_targets(self, *names):
+        sources = {'target': self.TARGET_SRC, 'other': 'def add(x):\n    return x + 1\n'}
+        # every module is loaded again, as tests import also the one which isn't mutated
+        loaders = {name: MockModulesLoader(name, source) for name, source in sources.items()}
+        target_loader = MultiMockModulesLoader(*[loaders[name] for name in names])
+        return self.run_controller(jobs=1, target_loader=target_loader,
+                                   mutation_cache=cache.MutationCache(self.cache_file.name))
+
+    def test_entries_of_not_mutated_target_kept(self):
+        self.TEST_SRC += '\n' + utils.f("""
+        import other
+        class AddTest(TestCase):
+            def test_add(self):
+                self.assertEqual(other.add(1), 2)
+        """)
+        _, statuses = self.run_controller_with_targets('target', 'other')
+        self.mark_cached_mutants_as_survived()
+        self.run_controller_with_targets('target')
+
+        _, cached_statuses = self.run_controller_with_targets('target', 'other')
+
+        other_statuses = [status for _, mutant, status in cached_statuses if 'def add' in mutant]
+        self.assertEqual(len(other_statuses), len([mutant for _, mutant, _ in statuses if 'def add' in mutant]))
+        self.assertTrue(other_statuses)
+        self.assertEqual(set(other_statuses), {'survived'})
+
+
+@pytest.mark.skipif(sys.version_info[:2] >= (3,12), reason="MutPy mock loaders fail on Python 3.12 due to importlib changes")
+class MutationControllerTest_Checkpoint(MutationControllerTestCase):
+    def setUp(self):
+        self.journal_file = tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False)
+        self.journal_file.close()
+
+    def tearDown(self):
+        os.remove(self.journal_file.name)
+
+    def interrupt_after(self, number_of_mutants):
+        with open(self.journal_file.name) as journal_file:
+            lines = journal_file.readlines()
+        with open(self.journal_file.name, 'w') as journal_file:
+            journal_file.writelines(lines[:number_of_mutants])
+
+    def assert_resumed_run_matches_full_run(self, jobs):
+        score, statuses = self.run_controller(jobs=jobs, checkpoint=checkpoint.CheckpointJournal(self.journal_file.name))
+        self.interrupt_after(2)
+
+        resumed_score, resumed_statuses = self.run_controller(
+            jobs=jobs,
+            checkpoint=checkpoint.CheckpointJournal(self.journal_file.name, resume=True),
+        )
+
+        self.assertEqual(resumed_statuses, statuses)
+        self.assertEqual(vars(resumed_score), vars(score))
+        self.assertEqual(len(checkpoint.CheckpointJournal(self.journal_file.name, resume=True).entries), 4)
+
+    def test_resumed_run_matches_full_run(self):
+        self.assert_resumed_run_matches_full_run(jobs=1)
+
+    def test_resumed_parallel_run_matches_full_run(self):
+        self.assert_resumed_run_matches_full_run(jobs=2)
+
+    def test_journaled_mutants_not_executed(self):
+        _, statuses = self.run_controller(jobs=1, checkpoint=checkpoint.CheckpointJournal(self.journal_file.name))
+        self.interrupt_after(3)
+        with open(self.journal_file.name) as journal_file:
+            entries = [json.loads(line) for line in journal_file]
+        with open(self.journal_file.name, 'w') as journal_file:
+            for entry in entries:
+                entry.update(status='killed', killer='test_journaled')
+                journal_file.write(json.dumps(entry) + '\n')
+
+        _, resumed_statuses = self.run_controller(
+            jobs=1,
+            checkpoint=checkpoint.CheckpointJournal(self.journal_file.name, resume=True),
+        )
+
+        self.assertEqual([status for *_, status in resumed_statuses], ['killed', 'killed', 'killed', statuses[3][2]])
+
+
+@unittest.skipUnless(coverage.MonitoringCoverageInjector.is_available(), 'sys.monitoring is not available')
+class MutationControllerTest_MonitoringCoverage(MutationControllerTestCase):
+    # modules are imported from files, mock loaders don't work on Python 3.12+ where sys.monitoring is
+    CONTROLLER_CLS = controller.MutationController
+    TARGET_SRC = utils.f("""
+    def mul(x):
+        return x * x
+
+    def countdown(x):
+        while x > 0:
+            x -= 1
+        return x
+
+    def not_covered(x):
+        return x + 1
+    """)
+    TEST_SRC = utils.f("""
+    import monitored_target
+    from unittest import TestCase
+    class MulTest(TestCase):
+        def test_mul(self):
+            self.assertEqual(monitored_target.mul(2), 4)
+    class CountdownTest(TestCase):
+        def test_countdown(self):
+            self.assertEqual(monitored_target.countdown(2), 0)
+    """)
+
+    def setUp(self):
+        self.modules_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.modules_dir.cleanup)
+        for name, source in [('monitored_target', self.TARGET_SRC), ('monitored_target_test', self.TEST_SRC)]:
+            with open(os.path.join(self.modules_dir.name, name + '.py'), 'w') as module_file:
+                module_file.write(source)
+        self.addCleanup(self.remove_modules)
+
+    def remove_modules(self):
+        for name in ['monitored_target', 'monitored_target_test']:
+            sys.modules.pop(name, None)
+        if self.modules_dir.name in sys.path:
+            sys.path.remove(self.modules_dir.name)
+
+    def run_controller(self, jobs, **kwargs):
+        self.remove_modules()
+        tests_run_view = MutationTestsRunStoreView()
+        score, statuses = super().run_controller(
+            jobs,
+            target_loader=utils.ModulesLoader(['monitored_target'], self.modules_dir.name),
+            test_loader=utils.ModulesLoader(['monitored_target_test'], self.modules_dir.name),
+            mutate_covered=True,
+            views=[tests_run_view],
+            **kwargs
+        )
+        return score, statuses, tests_run_view.tests_run
+
+    def assert_covered_mutants_match_ast_backend(self, jobs):
+        ast_score, ast_statuses, ast_tests_run = self.run_controller(jobs=jobs, coverage_backend=coverage.AST_BACKEND)
+        score, statuses, tests_run = self.run_controller(jobs=jobs, coverage_backend=coverage.MONITORING_BACKEND)
+
+        self.assertEqual(statuses, ast_statuses)
+        self.assertEqual(tests_run, ast_tests_run)
+        self.assertEqual((score.covered_nodes, score.all_nodes), (ast_score.covered_nodes, ast_score.all_nodes))
+        self.assertLess(score.covered_nodes, score.all_nodes)
+        self.assertTrue(statuses)
+        self.assertFalse([mutant for _, mutant, _ in statuses if 'return x - 1' in mutant])
+        # only the single test covering mutated function is run
+        self.assertEqual(set(tests_run), {1})
+
+    def test_covered_mutants_match_ast_backend(self):
+        self.assert_covered_mutants_match_ast_backend(jobs=1)
+
+    def test_covered_mutants_match_ast_backend_in_parallel_run(self):
+        self.assert_covered_mutants_match_ast_backend(jobs=2)
+
+
 class BaseHOMStrategyTest(unittest.TestCase):
 
     @classmethod
@@ -171,7 +585,7 @@ class BaseHOMStrategyTest(unittest.TestCase):
 
     @staticmethod
     def aor_mutation_on_subtraction():
-        return operators.Mutation(operator=operators.ArithmeticOperatorReplacement, node=ast.Sub(children=[]))
+        return operators.Mutation(operator=operators.ArithmeticOperatorReplacement, node=ast.Sub())
 
     @staticmethod
     def apply_strategy_to_mutations(hom_strategy_cls, mutations, order, hom_kwargs=None):
@@ -224,10 +638,10 @@ class FirstToLastHOMStrategyTest(BaseHOMStrategyTest):
         self.assert_mutation_in_changeset_at_position_equals(changes_to_apply, 1, 0, mutations[1])
 
     def test_generate_if_node_child(self):
-        node = ast.Sub(children=[])
+        unary_op_node = utils.create_ast('-(x - y)').body[0].value
         mutations = [
-            self.aor_mutation(node=ast.UnaryOp(children=[node])),
-            self.aor_mutation(node=node),
+            self.aor_mutation(node=unary_op_node),
+            self.aor_mutation(node=unary_op_node.operand.op),
         ]
 
         changes_to_apply = self.apply_strategy_to_mutations_with_order_2(controller.FirstToLastHOMStrategy, mutations)
@@ -238,6 +652,20 @@ class FirstToLastHOMStrategyTest(BaseHOMStrategyTest):
         self.assert_num_changeset_entries(changes_to_apply, 1, 1)
         self.assert_mutation_in_changeset_at_position_equals(changes_to_apply, 1, 0, mutations[1])
 
+    def test_generate_with_order_3_if_node_child(self):
+        add_node = utils.create_ast('-(x - y) + z').body[0].value
+        unary_op_node = add_node.left
+        mutations = [
+            self.aor_mutation(node=unary_op_node),
+            self.aor_mutation(node=unary_op_node.operand.op),
+            self.aor_mutation(node=add_node.op),
+            self.crp_mutation(node=add_node.right),
+        ]
+
+        changes_to_apply = self.apply_strategy_to_mutations(controller.FirstToLastHOMStrategy, mutations, 3)
+
+        self.assertEqual(changes_to_apply, [[mutations[0], mutations[3], mutations[2]], [mutations[1]]])
+
 
 class EachChoiceHOMStrategyTest(BaseHOMStrategyTest):
     def test_generate(self):
@@ -266,7 +694,7 @@ class BetweenOperatorsHOMStrategyTest(BaseHOMStrategyTest):
         self.assert_mutation_in_changeset_at_position_equals(changes_to_apply, 1, 0, mutations[1])
 
     def test_generate_if_two_operators(self):
-        mutations = self.TWO_AOR_MUTATIONS_ON_SUBTRACTION + [self.asr_mutation(node=ast.Sub(children=[]))]
+        mutations = self.TWO_AOR_MUTATIONS_ON_SUBTRACTION + [self.asr_mutation(node=ast.Sub())]
 
         changes_to_apply = self.apply_strategy_to_mutations_with_order_2(controller.BetweenOperatorsHOMStrategy,
                                                                          mutations)
@@ -280,8 +708,8 @@ class BetweenOperatorsHOMStrategyTest(BaseHOMStrategyTest):
 
     def test_generate_if_three_operators(self):
         mutations = self.TWO_AOR_MUTATIONS_ON_SUBTRACTION + [
-            self.asr_mutation(node=ast.Sub(children=[])),
-            self.crp_mutation(node=ast.Sub(children=[])),
+            self.asr_mutation(node=ast.Sub()),
+            self.crp_mutation(node=ast.Sub()),
         ]
 
         changes_to_apply = self.apply_strategy_to_mutations_with_order_2(controller.BetweenOperatorsHOMStrategy,
@@ -294,6 +722,18 @@ class BetweenOperatorsHOMStrategyTest(BaseHOMStrategyTest):
         self.assert_mutation_in_changeset_at_position_equals(changes_to_apply, 1, 0, mutations[1])
         self.assert_mutation_in_changeset_at_position_equals(changes_to_apply, 1, 1, mutations[3])
 
+    def test_generate_if_node_child(self):
+        unary_op_node = utils.create_ast('-(x - y)').body[0].value
+        mutations = [
+            self.aor_mutation(node=unary_op_node),
+            self.crp_mutation(node=unary_op_node.operand.op),
+        ]
+
+        changes_to_apply = self.apply_strategy_to_mutations_with_order_2(controller.BetweenOperatorsHOMStrategy,
+                                                                         mutations)
+
+        self.assertEqual(changes_to_apply, [[mutations[0]], [mutations[1]]])
+
 
 class RandomHOMStrategyTest(BaseHOMStrategyTest):
     def test_generate(self):
@@ -376,6 +816,22 @@ class HighOrderMutatorTest(unittest.TestCase):
         self.assertEqual(number, 1)
         self.assertEqual(codegen.to_source(target_ast), "x = 'test'")
 
+    def test_sampled_second_order_mutation(self):
+        target_ast = utils.create_ast('x += y + z\nx *= y - z')
+        operators_list = [operators.ArithmeticOperatorReplacement, operators.AssignmentOperatorReplacement]
+        all_mutants = [
+            codegen.to_source(mutant)
+            for _, mutant in controller.HighOrderMutator(operators=operators_list).mutate(target_ast)
+        ]
+        mutator = controller.HighOrderMutator(operators=operators_list, percentage=50)
+        random.seed(1)
+
+        mutants = [codegen.to_source(mutant) for _, mutant in mutator.mutate(target_ast)]
+
+        self.assertLess(len(mutants), len(all_mutants))
+        self.assertTrue(set(mutants) <= set(all_mutants))
+        self.assertEqual(codegen.to_source(target_ast), 'x += y + z\nx *= y - z')
+
 
 class MutationControllerExitCodeTest(unittest.TestCase):
     """Test that the mutation controller returns appropriate exit codes"""
@@ -1,6 +1,7 @@
 import unittest
 
 from mutpy import coverage, utils
+from mutpy.test_runners.base import ModuleCoverageResult
 from mutpy.test_runners.unittest_runner import UnittestCoverageResult
 
 
@@ -62,6 +63,38 @@ class Base:
         self.assertEqual(node.body[1].body[2].lineno, 10)  # Method def bar(self): at line 10
         self.assertEqual(node.body[1].body[2].body[0].lineno, 11)  # self.x = 1 at line 11    
 
+    def test_node_covered_again_only_after_restart(self):
+        node = utils.create_ast(utils.f("""
+        def foo():
+            return 1
+        """))
+        module = self.coverage_injector.inject(node)
+        module.foo()
+        self.coverage_injector.covered_nodes.clear()
+
+        module.foo()
+        self.assert_not_covered([node.body[0].body[0]])
+        self.coverage_injector.restart()
+        module.foo()
+
+        self.assert_covered([node.body[0].body[0]])
+
+    def test_several_modules(self):
+        other_coverage_injector = type(self.coverage_injector)()
+        node = utils.create_ast('def foo():\n    return 1')
+        other_node = utils.create_ast('def bar():\n    return 2')
+        module = self.coverage_injector.inject(node, 'first')
+        try:
+            other_module = other_coverage_injector.inject(other_node, 'second')
+            other_module.bar()
+        finally:
+            other_coverage_injector.stop()
+
+        self.assert_not_covered([node.body[0].body[0]])
+        self.assertTrue(other_coverage_injector.is_covered(other_node.body[0].body[0]))
+        module.foo()
+        self.assert_covered([node.body[0].body[0]])
+
     def test_not_covered_node(self):
         node = utils.create_ast('if False:\n\ty = 2')
 
@@ -216,6 +249,55 @@ class Base:
         self.assert_not_covered([for_body_el])
 
 
+@unittest.skipUnless(coverage.MonitoringCoverageInjector.is_available(), 'sys.monitoring is not available')
+class MonitoringCoverageInjectorTest(CoverageInjectorTest):
+    def setUp(self):
+        self.coverage_injector = coverage.MonitoringCoverageInjector()
+
+    def tearDown(self):
+        self.coverage_injector.stop()
+
+
+class MonitoringCoverageInjectorLinesTest(unittest.TestCase):
+    def test_markers_by_line(self):
+        node = utils.create_ast(utils.f("""
+        def foo(x):
+            \"\"\"doc\"\"\"
+            global y
+            try:
+                return x
+            except ValueError:
+                pass
+        """))
+        coverage.MarkerNodeTransformer().visit(node)
+        function_node = node.body[0]
+        docstring_node, global_node, try_node = function_node.body
+        handler_node = try_node.handlers[0]
+
+        markers_by_line = coverage.MonitoringCoverageInjector().get_markers_by_line(node)
+
+        self.assertIn(function_node.marker, markers_by_line[1])
+        self.assertNotIn(function_node.body[0].marker, markers_by_line[1])
+        self.assertTrue({docstring_node.marker, global_node.marker, try_node.marker} <= markers_by_line[4])
+        self.assertEqual(markers_by_line[7], {handler_node.marker, handler_node.body[0].marker})
+        self.assertNotIn(6, markers_by_line)
+
+
+class CreateCoverageInjectorTest(unittest.TestCase):
+    def test_ast_backend(self):
+        coverage_injector = coverage.create_coverage_injector(coverage.AST_BACKEND)
+
+        self.assertIs(type(coverage_injector), coverage.CoverageInjector)
+
+    def test_monitoring_backend(self):
+        coverage_injector = coverage.create_coverage_injector(coverage.MONITORING_BACKEND)
+
+        if coverage.MonitoringCoverageInjector.is_available():
+            self.assertIsInstance(coverage_injector, coverage.MonitoringCoverageInjector)
+        else:
+            self.assertIs(type(coverage_injector), coverage.CoverageInjector)
+
+
 class UnittestCoverageResultTest(unittest.TestCase):
     def test_run(self):
         coverage_injector = coverage.CoverageInjector()
@@ -244,6 +326,57 @@ class UnittestCoverageResultTest(unittest.TestCase):
         self.assertEqual(result.test_covered_nodes[repr(test_x)], {1})
         self.assertFalse(result.test_covered_nodes[repr(test_y)])
 
+    def test_run_several_modules(self):
+        first_coverage_injector = coverage.CoverageInjector()
+        second_coverage_injector = coverage.CoverageInjector()
+
+        class ATest(unittest.TestCase):
+            def test_x(self):
+                first_coverage_injector.covered_nodes.add(1)
+
+            def test_y(self):
+                first_coverage_injector.covered_nodes.add(2)
+                second_coverage_injector.covered_nodes.add(1)
+
+        result = UnittestCoverageResult(coverage_injectors=[first_coverage_injector, second_coverage_injector])
+        test_x = ATest(methodName='test_x')
+        test_y = ATest(methodName='test_y')
+
+        unittest.TestSuite([test_x, test_y]).run(result)
+
+        self.assertEqual(first_coverage_injector.covered_nodes, {1, 2})
+        self.assertEqual(second_coverage_injector.covered_nodes, {1})
+        first_result, second_result = result.get_module_results()
+        self.assertEqual(first_result.test_covered_nodes, {repr(test_x): {1}, repr(test_y): {2}})
+        self.assertEqual(second_result.test_covered_nodes, {repr(test_x): set(), repr(test_y): {1}})
+
+
+class BitsetTest(unittest.TestCase):
+    def test_to_bitset(self):
+        self.assertEqual(coverage.to_bitset([]), 0)
+        self.assertEqual(coverage.to_bitset([0, 3, 9]), 0b1000001001)
+
+    def test_iter_bitset(self):
+        positions = [0, 7, 8, 100, 4000]
+
+        self.assertEqual(list(coverage.iter_bitset(coverage.to_bitset(positions))), positions)
+        self.assertEqual(list(coverage.iter_bitset(0)), [])
+
+
+class ModuleCoverageResultTest(unittest.TestCase):
+    def test_find_covering_tests(self):
+        result = ModuleCoverageResult(
+            {'x': coverage.to_bitset([0, 1, 2]), 'y': coverage.to_bitset([0, 3]), 'z': coverage.to_bitset([0])},
+            always_coverage=coverage.to_bitset([0]),
+        )
+
+        self.assertEqual(result.tests_by_marker, {1: 0b001, 2: 0b001, 3: 0b010})
+        self.assertEqual(result.test_covered_nodes, {'x': {0, 1, 2}, 'y': {0, 3}, 'z': {0}})
+        self.assertEqual(result.find_covering_tests([1]), ['x'])
+        self.assertEqual(result.find_covering_tests([3, 2]), ['x', 'y'])
+        self.assertEqual(result.find_covering_tests([4]), [])
+        self.assertEqual(result.find_covering_tests([4, 0]), ['x', 'y', 'z'])
+
 import ast
 from mutpy.coverage import AbstractCoverageNodeTransformer
 
@@ -0,0 +1,103 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from mutpy import diff, utils
+
+DIFF_OUTPUT = utils.f("""
+diff --git a/simple.py b/simple.py
+index 3b18e51..a5c1f9e 100644
+--- a/simple.py
++++ b/simple.py
+@@ -2 +2 @@ def add(x, y):
+-    return x + y
++    return y + x
+@@ -10,0 +11,3 @@ def sub(x, y):
++def mul(x, y):
++    return x * y
++
+@@ -20,2 +22,0 @@ def div(x, y):
+-    pass
+-    pass
+diff --git a/removed.py b/removed.py
+deleted file mode 100644
+index 3b18e51..0000000
+--- a/removed.py
++++ /dev/null
+@@ -1 +0,0 @@
+-x = 1
+""")
+
+
+class ParseDiffTest(unittest.TestCase):
+
+    def test_parse(self):
+        changed_files = diff.parse_diff(DIFF_OUTPUT)
+
+        self.assertEqual(list(changed_files), ['simple.py'])
+        self.assertEqual(changed_files['simple.py'].ranges, [(2, 2), (11, 13), (22, 22)])
+
+
+class ChangedLinesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.target_ast = utils.create_ast(utils.f("""
+        def foo():
+            pass
+
+        @decorator
+        def bar():
+            pass
+        """))
+        self.foo, self.bar = self.target_ast.body
+
+    def test_intersects_node_with_changed_body(self):
+        changed_lines = diff.ChangedLines([(2, 2)])
+
+        self.assertTrue(changed_lines.intersects(self.foo))
+        self.assertFalse(changed_lines.intersects(self.bar))
+
+    def test_intersects_node_with_changed_decorator(self):
+        changed_lines = diff.ChangedLines([(4, 4)])
+
+        self.assertTrue(changed_lines.intersects(self.bar))
+        self.assertFalse(changed_lines.intersects(self.bar.body[0]))
+
+    def test_intersects_node_without_lines(self):
+        self.assertTrue(diff.ChangedLines([(1, 1)]).intersects(self.target_ast))
+
+
+@unittest.skipUnless(shutil.which('git'), 'git is not installed')
+class GitDiffTest(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = tempfile.mkdtemp()
+        self.git('init', '-q')
+        self.write('simple.py', 'def add(x, y):\n    return x + y\n')
+        self.write('other.py', 'x = 1\n')
+        self.git('add', '.')
+        self.git('-c', 'user.name=mutpy', '-c', 'user.email=mutpy@example.com', 'commit', '-q', '-m', 'init')
+
+    def tearDown(self):
+        shutil.rmtree(self.repo)
+
+    def git(self, *args):
+        subprocess.run(['git'] + list(args), cwd=self.repo, check=True, capture_output=True)
+
+    def write(self, file_name, source):
+        with open(os.path.join(self.repo, file_name), 'w') as source_file:
+            source_file.write(source)
+
+    def test_changed_lines(self):
+        self.write('simple.py', 'def add(x, y):\n    return y + x\n')
+
+        git_diff = diff.GitDiff('HEAD', self.repo)
+
+        self.assertEqual(git_diff.get_changed_lines(os.path.join(self.repo, 'simple.py')).ranges, [(2, 2)])
+        self.assertFalse(git_diff.get_changed_lines(os.path.join(self.repo, 'other.py')))
+
+    def test_unknown_revision(self):
+        with self.assertRaises(diff.GitDiffException):
+            diff.GitDiff('unknown-revision', self.repo)
@@ -0,0 +1,75 @@
+import unittest
+
+from mutpy import controller, equivalence, operators, utils
+
+
+class EquivalenceFilterTest(unittest.TestCase):
+
+    def find_equivalents(self, source, operators_list):
+        target_ast = utils.create_ast(source)
+        equivalence_filter = equivalence.EquivalenceFilter(target_ast, 'target')
+        equivalents = {}
+        mutator = controller.FirstOrderMutator(operators_list)
+        for number, (mutations, mutant_ast) in enumerate(mutator.mutate(target_ast), 1):
+            equivalents[number] = equivalence_filter.find_equivalent(number, mutations, mutant_ast)
+        return equivalents
+
+    def test_mutant_in_dead_code_is_equivalent(self):
+        equivalents = self.find_equivalents(utils.f("""
+        def mul(x):
+            if False:
+                return x + 1
+            return x * x
+        """), [operators.ArithmeticOperatorReplacement])
+
+        self.assertEqual(equivalents, {1: equivalence.ORIGINAL, 2: None, 3: None, 4: None})
+
+    def test_folded_constant_is_duplicate(self):
+        equivalents = self.find_equivalents(utils.f("""
+        def last(x):
+            return x[-2:]
+        """), [operators.ArithmeticOperatorDeletion, operators.ArithmeticOperatorReplacement])
+
+        # x[2:] and x[+2:]
+        self.assertEqual(equivalents, {1: None, 2: 1})
+
+    def test_same_mutation_in_other_function_is_not_duplicate(self):
+        equivalents = self.find_equivalents(utils.f("""
+        def first(x):
+            return x + 1
+
+        def second(x):
+            return x + 1
+        """), [operators.ArithmeticOperatorReplacement])
+
+        self.assertEqual(equivalents, {1: None, 2: None})
+
+    def test_module_level_mutation(self):
+        equivalents = self.find_equivalents(utils.f("""
+        X = 2 - 1
+        Y = 2 + -1
+        """), [operators.ArithmeticOperatorReplacement, operators.ArithmeticOperatorDeletion])
+
+        # Y = 2 + 1, X = 2 + 1, Y = 2 - -1, Y = 2 + +1
+        self.assertEqual(equivalents, {1: None, 2: None, 3: 1, 4: 1})
+
+    def test_method_mutation(self):
+        equivalents = self.find_equivalents(utils.f("""
+        class A:
+            def get(self):
+                if False:
+                    return self.x - 1
+                return self.__x * 2
+        """), [operators.ArithmeticOperatorReplacement])
+
+        self.assertEqual(equivalents[1], equivalence.ORIGINAL)
+        self.assertNotIn(equivalence.ORIGINAL, list(equivalents.values())[1:])
+
+    def test_incompetent_mutant_is_not_filtered(self):
+        equivalents = self.find_equivalents(utils.f("""
+        def gen():
+            yield 1
+            return 2
+        """), [operators.StatementDeletion])
+
+        self.assertNotIn(equivalence.ORIGINAL, equivalents.values())
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import types
+import unittest
+
+from mutpy import history, operators, utils
+
+
+class KillHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.module = types.ModuleType('target')
+        target_ast = utils.create_ast(utils.f("""
+        x = 1 + 2
+        y = 3 - 4
+        """))
+        self.add_mutation, self.sub_mutation = [
+            mutation for mutation, _ in operators.ArithmeticOperatorReplacement().mutate(target_ast)
+        ]
+        self.const_mutation = operators.Mutation(operators.ConstantReplacement, self.add_mutation.node)
+
+    def kill(self, kill_history, mutation, killer):
+        kill_history.mutation(1, [mutation], self.module, None)
+        kill_history.killed(0.1, killer)
+
+    def test_no_history(self):
+        kill_history = history.KillHistory()
+
+        self.assertEqual(kill_history.get_likely_killers(self.module, [self.add_mutation]), [])
+
+    def test_killers_of_same_node_and_operator_first(self):
+        kill_history = history.KillHistory()
+        self.kill(kill_history, self.sub_mutation, 'test_sub')
+        self.kill(kill_history, self.sub_mutation, 'test_sub')
+        self.kill(kill_history, self.const_mutation, 'test_const')
+        self.kill(kill_history, self.add_mutation, 'test_add')
+
+        likely_killers = kill_history.get_likely_killers(self.module, [self.add_mutation])
+
+        self.assertEqual(likely_killers, ['test_add', 'test_const', 'test_sub'])
+
+    def test_save_and_load(self):
+        history_file = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        history_file.close()
+        os.remove(history_file.name)
+        try:
+            kill_history = history.KillHistory(history_file.name)
+            self.kill(kill_history, self.add_mutation, 'test_add')
+            kill_history.end(None, 0)
+
+            kill_history = history.KillHistory(history_file.name)
+
+            self.assertEqual(kill_history.get_likely_killers(self.module, [self.add_mutation]), ['test_add'])
+        finally:
+            os.remove(history_file.name)
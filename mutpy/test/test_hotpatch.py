@@ -0,0 +1,156 @@
+import unittest
+
+from mutpy import controller, hotpatch, operators, utils, workers
+
+
+class FunctionPatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.patched_mutants = 0
+        self.not_patched_mutants = 0
+
+    def check_mutants(self, source, check, operator=operators.ArithmeticOperatorReplacement):
+        module = utils.create_module(utils.create_ast(source), 'target')
+        target_ast = utils.create_ast(source)
+        patcher = hotpatch.FunctionPatcher(module, target_ast)
+        loader = hotpatch.PatchLoader()
+        for mutations, mutant_ast in controller.FirstOrderMutator([operator]).mutate(target_ast):
+            patches = patcher.create_patches(mutations)
+            if not patches:
+                self.not_patched_mutants += 1
+                continue
+            self.patched_mutants += 1
+            mutant_module = utils.create_module(mutant_ast, 'target')
+            task = workers.MutantTask('target', patcher.marshalled_original_code, None, function_patches=patches)
+            try:
+                patched_module = loader.activate(task)
+                self.assertEqual(check(patched_module), check(mutant_module))
+            finally:
+                loader.restore()
+        mutant_free_module = utils.create_module(utils.create_ast(source), 'target')
+        self.assertEqual(check(module), check(mutant_free_module))
+        if self.patched_mutants:
+            self.assertEqual(check(loader.modules['target']), check(mutant_free_module))
+
+    def test_patch_function(self):
+        self.check_mutants(utils.f("""
+        def mul(x, y):
+            return x * y
+        """), lambda module: module.mul(3, 2))
+
+        self.assertEqual(self.patched_mutants, 3)
+
+    def test_patch_methods(self):
+        self.check_mutants(utils.f("""
+        class Base:
+            def get(self):
+                return 2
+
+        class A(Base):
+            __hidden = 3
+
+            def get(self):
+                return super().get() * self.__hidden
+
+            @staticmethod
+            def static(x):
+                return x * 2
+
+            @property
+            def prop(self):
+                return self.get() * 2
+
+            class Inner:
+                def get(self):
+                    return 5 * 2
+        """), lambda module: (module.A().get(), module.A.static(3), module.A().prop, module.A.Inner().get()))
+
+        self.assertEqual(self.not_patched_mutants, 0)
+
+    def test_patch_outer_function_of_nested_function(self):
+        self.check_mutants(utils.f("""
+        def outer(x):
+            def inner(y=x * 2):
+                return y * 3
+            return inner()
+        """), lambda module: module.outer(2))
+
+        self.assertEqual(self.not_patched_mutants, 0)
+
+    def test_module_level_mutations_not_patched(self):
+        self.check_mutants(utils.f("""
+        X = 2 * 3
+
+        def mul(x=2 * 2):
+            return x
+
+        class A:
+            y = 1 * 2
+
+        if X:
+            def conditional():
+                return 2 * 4
+        """), lambda module: (module.X, module.mul(), module.A.y, module.conditional()))
+
+        self.assertEqual(self.patched_mutants, 0)
+
+    def test_wrapped_function_not_patched(self):
+        self.check_mutants(utils.f("""
+        import functools
+
+        @functools.lru_cache()
+        def mul(x):
+            return x * 2
+        """), lambda module: module.mul(3))
+
+        self.assertEqual(self.patched_mutants, 0)
+
+    def test_patch_not_created_if_free_variables_differ(self):
+        self.check_mutants(utils.f("""
+        class Base:
+            def get(self):
+                return 1
+
+        class A(Base):
+            def get(self):
+                return super().get()
+        """), lambda module: module.A().get(), operator=operators.StatementDeletion)
+
+        self.assertEqual(self.patched_mutants, 1)
+        self.assertEqual(self.not_patched_mutants, 1)
+
+    def test_module_loaded_once_and_restored(self):
+        source = utils.f("""
+        CACHE = {}
+        COUNTER = 0
+
+        def double(x):
+            global COUNTER
+            COUNTER += 1
+            if x not in CACHE:
+                CACHE[x] = x * 2
+            return CACHE[x]
+        """)
+        module = utils.create_module(utils.create_ast(source), 'target')
+        module.double(3)
+        target_ast = utils.create_ast(source)
+        patcher = hotpatch.FunctionPatcher(module, target_ast)
+        loader = hotpatch.PatchLoader()
+        results = []
+        for mutations, _ in controller.FirstOrderMutator([operators.ArithmeticOperatorReplacement]).mutate(target_ast):
+            task = workers.MutantTask('target', patcher.marshalled_original_code, None,
+                                      function_patches=patcher.create_patches(mutations))
+            patched_module = loader.activate(task)
+            self.assertEqual(patched_module.CACHE, {})
+            results.append(patched_module.double(3))
+            self.assertEqual(patched_module.COUNTER, 1)
+            loader.restore()
+
+        self.assertTrue(results)
+        self.assertNotIn(6, results)
+        loaded_module = loader.modules['target']
+        self.assertIs(patched_module, loaded_module)
+        self.assertEqual(loaded_module.CACHE, {})
+        self.assertEqual(loaded_module.COUNTER, 0)
+        self.assertEqual(loaded_module.double(3), 6)
+        self.assertEqual(module.CACHE, {3: 6})
@@ -1,10 +1,11 @@
 import ast
+import pickle
 import sys
 import unittest
 
 import pytest
 
-from mutpy import operators, codegen, coverage, utils
+from mutpy import operators, codegen, coverage, diff, utils
 
 EOL = "\n"
 INDENT = " " * 4
@@ -38,6 +39,138 @@ class MutationOperatorTest(unittest.TestCase):
 
         self.assertEqual(len(mutations), 0)
 
+    def test_mutate_only_changed_lines(self):
+        target_ast = utils.create_ast(utils.f("""
+        def foo():
+            pass
+
+        @decorator
+        def bar():
+            pass
+        """))
+
+        mutations = list(self.operator.mutate(target_ast, changed_lines=diff.ChangedLines([(6, 6)])))
+
+        self.assertEqual([mutation.node.lineno for mutation, _ in mutations], [6])
+
+    def test_no_mutations_if_no_changed_lines(self):
+        mutations = list(self.operator.mutate(self.target_ast, changed_lines=diff.ChangedLines()))
+
+        self.assertEqual(len(mutations), 0)
+
+    def test_visitor_names(self):
+        visitor_names = operators.RelationalOperatorReplacement.get_visitor_names()
+
+        self.assertEqual(visitor_names['Gt'], ['mutate_Gt', 'mutate_Gt_to_GtE'])
+        self.assertEqual(visitor_names['GtE'], ['mutate_GtE', 'mutate_GtE_to_Gt'])
+        self.assertEqual(self.PassIdOperator.get_visitor_names(), {'Pass': ['mutate_Pass']})
+
+
+class MutationWalkerTest(unittest.TestCase):
+    TARGET_SRC = utils.f("""
+    def foo(x, y):
+        if x > 1:
+            return x[y[1:2]:-1] * 2
+        for i in range(x):
+            y += i
+        return not y
+    """)
+    OPERATORS = [
+        operators.ArithmeticOperatorReplacement,
+        operators.AssignmentOperatorReplacement,
+        operators.ConditionalOperatorDeletion,
+        operators.ConditionalOperatorInsertion,
+        operators.ConstantReplacement,
+        operators.RelationalOperatorReplacement,
+        operators.SliceIndexRemove,
+        operators.ZeroIterationLoop,
+    ]
+
+    def get_mutants(self, mutations):
+        return [
+            (mutation.operator, mutation.visitor, mutation.node.lineno, codegen.to_source(mutant))
+            for mutation, mutant in mutations
+        ]
+
+    def test_same_mutations_as_operators(self):
+        target_ast = utils.create_ast(self.TARGET_SRC)
+        expected_mutants = []
+        for operator in self.OPERATORS:
+            expected_mutants += self.get_mutants(operator().mutate(target_ast))
+
+        walker = operators.MutationWalker([operator() for operator in self.OPERATORS])
+        mutants = self.get_mutants(walker.mutate(target_ast))
+
+        self.assertEqual(mutants, expected_mutants)
+        self.assertEqual(codegen.to_source(target_ast), codegen.to_source(utils.create_ast(self.TARGET_SRC)))
+
+    def test_skip_not_covered_nodes(self):
+        target_ast = utils.create_ast(self.TARGET_SRC)
+        coverage_injector = coverage.CoverageInjector()
+        module = coverage_injector.inject(target_ast)
+        module.foo(0, 1)
+
+        walker = operators.MutationWalker([operator() for operator in self.OPERATORS])
+        mutations = [mutation for mutation, _ in walker.mutate(target_ast, coverage_injector=coverage_injector)]
+
+        self.assertEqual({mutation.node.lineno for mutation in mutations}, {2, 4, 6})
+
+    def test_apply_pickled_descriptors_to_new_tree(self):
+        target_ast = utils.create_ast(self.TARGET_SRC)
+        walker = operators.MutationWalker([operator() for operator in self.OPERATORS])
+        expected_mutants = self.get_mutants(walker.mutate(target_ast))
+        descriptors = pickle.loads(pickle.dumps([mutation.descriptor for mutation in walker.describe(target_ast)]))
+
+        new_target_ast = utils.create_ast(self.TARGET_SRC)
+        mutants = []
+        for descriptor in descriptors:
+            with walker.apply(new_target_ast, [descriptor]) as (mutations, mutant):
+                mutants += self.get_mutants([(mutations[0], mutant)])
+
+        self.assertEqual(mutants, expected_mutants)
+        self.assertEqual(codegen.to_source(new_target_ast), codegen.to_source(target_ast))
+
+    def test_apply_many_descriptors_in_one_list(self):
+        target_ast = utils.create_ast(utils.f("""
+        x = 1
+        y = 2
+        z = 3
+        """))
+        walker = operators.MutationWalker([operators.StatementDeletion()])
+        descriptors = [mutation.descriptor for mutation in walker.describe(target_ast)]
+
+        with walker.apply(target_ast, [descriptors[0], descriptors[2]]) as (mutations, mutant):
+            self.assertEqual(codegen.to_source(mutant), 'pass' + EOL + 'y = 2' + EOL + 'pass')
+        self.assertEqual([mutation.node.lineno for mutation in mutations], [1, 3])
+        self.assertEqual(descriptors[2].path, [('body', 2)])
+
+    def test_deeply_nested_code(self):
+        depth = 1500
+        source = 'if ' + ' + '.join(['x'] * depth) + ':' + EOL + INDENT + PASS
+        target_ast = utils.create_ast(source)
+        walker = operators.MutationWalker([
+            operators.ConditionalOperatorInsertion(),
+            operators.ArithmeticOperatorReplacement(),
+        ])
+
+        mutations = []
+        for mutation, mutant in walker.mutate(target_ast):
+            if not mutations:
+                self.assertIsInstance(mutant.body[0].test, ast.UnaryOp)
+            mutations.append(mutation)
+        deepest_descriptor = list(walker.describe(target_ast))[1].descriptor
+        with walker.apply(utils.create_ast(source), [deepest_descriptor]) as (_, mutant):
+            node = mutant.body[0].test
+            while isinstance(node.left, ast.BinOp):
+                node = node.left
+            deepest_op = node.op
+
+        self.assertEqual(len(mutations), depth)
+        self.assertEqual(len(deepest_descriptor.path), depth + 1)
+        self.assertIsInstance(deepest_op, ast.Sub)
+        self.assertIsInstance(target_ast.body[0].test, ast.BinOp)
+        self.assertFalse(any(isinstance(node, ast.Sub) for node in ast.walk(target_ast)))
+
 
 class OperatorTestCase(unittest.TestCase):
     def assert_mutation(
@@ -940,6 +1073,21 @@ class HidingVariableDeletionTest(OperatorTestCase):
             with_exec=True,
         )
 
+    def test_original_unchanged_if_one_hiding_in_two_targets(self):
+        original = utils.f("""
+        class B:
+            x = 1
+        class A(B):
+            (x, y) = (2, 3)
+        """)
+        original_ast = utils.create_ast(original)
+        module = utils.create_module(utils.create_ast(original), 'target')
+
+        mutations = list(self.op.mutate(original_ast, module=module))
+
+        self.assertEqual(len(mutations), 1)
+        self.assertEqual(codegen.to_source(original_ast), codegen.to_source(utils.create_ast(original)))
+
     @pytest.mark.skipif(
         sys.version_info[:2] <= (3, 10),
         reason="Python 3.10 and below handle tuple unpacking differently",
@@ -1,11 +1,22 @@
+import sys
+import time
 import unittest
 
+import pytest
+
 from mutpy import utils
 from mutpy.test.utils import FileMockModulesLoader
 from mutpy.test_runners import UnittestTestRunner, PytestTestRunner
+from mutpy.test_runners.base import TEST_TIMEOUT_MARGIN
+from mutpy.test_runners.unittest_runner import UnittestTestSuite
 
 TARGET_MUL_SRC = 'def mul(x): return x * x'
 TARGET_MUL_TYPEERROR_SRC = 'def mul(x): return x * "a"'
+TARGET_MUL_LOOP_SRC = utils.f("""
+def mul(x):
+    while True:
+        pass
+""")
 
 
 class BaseTestCases:
@@ -16,10 +27,13 @@ class BaseTestCases:
         TEST_SRC_SUCCESS = None
         TEST_SRC_FAIL = None
         TEST_SRC_SKIP = None
+        TEST_SRC_TWO_FAILS = None
 
         def setUp(self):
-            if None in [self.TEST_RUNNER_CLS, self.TEST_SRC_SUCCESS, self.TEST_SRC_FAIL, self.TEST_SRC_SKIP]:
-                self.fail('Subclasses must override TEST_RUNNER_CLS, TEST_SRC_SUCCESS, TEST_SRC_FAIL and TEST_SRC_SKIP')
+            if None in [self.TEST_RUNNER_CLS, self.TEST_SRC_SUCCESS, self.TEST_SRC_FAIL, self.TEST_SRC_SKIP,
+                        self.TEST_SRC_TWO_FAILS]:
+                self.fail('Subclasses must override TEST_RUNNER_CLS, TEST_SRC_SUCCESS, TEST_SRC_FAIL, TEST_SRC_SKIP '
+                          'and TEST_SRC_TWO_FAILS')
 
         def run_test(self, target_src, test_src):
             with FileMockModulesLoader('target', target_src) as target_loader, \
@@ -30,6 +44,96 @@ class BaseTestCases:
                 result, time = runner.run_test(test_module, target_test)
             return result
 
+        def test_run_test_records_durations(self):
+            with FileMockModulesLoader('target', TARGET_MUL_SRC) as target_loader, \
+                    FileMockModulesLoader('test', self.TEST_SRC_SUCCESS) as test_loader:
+                target_loader.load()
+                runner = self.TEST_RUNNER_CLS(test_loader, 5, utils.StdoutManager(True), False)
+                test_module, target_test = test_loader.load()[0]
+                runner.run_test(test_module, target_test)
+
+            self.assertEqual(len(runner.test_durations), 1)
+            test_timeout, = runner.get_test_timeouts().values()
+            self.assertGreater(test_timeout, 0)
+            self.assertLess(test_timeout, TEST_TIMEOUT_MARGIN + 1)
+
+        @pytest.mark.skipif(sys.version_info[:2] >= (3,12), reason="MutPy mock loaders fail on Python 3.12 due to importlib changes")
+        def test_run_test_with_coverage(self):
+            with FileMockModulesLoader('target', TARGET_MUL_SRC) as target_loader, \
+                    FileMockModulesLoader('test', self.TEST_SRC_SUCCESS) as test_loader:
+                target_loader.load()
+                runner = self.TEST_RUNNER_CLS(test_loader, 5, utils.StdoutManager(True), True)
+                test_modules = test_loader.load()
+                target_ast = utils.create_ast(TARGET_MUL_SRC)
+                coverage_result = runner.inject_coverage([(target_ast, target_loader.module)], test_modules)
+                try:
+                    result, _ = runner.run_test(*test_modules[0], coverage_result=coverage_result)
+                finally:
+                    (coverage_injector, module_coverage_result), = runner.finish_coverage(coverage_result)
+
+            self.assertTrue(result.was_successful())
+            self.assertEqual(1, result.tests_run())
+            self.assertEqual(len(runner.test_durations), 1)
+            test_covered_nodes, = module_coverage_result.test_covered_nodes.values()
+            return_node = target_ast.body[0].body[0]
+            self.assertIn(return_node.marker, test_covered_nodes)
+            self.assertTrue(coverage_injector.is_covered(return_node))
+
+        def test_run_with_test_timeouts(self):
+            with FileMockModulesLoader('target', TARGET_MUL_SRC) as target_loader, \
+                    FileMockModulesLoader('test', self.TEST_SRC_SUCCESS) as test_loader:
+                target_loader.load()
+                runner = self.TEST_RUNNER_CLS(test_loader, 5, utils.StdoutManager(True), False)
+                test_module, target_test = test_loader.load()[0]
+                runner.run_test(test_module, target_test)
+                target_loader.source = TARGET_MUL_LOOP_SRC
+                target_loader.load()
+                suite = runner.create_empty_test_suite()
+                suite.add_tests(test_module, target_test)
+                suite.set_test_timeouts(runner.get_test_timeouts())
+                timer = utils.Timer()
+                result = suite.run()
+
+            self.assertLess(timer.stop(), TEST_TIMEOUT_MARGIN + 1)
+            self.assertTrue(result.timed_out)
+            self.assertIsNone(result.serialize())
+
+        @pytest.mark.skipif(sys.version_info[:2] >= (3,12), reason="MutPy mock loaders fail on Python 3.12 due to importlib changes")
+        def test_prioritize_tests(self):
+            with FileMockModulesLoader('target', TARGET_MUL_SRC) as target_loader, \
+                    FileMockModulesLoader('test', self.TEST_SRC_TWO_FAILS) as test_loader:
+                target_loader.load()
+                runner = self.TEST_RUNNER_CLS(test_loader, 5, utils.StdoutManager(True), False)
+                test_loader.load()
+                suite = runner.create_test_suite(target_loader.module)
+                test_names = [str(test) for test in suite]
+                result = suite.run()
+                prioritized_result = runner.create_test_suite(target_loader.module, test_names[1:]).run()
+
+            self.assertIn('test_first', result.get_killer())
+            self.assertIn('test_second', prioritized_result.get_killer())
+            self.assertEqual(1, prioritized_result.tests_run())
+
+        @pytest.mark.skipif(sys.version_info[:2] >= (3,12), reason="MutPy mock loaders fail on Python 3.12 due to importlib changes")
+        def test_select_tests(self):
+            with FileMockModulesLoader('target', TARGET_MUL_SRC) as target_loader, \
+                    FileMockModulesLoader('test', self.TEST_SRC_TWO_FAILS) as test_loader:
+                target_loader.load()
+                runner = self.TEST_RUNNER_CLS(test_loader, 5, utils.StdoutManager(True), False)
+                test_loader.load()
+                suite = runner.create_test_suite(target_loader.module)
+                test_ids = [repr(test) for test in suite]
+                suite.select_tests(test_ids[1:])
+                result = suite.run()
+                suite = runner.create_test_suite(target_loader.module)
+                suite.select_tests([])
+                empty_result = suite.run()
+
+            self.assertIn('test_second', result.get_killer())
+            self.assertEqual(1, result.tests_run())
+            self.assertTrue(empty_result.was_successful())
+            self.assertEqual(0, empty_result.tests_run())
+
         def test_run_test_success(self):
             result = self.run_test(TARGET_MUL_SRC, self.TEST_SRC_SUCCESS)
             self.assertTrue(result.was_successful())
@@ -95,6 +199,40 @@ class UnittestTestRunnerTest(BaseTestCases.BaseTestRunnerTest):
             def test_skipped(self):
                 pass
         """))
+    TEST_SRC_TWO_FAILS = utils.f("""
+        import target
+        from unittest import TestCase
+        class MulTest(TestCase):
+            def test_first(self):
+                self.assertEqual(target.mul(2), 5)
+            def test_second(self):
+                self.assertEqual(target.mul(2), 5)
+        """)
+
+
+    def test_durations_with_skipped_first_test(self):
+        class SkippedFirstTest(unittest.TestCase):
+            @unittest.skip('not covered')
+            def test_first(self):
+                pass
+
+            def test_second(self):
+                time.sleep(0.1)
+
+            @unittest.skip('not covered')
+            def test_third(self):
+                pass
+
+        suite = UnittestTestSuite()
+        suite.suite.addTests(unittest.TestLoader().loadTestsFromTestCase(SkippedFirstTest))
+        first_id, second_id, third_id = [repr(test) for test in suite]
+        result = suite.run()
+
+        self.assertEqual(1, result.tests_run())
+        self.assertEqual(2, result.tests_skipped())
+        self.assertGreaterEqual(result.durations[second_id], 0.1)
+        self.assertLess(result.durations.get(first_id, 0), 0.1)
+        self.assertLess(result.durations.get(third_id, 0), 0.1)
 
 
 class PytestTestRunnerTest(BaseTestCases.BaseTestRunnerTest):
@@ -116,3 +254,37 @@ class PytestTestRunnerTest(BaseTestCases.BaseTestRunnerTest):
     def test_mul():
         assert target.mul(2) == 4
     """)
+    TEST_SRC_TWO_FAILS = utils.f("""
+    import target
+    def test_first():
+        assert target.mul(2) == 5
+    def test_second():
+        assert target.mul(2) == 5
+    """)
+    TEST_SRC_SLOW_FIXTURE = utils.f("""
+    import time
+    import pytest
+    import target
+    @pytest.fixture
+    def slow():
+        time.sleep(0.3)
+        yield
+        time.sleep(0.3)
+    def test_mul(slow):
+        assert target.mul(2) == 4
+    """)
+
+    def test_test_timeout_not_applied_to_fixtures(self):
+        with FileMockModulesLoader('target', TARGET_MUL_SRC) as target_loader, \
+                FileMockModulesLoader('test', self.TEST_SRC_SLOW_FIXTURE) as test_loader:
+            target_loader.load()
+            runner = self.TEST_RUNNER_CLS(test_loader, 5, utils.StdoutManager(True), False)
+            test_module, target_test = test_loader.load()[0]
+            runner.run_test(test_module, target_test)
+            suite = runner.create_empty_test_suite()
+            suite.add_tests(test_module, target_test)
+            suite.set_test_timeouts({test_id: 0.1 for test_id in runner.get_test_timeouts()})
+            result = suite.run()
+
+        self.assertFalse(result.timed_out)
+        self.assertEqual(1, result.tests_run())
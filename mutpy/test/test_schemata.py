@@ -0,0 +1,99 @@
+import marshal
+import unittest
+
+from mutpy import codegen, controller, operators, schemata, utils
+from mutpy.workers import MutantTask
+
+
+class MutantSchemaTest(unittest.TestCase):
+    SOURCE = utils.f("""
+    def mul(x, y):
+        return x * y
+
+    class Counter:
+        step = 1 + 1
+
+        def inc(self, x):
+            if x > 0:
+                x += self.step
+            return x
+    """)
+
+    def setUp(self):
+        self.target_ast = utils.create_ast(self.SOURCE)
+        self.schema = schemata.MutantSchema(self.target_ast)
+        self.mutants_code = []
+        mutator = controller.FirstOrderMutator([
+            operators.ArithmeticOperatorReplacement,
+            operators.AssignmentOperatorReplacement,
+            operators.RelationalOperatorReplacement,
+        ])
+        for mutations, mutant_ast in mutator.mutate(self.target_ast):
+            self.schema.add(mutations)
+            self.mutants_code.append(codegen.to_source(mutant_ast))
+
+    def run_mutant(self, module):
+        return module.mul(3, 2), module.Counter.step, module.Counter().inc(1), module.Counter().inc(0)
+
+    def test_apply_recreates_mutant(self):
+        for mutant_id, mutant_code in enumerate(self.mutants_code, 1):
+            with self.schema.apply(mutant_id) as mutant_ast:
+                self.assertEqual(codegen.to_source(mutant_ast), mutant_code)
+
+        self.assertEqual(codegen.to_source(self.target_ast), codegen.to_source(utils.create_ast(self.SOURCE)))
+
+    def test_activated_mutant_behaves_like_mutant(self):
+        self.schema.compile('target')
+
+        for mutant_id, mutant_code in enumerate(self.mutants_code, 1):
+            mutant_module = utils.create_module(utils.create_ast(mutant_code), 'target')
+            schema_module = self.schema.module.activate(mutant_id)
+
+            self.assertEqual(self.run_mutant(schema_module), self.run_mutant(mutant_module))
+
+    def test_original_when_no_mutant_active(self):
+        self.schema.compile('target')
+        schema_module = self.schema.module.activate(0)
+
+        self.assertEqual(self.run_mutant(schema_module), (6, 2, 3, 0))
+
+    def test_globals_restored_between_mutants(self):
+        self.schema.compile('target')
+        schema_module = self.schema.module.activate(1)
+        schema_module.mul = None
+
+        schema_module = self.schema.module.activate(2)
+
+        self.assertIsNotNone(schema_module.mul)
+
+    def test_module_state_not_shared_by_mutants(self):
+        self.schema.compile('target')
+        schema_module = self.schema.module.activate(1)
+        schema_module.Counter.step = 10
+
+        schema_module = self.schema.module.activate(2)
+
+        self.assertEqual(schema_module.Counter.step, 2)
+
+
+class SchemaLoaderTest(unittest.TestCase):
+
+    def test_schema_loaded_once(self):
+        code = compile(utils.f("""
+        CACHE = {}
+
+        def get():
+            CACHE[__mutpy_mutant__] = True
+            return list(CACHE)
+        """), 'target', 'exec')
+        loader = schemata.SchemaLoader()
+        schema_modules = []
+
+        for mutant_id in [1, 2]:
+            task = MutantTask('target', marshal.dumps(code), None, schema_key='key', mutant_id=mutant_id)
+            module = loader.activate(task)
+            schema_modules.append(loader.schema_module)
+
+            self.assertEqual(module.get(), [mutant_id])
+
+        self.assertIs(schema_modules[0], schema_modules[1])
@@ -306,3 +306,70 @@ def test_create_ast_creates_node_with_end_linenos():
     assert function_node.lineno == 4
     assert function_node.end_lineno == 6
     assert function_docstring.lineno == 5
+
+def test_create_ast_numbers_descendants_of_node():
+    """Tests that is_descendant() finds descendants of nodes numbered by create_ast()."""
+    module_node = utils.create_ast(SAMPLE_CODE_WITH_DOCSTRINGS)
+
+    class_node = module_node.body[1]
+    function_node = class_node.body[1]
+    function_docstring = function_node.body[0].value
+
+    assert utils.is_descendant(function_docstring, class_node)
+    assert utils.is_descendant(function_docstring, module_node)
+    assert utils.is_descendant(function_node.body[1], function_node)
+    assert not utils.is_descendant(class_node, function_node)
+    assert not utils.is_descendant(class_node, class_node)
+    assert not utils.is_descendant(module_node.body[0], class_node)
+    assert not utils.is_descendant(function_docstring, ast.Expr())
+
+
+def test_copy_ast_copies_subtree_without_parent():
+    """Tests that copy_ast() copies nodes of the subtree and keeps nodes from memo."""
+    module_node = utils.create_ast('x = [y + 1, z]')
+    list_node = module_node.body[0].value
+
+    copied_node = utils.copy_ast(list_node, memo={id(list_node.parent): list_node.parent})
+
+    assert ast.dump(copied_node) == ast.dump(list_node)
+    assert copied_node.parent is list_node.parent
+    assert copied_node.elts is not list_node.elts
+    assert copied_node.elts[0] is not list_node.elts[0]
+    assert copied_node.elts[0].parent is copied_node
+    assert copied_node.elts[0].tree_index == list_node.elts[0].tree_index
+
+
+def test_copy_ast_and_fix_missing_locations_of_deep_tree():
+    """Tests that deeply nested trees don't hit the recursion limit."""
+    node = ast.Name(id='x', ctx=ast.Load())
+    for _ in range(2 * sys.getrecursionlimit()):
+        node = ast.UnaryOp(op=ast.USub(), operand=node)
+
+    copied_node = utils.fix_missing_locations(utils.copy_ast(node))
+
+    assert copied_node is not node
+    assert copied_node.lineno == 1
+    assert not hasattr(node, 'lineno')
+
+
+class UnpicklableResultSuite:
+
+    def run(self):
+        return self
+
+    def serialize(self):
+        return (number for number in range(1))
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="mutation test runner processes are not used on Windows")
+def test_mutation_test_runner_process_returns_unpicklable_result_at_once():
+    """Tests that a result which can't be sent back is reported as timeout without waiting for live time."""
+    test_runner = utils.MutationTestRunnerProcess(suite=UnpicklableResultSuite())
+    test_runner.start()
+    timer = utils.Timer()
+
+    result = test_runner.get_result(live_time=10)
+
+    test_runner.terminate()
+    assert result is None
+    assert timer.stop() < 5
@@ -0,0 +1,273 @@
+import marshal
+import os
+import socket
+import tempfile
+import unittest
+from multiprocessing import Process
+
+from mutpy import utils, workers
+
+
+class ModuleTestSuite:
+    def __init__(self, module):
+        self.module = module
+
+    def set_test_timeouts(self, test_timeouts):
+        pass
+
+    def run(self):
+        return self
+
+    def serialize(self):
+        return self.module.run()
+
+
+class ModuleTestLoader:
+    def load(self):
+        return []
+
+
+class ModuleTestRunner:
+    def __init__(self):
+        self.stdout_manager = utils.StdoutManager(False)
+        self.test_loader = ModuleTestLoader()
+        self.suite = ModuleTestSuite(None)
+
+    def create_test_suite(self, mutant_module, likely_killers=None):
+        return ModuleTestSuite(mutant_module)
+
+    def load_test_suite(self, test_modules):
+        return self.suite
+
+    def inject_mutant(self, mutant_module, test_modules):
+        self.suite.module = mutant_module
+
+
+@unittest.skipUnless(workers.is_parallel_execution_supported(), 'worker processes are not supported')
+class MutantExecutorTest(unittest.TestCase):
+    WORKER_CLS = workers.MutationWorker
+
+    def setUp(self):
+        worker_pool = workers.LocalWorkerPool(ModuleTestRunner(), self.WORKER_CLS)
+        self.executor = workers.MutantExecutor(jobs=2, live_time=0.5, worker_pool=worker_pool)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def submit(self, number, source):
+        job = workers.MutantJob(number, [], None, None)
+        code = compile(source, 'mutant', 'exec')
+        return self.executor.submit(job, workers.MutantTask('mutant', marshal.dumps(code), None))
+
+    def test_jobs_finished_in_submission_order(self):
+        self.submit(1, 'import time\ndef run(): time.sleep(0.2); return 1')
+        self.submit(2, 'def run(): return 2')
+        finished_jobs = self.executor.finish()
+
+        self.assertEqual([job.number for job in finished_jobs], [1, 2])
+        self.assertEqual([job.result for job in finished_jobs], [1, 2])
+
+    def test_new_worker_for_every_mutant(self):
+        self.submit(1, 'import os\ndef run(): return os.getpid()')
+        first_job, = self.executor.finish()
+        self.submit(2, 'import os\ndef run(): return os.getpid()')
+        second_job, = self.executor.finish()
+
+        self.assertNotEqual(first_job.result, second_job.result)
+        self.assertNotEqual(first_job.result, os.getpid())
+
+    def test_mutant_state_not_kept_in_worker(self):
+        self.submit(1, 'import os\ndef run(): os.environ["MUTPY_WORKER_TEST"] = "1"')
+        self.executor.finish()
+        self.submit(2, 'import os\ndef run(): return os.environ.get("MUTPY_WORKER_TEST")')
+        job, = self.executor.finish()
+
+        self.assertIsNone(job.result)
+
+    def test_mutant_executed_only_in_worker(self):
+        self.submit(1, 'import os\nos.environ["MUTPY_WORKER_IMPORT_TEST"] = "1"\ndef run(): return 1')
+        job, = self.executor.finish()
+
+        self.assertEqual(job.result, 1)
+        self.assertNotIn('MUTPY_WORKER_IMPORT_TEST', os.environ)
+
+    def test_incompetent_mutant(self):
+        self.submit(1, 'raise TypeError("incompetent")\ndef run(): return 1')
+        job, = self.executor.finish()
+
+        self.assertTrue(job.result.is_incompetent)
+        self.assertIsInstance(job.result.exception, TypeError)
+        self.assertEqual(job.result.tests_run, 0)
+
+    def test_next_mutant_after_timeout(self):
+        self.submit(1, 'def run():\n    while True: pass')
+        timeout_job, = self.executor.finish()
+        self.submit(2, 'def run(): return 2')
+        next_job, = self.executor.finish()
+
+        self.assertIsNone(timeout_job.result)
+        self.assertEqual(next_job.result, 2)
+
+    def test_job_without_task_is_finished_in_order(self):
+        self.submit(1, 'import time\ndef run(): time.sleep(0.2); return 1')
+        job = workers.MutantJob(2, [], None, None)
+        job.finish(exception=TypeError())
+        self.assertEqual(self.executor.submit(job, None), [])
+
+        finished_jobs = self.executor.finish()
+
+        self.assertEqual([job.number for job in finished_jobs], [1, 2])
+
+
+@unittest.skipUnless(workers.is_parallel_execution_supported(), 'worker processes are not supported')
+class ReusedMutantExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        worker_pool = workers.LocalWorkerPool(ModuleTestRunner(), reuse_workers=True)
+        self.executor = workers.MutantExecutor(jobs=1, live_time=0.5, worker_pool=worker_pool)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_worker_reused(self):
+        code = compile('import os\ndef run(): return os.getpid()', 'mutant', 'exec')
+        finished_jobs = []
+        for number in [1, 2]:
+            job = workers.MutantJob(number, [], None, None)
+            finished_jobs += self.executor.submit(job, workers.MutantTask('mutant', marshal.dumps(code), None))
+        first_job, second_job = finished_jobs + self.executor.finish()
+
+        self.assertEqual(first_job.result, second_job.result)
+        self.assertNotEqual(first_job.result, os.getpid())
+        self.assertEqual(len(self.executor.idle_workers), 1)
+
+
+@unittest.skipUnless(workers.is_parallel_execution_supported(), 'worker processes are not supported')
+class ZygoteMutantExecutorTest(MutantExecutorTest):
+    WORKER_CLS = workers.ZygoteMutationWorker
+
+    def test_worker_reused(self):
+        self.submit(1, 'import os\ndef run(): return os.getppid()')
+        first_job, = self.executor.finish()
+        self.submit(2, 'import os\ndef run(): return os.getppid()')
+        second_job, = self.executor.finish()
+
+        self.assertEqual(first_job.result, second_job.result)
+        self.assertNotEqual(first_job.result, os.getpid())
+
+    def test_next_mutant_after_timeout(self):
+        self.submit(1, 'def run():\n    while True: pass')
+        timeout_job, = self.executor.finish()
+        self.submit(2, 'import os\ndef run(): return os.getppid()')
+        next_job, = self.executor.finish()
+
+        self.assertIsNone(timeout_job.result)
+        self.assertEqual(next_job.result, self.executor.idle_workers[0].pid)
+
+
+@unittest.skipUnless(workers.is_parallel_execution_supported(), 'worker processes are not supported')
+class RemoteMutantExecutorTest(unittest.TestCase):
+    AUTHKEY = b'mutpy'
+
+    def setUp(self):
+        self.worker_pool = workers.RemoteWorkerPool(('localhost', 0), self.AUTHKEY)
+        self.executor = workers.MutantExecutor(jobs=2, live_time=0.5, worker_pool=self.worker_pool)
+        self.remote_workers = [
+            Process(target=workers.run_remote_worker, args=(self.worker_pool.address, self.AUTHKEY, ModuleTestRunner()))
+            for _ in range(2)
+        ]
+        for remote_worker in self.remote_workers:
+            remote_worker.start()
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.worker_pool.close()
+        for remote_worker in self.remote_workers:
+            remote_worker.join(5)
+            remote_worker.kill()
+
+    def submit(self, number, source):
+        job = workers.MutantJob(number, [], None, None)
+        code = compile(source, 'mutant', 'exec')
+        return self.executor.submit(job, workers.MutantTask('mutant', marshal.dumps(code), None))
+
+    def test_mutants_distributed_to_workers(self):
+        finished_jobs = []
+        for number in range(1, 5):
+            finished_jobs += self.submit(number, 'import os, time\ndef run(): time.sleep(0.1); return os.getppid()')
+        finished_jobs += self.executor.finish()
+
+        self.assertEqual([job.number for job in finished_jobs], [1, 2, 3, 4])
+        self.assertEqual(
+            {job.result for job in finished_jobs},
+            {remote_worker.pid for remote_worker in self.remote_workers},
+        )
+
+    def test_timeout(self):
+        self.submit(1, 'def run():\n    while True: pass')
+        self.submit(2, 'def run(): return 2')
+        timeout_job, next_job = self.executor.finish()
+
+        self.assertIsNone(timeout_job.result)
+        self.assertEqual(next_job.result, 2)
+
+    def test_remote_workers_stopped_after_shutdown(self):
+        self.submit(1, 'def run(): return 1')
+        self.submit(2, 'def run(): return 2')
+        self.executor.finish()
+        self.executor.shutdown()
+
+        for remote_worker in self.remote_workers:
+            remote_worker.join(5)
+            self.assertEqual(remote_worker.exitcode, 0)
+
+
+@unittest.skipUnless(workers.is_parallel_execution_supported(), 'worker processes are not supported')
+class RemoteWorkerPoolTest(unittest.TestCase):
+
+    def test_no_worker_connected(self):
+        worker_pool = workers.RemoteWorkerPool(('localhost', 0), b'mutpy', accept_timeout=0.1)
+        executor = workers.MutantExecutor(jobs=1, live_time=0.5, worker_pool=worker_pool)
+        code = compile('def run(): return 1', 'mutant', 'exec')
+        try:
+            with self.assertRaises(workers.NoWorkerException):
+                executor.submit(workers.MutantJob(1, [], None, None),
+                                workers.MutantTask('mutant', marshal.dumps(code), None))
+        finally:
+            executor.shutdown()
+            worker_pool.close()
+
+        self.assertFalse(worker_pool.accept_thread.is_alive())
+
+
+@unittest.skipUnless(workers.is_parallel_execution_supported(), 'worker processes are not supported')
+class RunRemoteWorkerTest(unittest.TestCase):
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix sockets are not supported')
+    def test_remote_worker_exits_when_coordinator_is_gone(self):
+        # Unix socket reports the closed coordinator already to the first send of a result
+        with tempfile.TemporaryDirectory() as directory:
+            address = os.path.join(directory, 'mutpy.sock')
+            worker_pool = workers.RemoteWorkerPool(address, b'mutpy')
+            remote_worker = Process(target=workers.run_remote_worker, args=(address, b'mutpy', ModuleTestRunner()))
+            remote_worker.start()
+            try:
+                worker = worker_pool.start_worker(0.5)
+                code = compile('import time\ndef run(): time.sleep(0.2); return 1', 'mutant', 'exec')
+                worker.send(workers.MutantTask('mutant', marshal.dumps(code), None))
+                worker.destroy()
+                remote_worker.join(5)
+            finally:
+                worker_pool.close()
+                remote_worker.kill()
+
+        self.assertEqual(remote_worker.exitcode, 0)
+
+
+class ParseAddressTest(unittest.TestCase):
+
+    def test_tcp_address(self):
+        self.assertEqual(workers.parse_address('localhost:8765'), ('localhost', 8765))
+
+    def test_unix_socket_address(self):
+        self.assertEqual(workers.parse_address('/tmp/mutpy.sock'), '/tmp/mutpy.sock')
@@ -17,10 +17,24 @@ class MockModulesLoader:
         sys.modules[self.names[0]] = self.module
         return [(self.module, None)]
 
-    def get_source(self):
+    def get_source(self, module_name=None):
         return self.source
 
 
+class MultiMockModulesLoader:
+    """Loads modules of several mock loaders, like one loader of multiple targets."""
+
+    def __init__(self, *loaders):
+        self.loaders = loaders
+        self.names = [name for loader in loaders for name in loader.names]
+
+    def load(self, *args, **kwargs):
+        return [module for loader in self.loaders for module in loader.load(*args, **kwargs)]
+
+    def get_source(self, module_name):
+        return next(loader.get_source() for loader in self.loaders if module_name in loader.names)
+
+
 class FileMockModulesLoader:
     """Behaves like MockModulesLoader but creates the module as actual file."""
 
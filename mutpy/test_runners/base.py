@@ -1,25 +1,51 @@
+import signal
 import sys
+import threading
 from abc import abstractmethod
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 
 from mutpy import utils, coverage
 
+TEST_TIMEOUT_MARGIN = 1
+MUTANT_TIMEOUT_MARGIN = 1
+
 
 class BaseTestSuite:
+    test_timeouts = None
+
     @abstractmethod
     def add_tests(self, test_module, target_test):
         pass
 
+    def set_test_timeouts(self, test_timeouts):
+        self.test_timeouts = test_timeouts
+
     @abstractmethod
     def skip_test(self, test):
         pass
 
+    def select_tests(self, test_ids):
+        """
+        Run only tests with given ids.
+
+        Other tests are skipped by default, suites which can leave them
+        out of the run override it, so that they aren't reported at all.
+        """
+        test_ids = set(test_ids)
+        for test in self:
+            if repr(test) not in test_ids:
+                self.skip_test(test)
+
+    @abstractmethod
+    def prioritize_tests(self, test_names):
+        pass
+
     @abstractmethod
     def run(self):
         pass
 
     @abstractmethod
-    def run_with_coverage(self, coverage_injector=None):
+    def run_with_coverage(self, coverage_result):
         pass
 
     @abstractmethod
@@ -33,22 +59,141 @@ class BaseTest:
     def __repr__(self):
         pass
 
+    @abstractmethod
+    def get_source(self):
+        pass
+
+
+def get_test_covered_nodes(test_coverage, always_coverage):
+    return {
+        test_id: set(coverage.iter_bitset(test_bitset | always_coverage))
+        for test_id, test_bitset in test_coverage.items()
+    }
+
+
+class ModuleCoverageResult:
+    """
+    Coverage of a single module with index of tests covering every node.
+
+    Coverage is stored in bitsets (see `coverage.to_bitset`): markers covered
+    by every test and positions of tests (in `test_ids`) covering every
+    marker. Nodes covered outside of tests (e.g. at import time) are covered
+    by every test, so they aren't indexed.
+    """
+
+    def __init__(self, test_coverage, always_coverage):
+        self.test_coverage = test_coverage
+        self.test_ids = list(test_coverage)
+        self.always_coverage = always_coverage
+        positions_by_marker = defaultdict(list)
+        for position, test_bitset in enumerate(test_coverage.values()):
+            for marker in coverage.iter_bitset(test_bitset & ~always_coverage):
+                positions_by_marker[marker].append(position)
+        self.tests_by_marker = {
+            marker: coverage.to_bitset(positions) for marker, positions in positions_by_marker.items()
+        }
+
+    @property
+    def test_covered_nodes(self):
+        return get_test_covered_nodes(self.test_coverage, self.always_coverage)
+
+    def find_covering_tests(self, markers):
+        """
+        Return ids of tests covering any of markers, in order of their run.
+        """
+        tests_bitset = 0
+        for marker in markers:
+            if self.always_coverage >> marker & 1:
+                return list(self.test_ids)
+            tests_bitset |= self.tests_by_marker.get(marker, 0)
+        return [self.test_ids[position] for position in coverage.iter_bitset(tests_bitset)]
+
 
 class CoverageTestResult:
+    """
+    Records nodes covered by every test, coverage of several modules can be measured by a single run.
+    """
 
-    def __init__(self, *args, coverage_injector=None, **kwargs):
+    def __init__(self, *args, coverage_injector=None, coverage_injectors=None, continued_result=None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.coverage_injector = coverage_injector
-        self.always_covered_nodes = coverage_injector.covered_nodes.copy()
-        self.test_covered_nodes = {}
+        if continued_result:
+            # tests are recorded to the maps of continued result, e.g. when test modules are run separately
+            self.coverage_injectors = continued_result.coverage_injectors
+            self.always_coverage = continued_result.always_coverage
+            self.modules_test_coverage = continued_result.modules_test_coverage
+        else:
+            self.coverage_injectors = coverage_injectors or [coverage_injector]
+            self.always_coverage = [coverage.to_bitset(injector.covered_nodes) for injector in self.coverage_injectors]
+            # bitset of markers covered by every test, for every module
+            self.modules_test_coverage = [{} for _ in self.coverage_injectors]
+        self.covered_nodes = []
+
+    @property
+    def test_covered_nodes(self):
+        return get_test_covered_nodes(self.modules_test_coverage[0], self.always_coverage[0])
 
     def start_measure_coverage(self):
-        self.covered_nodes = self.coverage_injector.covered_nodes.copy()
-        self.coverage_injector.covered_nodes.clear()
+        # nodes covered so far are put aside, so injectors collect only nodes covered by the test
+        self.covered_nodes = []
+        for coverage_injector in self.coverage_injectors:
+            self.covered_nodes.append(coverage_injector.covered_nodes)
+            coverage_injector.covered_nodes = set()
+            coverage_injector.restart()
 
     def stop_measure_coverage(self, test):
-        self.test_covered_nodes[repr(test)] = self.coverage_injector.covered_nodes.copy() | self.always_covered_nodes
-        self.coverage_injector.covered_nodes.update(self.covered_nodes)
+        test_id = repr(test)
+        for coverage_injector, test_coverage, covered_nodes in zip(
+                self.coverage_injectors, self.modules_test_coverage, self.covered_nodes):
+            test_coverage[test_id] = coverage.to_bitset(coverage_injector.covered_nodes)
+            covered_nodes.update(coverage_injector.covered_nodes)
+            coverage_injector.covered_nodes = covered_nodes
+
+    def get_module_results(self):
+        return [
+            ModuleCoverageResult(test_coverage, always_coverage)
+            for test_coverage, always_coverage in zip(self.modules_test_coverage, self.always_coverage)
+        ]
+
+
+class TestTimeout(BaseException):
+    pass
+
+
+class TestTimeoutGuard:
+    """
+    Interrupts test running longer than its timeout by raising `TestTimeout` from SIGALRM handler.
+
+    It is active only when per-test timeouts are given and signals can be used,
+    mutant is still stopped after its whole live time otherwise.
+    """
+
+    def __init__(self, test_timeouts=None):
+        self.test_timeouts = test_timeouts or {}
+        self.enabled = bool(self.test_timeouts) and hasattr(signal, 'setitimer') and \
+            threading.current_thread() is threading.main_thread()
+        self.armed = False
+        self.timed_out = False
+        self.previous_handler = None
+
+    def start(self, test_id):
+        timeout = self.test_timeouts.get(test_id)
+        if not self.enabled or not timeout:
+            return
+        self.previous_handler = signal.signal(signal.SIGALRM, self.interrupt)
+        self.armed = True
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    def stop(self):
+        if not self.armed:
+            return
+        self.armed = False
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, self.previous_handler)
+
+    def interrupt(self, signum, frame):
+        if self.armed:
+            self.timed_out = True
+            raise TestTimeout()
 
 
 SerializableMutationTestResult = namedtuple(
@@ -71,6 +216,8 @@ class MutationTestResult:
         self.failed = []
         self.type_error = None
         self.skipped = []
+        self.durations = {}
+        self.timed_out = False
 
     def was_successful(self):
         return len(self.failed) == 0 and not self.is_incompetent()
@@ -105,6 +252,8 @@ class MutationTestResult:
         return len(self.skipped)
 
     def serialize(self):
+        if self.timed_out:
+            return None
         return SerializableMutationTestResult(
             self.is_incompetent(),
             self.is_survived(),
@@ -117,6 +266,12 @@ class MutationTestResult:
     def set_type_error(self, err):
         self.type_error = err
 
+    def set_timeout(self):
+        self.timed_out = True
+
+    def add_duration(self, test_id, duration):
+        self.durations[test_id] = self.durations.get(test_id, 0) + duration
+
     def add_passed(self, name):
         self.passed.append(TestInfo(name))
 
@@ -142,40 +297,68 @@ class TestFailure(TestInfo):
 class BaseTestRunner:
     test_suite_cls = None
 
-    def __init__(self, test_loader, timeout_factor, stdout_manager, mutate_covered):
+    def __init__(self, test_loader, timeout_factor, stdout_manager, mutate_covered,
+                 coverage_backend=coverage.AST_BACKEND):
         self.test_loader = test_loader
         self.timeout_factor = timeout_factor
         self.stdout_manager = stdout_manager
         self.mutate_covered = mutate_covered
+        self.coverage_backend = coverage_backend
+        self.test_durations = {}
         self.init_modules = self.find_init_modules()
 
     def create_empty_test_suite(self):
         return self.test_suite_cls()
 
-    def create_test_suite(self, mutant_module):
+    def create_test_suite(self, mutant_module, likely_killers=None):
+        suite = self.create_injected_test_suite([mutant_module])
+        if likely_killers:
+            suite.prioritize_tests(likely_killers)
+        return suite
+
+    def create_injected_test_suite(self, mutant_modules):
         if not issubclass(self.test_suite_cls, BaseTestSuite):
             raise ValueError('{0} is not a subclass of {1}'.format(self.test_suite_cls, BaseTestSuite))
+        test_modules = list(self.test_loader.load())
+        self.inject_mutants(mutant_modules, test_modules)
+        return self.load_test_suite(test_modules)
+
+    def load_test_suite(self, test_modules):
         suite = self.create_empty_test_suite()
-        injector = utils.ModuleInjector(mutant_module)
-        for test_module, target_test in self.test_loader.load():
-            injector.inject_to(test_module)
+        for test_module, target_test in test_modules:
             suite.add_tests(test_module, target_test)
-        importer = utils.InjectImporter(mutant_module)
-        importer.install()
         return suite
 
+    def inject_mutant(self, mutant_module, test_modules):
+        self.inject_mutants([mutant_module], test_modules)
+
+    def inject_mutants(self, mutant_modules, test_modules):
+        for test_module, _ in test_modules:
+            original_dict = test_module.__dict__.copy()
+            for mutant_module in mutant_modules:
+                # name is injected only by the first module providing it
+                names = [name for name, value in original_dict.items() if test_module.__dict__.get(name) is value]
+                utils.ModuleInjector(mutant_module).inject_to(test_module, names)
+        importer = utils.InjectImporter(*mutant_modules)
+        importer.install()
+
     @utils.TimeRegister
-    def run_tests_with_mutant(self, total_duration, mutant_module, mutations, coverage_result):
-        suite = self.create_test_suite(mutant_module)
+    def run_tests_with_mutant(self, total_duration, mutant_module, mutations, coverage_result, likely_killers=None):
+        suite = self.create_test_suite(mutant_module, likely_killers)
+        covering_tests = None
         if coverage_result:
-            self.mark_not_covered_tests_as_skip(mutations, coverage_result, suite)
+            covering_tests = self.find_covering_tests(mutations, coverage_result)
+            self.select_covering_tests(covering_tests, suite)
+        test_timeouts = self.get_test_timeouts(covering_tests)
+        suite.set_test_timeouts(test_timeouts)
         timer = utils.Timer()
-        result = self.run_mutation_test_runner(suite, total_duration)
+        live_time = self.get_mutant_live_time(test_timeouts, total_duration)
+        result = self.run_mutation_test_runner(suite, total_duration, live_time)
         timer.stop()
         return result, timer.duration
 
-    def run_mutation_test_runner(self, suite, total_duration):
-        live_time = self.timeout_factor * (total_duration if total_duration > 1 else 1)
+    def run_mutation_test_runner(self, suite, total_duration, live_time=None):
+        live_time = live_time or self.get_live_time(total_duration)
         test_runner_class = utils.get_mutation_test_runner_class()
         test_runner = test_runner_class(suite=suite)
         with self.stdout_manager:
@@ -184,23 +367,66 @@ class BaseTestRunner:
             test_runner.terminate()
         return result
 
-    def inject_coverage(self, target_ast, target_module):
-        if not self.mutate_covered:
-            return None, None
-        coverage_injector = coverage.CoverageInjector()
-        coverage_module = coverage_injector.inject(target_ast, target_module.__name__)
-        suite = self.create_test_suite(coverage_module)
-        with self.stdout_manager:
-            coverage_result = suite.run_with_coverage(coverage_injector=coverage_injector)
-        return coverage_injector, coverage_result
-
-    def run_test(self, test_module, target_test):
+    def get_live_time(self, total_duration):
+        return self.timeout_factor * (total_duration if total_duration > 1 else 1)
+
+    def get_test_timeouts(self, test_ids=None):
+        if test_ids is None:
+            test_ids = self.test_durations.keys()
+        return {
+            test_id: self.timeout_factor * self.test_durations[test_id] + TEST_TIMEOUT_MARGIN
+            for test_id in test_ids if test_id in self.test_durations
+        }
+
+    def get_mutant_live_time(self, test_timeouts, total_duration):
+        # live time of all tests is a floor, timeouts of single tests don't cover overhead of runner or busy CPU
+        live_time = self.get_live_time(total_duration)
+        if not test_timeouts:
+            return live_time
+        return max(sum(test_timeouts.values()) + MUTANT_TIMEOUT_MARGIN, live_time)
+
+    def inject_coverage(self, targets, test_modules):
+        """
+        Inject all targets (pairs of AST and module) with coverage to test modules.
+
+        Return coverage result, tests run with it record coverage of all targets until `finish_coverage`.
+        """
+        if not self.mutate_covered or not targets:
+            return None
+        coverage_injectors = []
+        try:
+            coverage_modules = []
+            for target_ast, target_module in targets:
+                coverage_injector = coverage.create_coverage_injector(self.coverage_backend)
+                coverage_injectors.append(coverage_injector)
+                coverage_modules.append(coverage_injector.inject(target_ast, target_module.__name__))
+            self.inject_mutants(coverage_modules, test_modules)
+        except BaseException:
+            self.stop_coverage(coverage_injectors)
+            raise
+        return CoverageTestResult(coverage_injectors=coverage_injectors)
+
+    def finish_coverage(self, coverage_result):
+        """
+        Stop measuring coverage and return pair of coverage injector and coverage result for every target.
+        """
+        self.stop_coverage(coverage_result.coverage_injectors)
+        return list(zip(coverage_result.coverage_injectors, coverage_result.get_module_results()))
+
+    @staticmethod
+    def stop_coverage(coverage_injectors):
+        for coverage_injector in coverage_injectors:
+            coverage_injector.stop()
+
+    def run_test(self, test_module, target_test, coverage_result=None):
         suite = self.create_empty_test_suite()
         suite.add_tests(test_module, target_test)
         timer = utils.Timer()
         with self.stdout_manager:
-            result = suite.run()
-        return result, timer.stop()
+            result = suite.run_with_coverage(coverage_result) if coverage_result else suite.run()
+        duration = timer.stop()
+        self.test_durations.update(result.durations)
+        return result, duration
 
     def find_init_modules(self):
         test_runner_class = utils.get_mutation_test_runner_class()
@@ -214,11 +440,8 @@ class BaseTestRunner:
             if module not in self.init_modules:
                 del sys.modules[module]
 
-    def mark_not_covered_tests_as_skip(self, mutations, coverage_result, suite):
-        mutated_nodes = {mutation.node.marker for mutation in mutations}
+    def find_covering_tests(self, mutations, coverage_result):
+        return coverage_result.find_covering_tests(mutation.node.marker for mutation in mutations)
 
-        for test in suite:
-            test_id = repr(test)
-            if test_id in coverage_result.test_covered_nodes and mutated_nodes.isdisjoint(
-                    coverage_result.test_covered_nodes[test_id]):
-                suite.skip_test(test)
+    def select_covering_tests(self, covering_tests, suite):
+        suite.select_tests(covering_tests)
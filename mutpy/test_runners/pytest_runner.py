@@ -1,14 +1,21 @@
+import inspect
+import os
+
 import pytest
 from _pytest.config import default_plugins
 
-from mutpy.test_runners.base import BaseTestSuite, BaseTestRunner, MutationTestResult, CoverageTestResult, BaseTest
+from mutpy.test_runners.base import BaseTestSuite, BaseTestRunner, MutationTestResult, CoverageTestResult, BaseTest, \
+    TestTimeoutGuard
 
 
 class PytestMutpyPlugin:
 
-    def __init__(self, skipped_tests):
+    def __init__(self, skipped_tests, test_timeouts=None, likely_killers=None, selected_tests=None):
         self.skipped_tests = skipped_tests
+        self.selected_tests = selected_tests
+        self.likely_killers = likely_killers or []
         self.mutation_test_result = MutationTestResult()
+        self.timeout_guard = TestTimeoutGuard(test_timeouts)
 
     def has_failed_before(self, nodeid):
         return next((test for test in self.mutation_test_result.failed if test.name == nodeid), None) is not None
@@ -16,13 +23,32 @@ class PytestMutpyPlugin:
     def has_been_skipped_before(self, nodeid):
         return next((test for test in self.mutation_test_result.skipped if test.name == nodeid), None) is not None
 
-    def pytest_collection_modifyitems(self, items):
+    def pytest_collection_modifyitems(self, config, items):
+        if self.selected_tests is not None:
+            deselected = [item for item in items if item.nodeid not in self.selected_tests]
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+                items[:] = [item for item in items if item.nodeid in self.selected_tests]
         for item in items:
             if item.nodeid in self.skipped_tests:
                 item.add_marker(pytest.mark.skip)
+        priorities = {nodeid: priority for priority, nodeid in enumerate(self.likely_killers)}
+        items.sort(key=lambda item: priorities.get(item.nodeid, len(priorities)))
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        # guard is armed only around the test itself, pytest can't handle TestTimeout raised from its hooks
+        self.timeout_guard.start(item.nodeid)
+        try:
+            yield
+        finally:
+            self.timeout_guard.stop()
 
     def pytest_runtest_logreport(self, report):
-        if report.skipped:
+        self.mutation_test_result.add_duration(report.nodeid, report.duration)
+        if self.timeout_guard.timed_out:
+            self.mutation_test_result.set_timeout()
+        elif report.skipped:
             self.mutation_test_result.add_skipped(report.nodeid)
         elif report.failed and not self.has_failed_before(report.nodeid):
             if 'TypeError' in report.longrepr.reprcrash.message:
@@ -38,11 +64,12 @@ class PytestMutpyPlugin:
             self.mutation_test_result.add_passed(report.nodeid)
 
 
-class PytestMutpyCoveragePlugin:
+class PytestMutpyCoveragePlugin(PytestMutpyPlugin):
 
-    def __init__(self, coverage_injector):
+    def __init__(self, coverage_result):
+        super().__init__(skipped_tests=set())
         self.current_test = None
-        self.coverage_result = CoverageTestResult(coverage_injector=coverage_injector)
+        self.coverage_result = CoverageTestResult(continued_result=coverage_result)
 
     def pytest_runtest_setup(self, item):
         self.coverage_result.start_measure_coverage()
@@ -66,6 +93,8 @@ class PytestTestSuite(BaseTestSuite):
     def __init__(self):
         self.tests = set()
         self.skipped_tests = set()
+        self.selected_tests = None
+        self.likely_killers = []
 
     def add_tests(self, test_module, target_test):
         if target_test:
@@ -78,15 +107,58 @@ class PytestTestSuite(BaseTestSuite):
     def skip_test(self, test):
         self.skipped_tests.add(test.internal_test_obj.nodeid)
 
+    def select_tests(self, test_ids):
+        # node ids are kept in order, pytest runs them in order of arguments
+        self.selected_tests = list(test_ids)
+
+    def prioritize_tests(self, test_names):
+        self.likely_killers = test_names
+
     def run(self):
-        mutpy_plugin = PytestMutpyPlugin(skipped_tests=self.skipped_tests)
-        pytest.main(args=list(self.tests) + ['-x', '-p', 'no:terminal'], plugins=list(default_plugins) + [mutpy_plugin])
+        mutpy_plugin = PytestMutpyPlugin(
+            skipped_tests=self.skipped_tests,
+            test_timeouts=self.test_timeouts,
+            likely_killers=self.likely_killers,
+            selected_tests=set(self.selected_tests) if self.selected_tests is not None else None,
+        )
+        if self.selected_tests == []:
+            # without arguments pytest would collect tests from the current directory
+            return mutpy_plugin.mutation_test_result
+        pytest.main(args=self.get_test_args() + ['-x', '-p', 'no:terminal'],
+                    plugins=list(default_plugins) + [mutpy_plugin])
+        if mutpy_plugin.timeout_guard.timed_out:
+            # e.g. test timed out just before guard was stopped, so no report has it
+            mutpy_plugin.mutation_test_result.set_timeout()
         return mutpy_plugin.mutation_test_result
 
-    def run_with_coverage(self, coverage_injector=None):
-        mutpy_plugin = PytestMutpyCoveragePlugin(coverage_injector=coverage_injector)
-        pytest.main(list(self.tests) + ['-p', 'no:terminal'], plugins=list(default_plugins) + [mutpy_plugin])
-        return mutpy_plugin.coverage_result
+    def get_test_args(self):
+        """
+        Return node ids of selected tests (with absolute paths), so that other tests aren't even collected.
+
+        Paths of all tests are returned if some selected test isn't found in them, it's deselected after collection.
+        """
+        if self.selected_tests is None:
+            return list(self.tests)
+        paths = [test.split('::')[0] for test in self.tests]
+        node_ids = []
+        for test_id in self.selected_tests:
+            # node id starts with path relative to root directory of pytest
+            relative_path, separator, name = test_id.partition('::')
+            path = next((path for path in paths if self.is_same_path(path, relative_path)), None)
+            if path is None:
+                return list(self.tests)
+            node_ids.append(path + separator + name)
+        return node_ids
+
+    @staticmethod
+    def is_same_path(path, relative_path):
+        path = path.replace(os.sep, '/')
+        return path == relative_path or path.endswith('/' + relative_path)
+
+    def run_with_coverage(self, coverage_result):
+        mutpy_plugin = PytestMutpyCoveragePlugin(coverage_result=coverage_result)
+        pytest.main(args=list(self.tests) + ['-x', '-p', 'no:terminal'], plugins=list(default_plugins) + [mutpy_plugin])
+        return mutpy_plugin.mutation_test_result
 
     def __iter__(self):
         mutpy_plugin = PytestMutpyTestDiscoveryPlugin()
@@ -104,6 +176,9 @@ class PytestTest(BaseTest):
     def __init__(self, internal_test_obj):
         self.internal_test_obj = internal_test_obj
 
+    def get_source(self):
+        return inspect.getsource(self.internal_test_obj.obj)
+
 
 class PytestTestRunner(BaseTestRunner):
     test_suite_cls = PytestTestSuite
@@ -1,15 +1,33 @@
+import inspect
+import time
 import unittest
 
-from mutpy.test_runners.base import CoverageTestResult, BaseTestSuite, BaseTestRunner, MutationTestResult, BaseTest
+from mutpy.test_runners.base import CoverageTestResult, BaseTestSuite, BaseTestRunner, MutationTestResult, BaseTest, \
+    TestTimeout, TestTimeoutGuard
 
 
 class UnittestMutationTestResult(unittest.TestResult):
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, test_timeouts=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.type_error = None
         self.failfast = True
         self.mutation_test_result = MutationTestResult()
+        self.timeout_guard = TestTimeoutGuard(test_timeouts)
+        self.start_time = None
+
+    def startTest(self, test):
+        super().startTest(test)
+        self.start_time = time.time()
+        self.timeout_guard.start(repr(test))
+
+    def stopTest(self, test):
+        self.timeout_guard.stop()
+        # since Python 3.12 skipped tests are stopped without being started
+        if self.start_time is not None:
+            self.mutation_test_result.add_duration(repr(test), time.time() - self.start_time)
+        super().stopTest(test)
+        self.start_time = None
 
     def addSuccess(self, test):
         super().addSuccess(test)
@@ -32,7 +50,10 @@ class UnittestMutationTestResult(unittest.TestResult):
         self._add_latest_skip()
 
     def addError(self, test, err):
-        if err[0] == TypeError:
+        if self.timeout_guard.timed_out:
+            self.mutation_test_result.set_timeout()
+            self.stop()
+        elif err[0] == TypeError:
             self.mutation_test_result.set_type_error(err)
         else:
             super(UnittestMutationTestResult, self).addError(test, err)
@@ -62,15 +83,17 @@ class UnittestMutationTestResult(unittest.TestResult):
         return traceback.split("\n")[-2]
 
 
-class UnittestCoverageResult(CoverageTestResult, unittest.TestResult):
+class UnittestCoverageResult(CoverageTestResult, UnittestMutationTestResult):
 
     def startTest(self, test):
         super().startTest(test)
         self.start_measure_coverage()
 
     def stopTest(self, test):
+        started = self.start_time is not None
         super().stopTest(test)
-        self.stop_measure_coverage(UnittestTest(test))
+        if started:
+            self.stop_measure_coverage(UnittestTest(test))
 
 
 class UnittestTestSuite(BaseTestSuite):
@@ -86,15 +109,30 @@ class UnittestTestSuite(BaseTestSuite):
         setattr(test.internal_test_obj, test.internal_test_obj._testMethodName,
                 unittest.skip('not covered')(test_method))
 
+    def select_tests(self, test_ids):
+        test_ids = set(test_ids)
+        self.suite = unittest.TestSuite(test for test in self.iter_tests(self.suite) if repr(test) in test_ids)
+
+    def prioritize_tests(self, test_names):
+        priorities = {test_name: priority for priority, test_name in enumerate(test_names)}
+        tests = list(self.iter_tests(self.suite))
+        tests.sort(key=lambda test: priorities.get(str(test), len(priorities)))
+        self.suite = unittest.TestSuite(tests)
+
     def run(self):
-        result = UnittestMutationTestResult()
-        self.suite.run(result)
+        result = UnittestMutationTestResult(test_timeouts=self.test_timeouts)
+        try:
+            self.suite.run(result)
+        except TestTimeout:
+            # test timed out outside of its body, e.g. just before guard was stopped
+            result.timeout_guard.stop()
+            result.mutation_test_result.set_timeout()
         return result.mutation_test_result
 
-    def run_with_coverage(self, coverage_injector=None):
-        coverage_result = UnittestCoverageResult(coverage_injector=coverage_injector)
-        self.suite.run(coverage_result)
-        return coverage_result
+    def run_with_coverage(self, coverage_result):
+        result = UnittestCoverageResult(continued_result=coverage_result)
+        self.suite.run(result)
+        return result.mutation_test_result
 
     def load_tests(self, test_module, target_test):
         if target_test:
@@ -105,7 +143,7 @@ class UnittestTestSuite(BaseTestSuite):
     def iter_tests(self, tests):
         try:
             for test in tests:
-                self.iter_tests(test)
+                yield from self.iter_tests(test)
         except TypeError:
             yield tests
 
@@ -119,9 +157,16 @@ class UnittestTest(BaseTest):
     def __repr__(self):
         return repr(self.internal_test_obj)
 
+    def __str__(self):
+        return str(self.internal_test_obj)
+
     def __init__(self, internal_test_obj):
         self.internal_test_obj = internal_test_obj
 
+    def get_source(self):
+        test_method = getattr(type(self.internal_test_obj), self.internal_test_obj._testMethodName)
+        return inspect.getsource(test_method)
+
 
 class UnittestTestRunner(BaseTestRunner):
     test_suite_cls = UnittestTestSuite
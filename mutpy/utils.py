@@ -4,6 +4,7 @@ import ctypes
 import importlib
 import inspect
 import os
+import pickle
 import pkgutil
 import random
 import re
@@ -15,13 +16,16 @@ from collections import defaultdict
 
 from importlib._bootstrap_external import EXTENSION_SUFFIXES, ExtensionFileLoader
 
-from multiprocessing import Process, Queue
-from queue import Empty
+from multiprocessing import Pipe, Process
 from threading import Thread
 
 
 def create_module(ast_node, module_name="mutant", module_dict=None):
     code = compile(ast_node, module_name, "exec")
+    return create_module_from_code(code, module_name, module_dict)
+
+
+def create_module_from_code(code, module_name="mutant", module_dict=None):
     module = types.ModuleType(module_name)
     module.__dict__.update(module_dict or {})
     exec(code, module.__dict__)
@@ -196,22 +200,26 @@ class ModulesLoader:
 
 
 class InjectImporter:
-    def __init__(self, module):
-        try:
-            del sys.modules[module.__name__]
-        except KeyError:
-            pass
+    def __init__(self, module, *other_modules):
+        self.modules = {}
+        for injected_module in (module,) + other_modules:
+            try:
+                del sys.modules[injected_module.__name__]
+            except KeyError:
+                pass
+            self.modules[injected_module.__name__] = injected_module
         self.module = module
 
     def find_module(self, fullname, path=None):
-        if fullname == self.module.__name__:
+        if fullname in self.modules:
             return self
         else:
             return None
 
     def load_module(self, fullname):
-        self.module.__loader__ = self
-        sys.modules[fullname] = self.module
+        module = self.modules[fullname]
+        module.__loader__ = self
+        sys.modules[fullname] = module
 
     def install(self):
         if isinstance(sys.meta_path[0], self.__class__):
@@ -229,8 +237,8 @@ class ModuleInjector:
     def __init__(self, source):
         self.source = source
 
-    def inject_to(self, target):
-        for imported_as in target.__dict__.copy():
+    def inject_to(self, target, names=None):
+        for imported_as in target.__dict__.copy() if names is None else names:
             artifact = target.__dict__[imported_as]
             self.__perform_injection(imported_as, artifact, target)
 
@@ -345,16 +353,23 @@ class MutationTestRunner:
 class MutationTestRunnerProcess(MutationTestRunner, Process):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.queue = Queue()
+        self.reader, self.writer = Pipe(duplex=False)
 
     def get_result(self, live_time):
+        if not self.reader.poll(live_time):
+            return None
         try:
-            return self.queue.get(timeout=live_time)
-        except Empty:
+            return self.reader.recv()
+        except EOFError:
             return None
 
     def set_result(self, result):
-        self.queue.put_nowait(result.serialize())
+        try:
+            self.writer.send(result.serialize())
+        except (TypeError, pickle.PicklingError):
+            # unpicklable results are dropped and reported as timeout, as they always were,
+            # but without waiting for the end of mutant live time
+            self.writer.send(None)
 
 
 class MutationTestRunnerThread(MutationTestRunner, Thread):
@@ -408,25 +423,149 @@ def get_mutation_test_runner_class():
 
 
 class ParentNodeTransformer(ast.NodeTransformer):
+    """
+    Sets `parent` of every node and numbers nodes in pre-order.
+
+    Node gets its own number (`tree_index`) and the number of its last
+    descendant (`tree_end`), so all descendants of the node are numbered
+    between them (see `is_descendant`). Tree is walked without recursion,
+    so deeply nested code doesn't hit the recursion limit.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.parent = None
+        self.next_index = 0
+
     def visit(self, node):
-        if getattr(node, "parent", None):
-            node = copy.copy(node)
-            if hasattr(node, "lineno"):
-                del node.lineno
-        node.parent = getattr(self, "parent", None)
-        node.children = []
-        self.parent = node
-        result_node = super().visit(node)
-        self.parent = node.parent
-        if self.parent:
-            self.parent.children += [node] + node.children
-        return result_node
+        root = None
+        # (node, parent, field, position) to number or node to close
+        stack = [(node, self.parent, None, None)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, ast.AST):
+                item.tree_end = self.next_index - 1
+                continue
+            node, parent, field, position = item
+            if getattr(node, "parent", None):
+                # node is shared (e.g. `Load`), so it's replaced by a copy
+                node = copy.copy(node)
+                if hasattr(node, "lineno"):
+                    del node.lineno
+                if position is None:
+                    setattr(parent, field, node)
+                else:
+                    getattr(parent, field)[position] = node
+            root = root or node
+            node.parent = parent
+            node.tree_index = self.next_index
+            self.next_index += 1
+            stack.append(node)
+            children = []
+            for child_field, value in ast.iter_fields(node):
+                if isinstance(value, list):
+                    children += [
+                        (child, node, child_field, child_position)
+                        for child_position, child in enumerate(value) if isinstance(child, ast.AST)
+                    ]
+                elif isinstance(value, ast.AST):
+                    children.append((value, node, child_field, None))
+            stack.extend(reversed(children))
+        return root
 
 
 def create_ast(code):
     return ParentNodeTransformer().visit(ast.parse(code))
 
 
+def is_descendant(node, ancestor):
+    """
+    Check if `node` is in the subtree of `ancestor` (but isn't `ancestor` itself).
+
+    Both nodes have to be numbered by `create_ast` in the same tree, nodes
+    without numbers (e.g. created by mutation) have no descendants.
+    """
+    try:
+        return ancestor.tree_index < node.tree_index <= ancestor.tree_end
+    except AttributeError:
+        return False
+
+
+ATOMIC_TYPES = {type(None), bool, int, float, complex, str, bytes, type(Ellipsis)}
+
+
+def copy_ast(node, memo=None):
+    """
+    Deep copy the node like `copy.deepcopy`, but without recursion over the subtree.
+
+    Nodes from `memo` (by `id`), e.g. parent of the node, aren't copied.
+    """
+    memo = dict(memo or {})
+    copied_node = None
+    # (node, container, key) - container is a dict of node attributes or a list (key is position)
+    stack = [(node, None, None)]
+    while stack:
+        value, container, key = stack.pop()
+        value_copy = memo.get(id(value))
+        if value_copy is None:
+            value_copy = memo[id(value)] = value.__class__.__new__(value.__class__)
+            attrs = vars(value_copy)
+            for attr, attr_value in vars(value).items():
+                attr_type = type(attr_value)
+                if attr_type in ATOMIC_TYPES:
+                    attrs[attr] = attr_value
+                elif attr_type is list:
+                    values_copy = attrs[attr] = attr_value[:]
+                    for position, item in enumerate(attr_value):
+                        if isinstance(item, ast.AST):
+                            stack.append((item, values_copy, position))
+                        elif type(item) not in ATOMIC_TYPES:
+                            values_copy[position] = copy.deepcopy(item, memo)
+                elif isinstance(attr_value, ast.AST):
+                    # placeholder keeps order of attributes
+                    attrs[attr] = attr_value
+                    stack.append((attr_value, attrs, attr))
+                else:
+                    attrs[attr] = copy.deepcopy(attr_value, memo)
+        if container is None:
+            copied_node = value_copy
+        else:
+            container[key] = value_copy
+    return copied_node
+
+
+def fix_missing_locations(node):
+    """
+    Same as `ast.fix_missing_locations`, but without recursion over the subtree.
+    """
+    stack = [(node, 1, 0, 1, 0)]
+    while stack:
+        current_node, lineno, col_offset, end_lineno, end_col_offset = stack.pop()
+        if 'lineno' in current_node._attributes:
+            if not hasattr(current_node, 'lineno'):
+                current_node.lineno = lineno
+            else:
+                lineno = current_node.lineno
+        if 'end_lineno' in current_node._attributes:
+            if getattr(current_node, 'end_lineno', None) is None:
+                current_node.end_lineno = end_lineno
+            else:
+                end_lineno = current_node.end_lineno
+        if 'col_offset' in current_node._attributes:
+            if not hasattr(current_node, 'col_offset'):
+                current_node.col_offset = col_offset
+            else:
+                col_offset = current_node.col_offset
+        if 'end_col_offset' in current_node._attributes:
+            if getattr(current_node, 'end_col_offset', None) is None:
+                current_node.end_col_offset = end_col_offset
+            else:
+                end_col_offset = current_node.end_col_offset
+        for child in ast.iter_child_nodes(current_node):
+            stack.append((child, lineno, col_offset, end_lineno, end_col_offset))
+    return node
+
+
 class NoGrandparentError(Exception):
     pass
 
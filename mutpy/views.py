@@ -101,6 +101,14 @@ class TextView(QuietTextView):
                                                                 100 * score.incompetent_mutants / score.all_mutants), 2)
             self.level_print('timeout: {} ({:.1f}%)'.format(score.timeout_mutants,
                                                             100 * score.timeout_mutants / score.all_mutants), 2)
+            if score.equivalent_mutants:
+                self.level_print('equivalent: {} ({:.1f}%)'.format(
+                    score.equivalent_mutants, 100 * score.equivalent_mutants / score.all_mutants,
+                ), 2)
+            if score.duplicate_mutants:
+                self.level_print('duplicate: {} ({:.1f}%)'.format(
+                    score.duplicate_mutants, 100 * score.duplicate_mutants / score.all_mutants,
+                ), 2)
             if score.all_nodes:
                 self.level_print('Coverage: {} of {} AST nodes ({:.1f}%)'.format(
                     score.covered_nodes, score.all_nodes,
@@ -183,6 +191,13 @@ class TextView(QuietTextView):
     def incompetent(self, time, *args, **kwargs):
         self.level_print(self.time_format(time) + ' ' + self.decorate('incompetent', 'cyan'), continuation=True)
 
+    def equivalent(self, *args, **kwargs):
+        self.level_print(self.time_format() + ' ' + self.decorate('equivalent', 'magenta'), continuation=True)
+
+    def duplicate(self, duplicate_of, *args, **kwargs):
+        self.level_print(self.time_format() + ' ' + self.decorate('duplicate', 'magenta') + ' of #{}'.format(
+            duplicate_of), continuation=True)
+
 
 class DebugView:
 
@@ -234,6 +249,13 @@ class AccReportView:
     def timeout(self, time, *args, **kwargs):
         self.end_mutation('timeout', time=time)
 
+    def equivalent(self, *args, **kwargs):
+        self.end_mutation('equivalent')
+
+    def duplicate(self, duplicate_of, *args, **kwargs):
+        self.current_mutation['duplicate_of'] = duplicate_of
+        self.end_mutation('duplicate')
+
     def end_mutation(self, status, time=None, killer=None, tests_run=None, exception_traceback=None):
         self.current_mutation['status'] = status
         self.current_mutation['time'] = time
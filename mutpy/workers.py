@@ -0,0 +1,511 @@
+import gc
+import importlib.util
+import marshal
+import os
+import pickle
+import queue
+import signal
+import threading
+import time
+from collections import deque, namedtuple
+from multiprocessing import AuthenticationError, Pipe, Process
+from multiprocessing.connection import Client, Listener, wait
+
+from mutpy import hotpatch, schemata, utils
+from mutpy.test_runners.base import SerializableMutationTestResult
+
+
+def is_parallel_execution_supported():
+    return utils.get_mutation_test_runner_class() is utils.MutationTestRunnerProcess
+
+
+MutantTask = namedtuple(
+    'MutantTask',
+    [
+        'module_name', 'code', 'covering_tests', 'live_time', 'test_timeouts', 'likely_killers', 'schema_key',
+        'mutant_id', 'function_patches',
+    ],
+    defaults=[None, None, None, None, None, None],
+)
+
+RemoteWorkerHello = namedtuple('RemoteWorkerHello', ['magic_number', 'live_time'])
+
+
+class MutantJob:
+
+    def __init__(self, number, mutations, target_module, mutant_ast):
+        self.number = number
+        self.mutations = mutations
+        self.target_module = target_module
+        self.mutant_ast = mutant_ast
+        self.result = None
+        self.duration = 0
+        self.exception = None
+        self.cache_key = None
+        self.equivalent_to = None
+        self.done = False
+
+    def finish(self, result=None, duration=0, exception=None):
+        self.result = result
+        self.duration = duration
+        self.exception = exception
+        self.done = True
+
+
+class MutantLoadError(Exception):
+
+    def __init__(self, exception):
+        self.exception = exception
+
+
+class MutationWorker(Process):
+    """
+    Process which runs the test suite against mutants it receives.
+
+    Mutants are sent as marshalled code objects and results are sent back as
+    `SerializableMutationTestResult` (or `None` if there is no result to report).
+    Mutant which can't be imported is reported as incompetent. Code of a
+    mutant schema is loaded only once and then its mutants are activated
+    by id. Mutated functions are patched in the original module, which is
+    loaded once and restored after every mutant.
+
+    Worker runs a single mutant, unless it is `reusable` - then it waits for
+    the next one and state left by a mutant (e.g. in imported modules) can
+    leak to the following mutants.
+    """
+
+    timeout_margin = 0
+
+    def __init__(self, runner, live_time=None, reusable=False):
+        super().__init__()
+        self.runner = runner
+        self.live_time = live_time
+        self.reusable = reusable
+        self.connection, self.worker_connection = Pipe()
+        self.schema_loader = schemata.SchemaLoader()
+        self.patch_loader = hotpatch.PatchLoader()
+
+    def run(self):
+        self.prepare()
+        while True:
+            try:
+                task = self.worker_connection.recv()
+            except EOFError:
+                return
+            if task is None:
+                return
+            send_result(self.worker_connection, self.execute(task))
+            if not self.reusable:
+                return
+
+    def prepare(self):
+        pass
+
+    def execute(self, task):
+        try:
+            with self.runner.stdout_manager:
+                mutant_module = self.create_mutant_module(task)
+                suite = self.runner.create_test_suite(mutant_module, task.likely_killers)
+                if task.covering_tests is not None:
+                    self.runner.select_covering_tests(task.covering_tests, suite)
+                suite.set_test_timeouts(task.test_timeouts)
+                return suite.run().serialize()
+        except MutantLoadError as error:
+            return create_incompetent_result(error.exception)
+        except SystemExit:
+            return None
+        finally:
+            self.patch_loader.restore()
+
+    def create_mutant_module(self, task):
+        try:
+            if task.mutant_id is not None:
+                return self.schema_loader.activate(task)
+            if task.function_patches:
+                return self.patch_loader.activate(task)
+            return utils.create_module_from_code(marshal.loads(task.code), task.module_name)
+        except BaseException as exception:
+            raise MutantLoadError(exception)
+
+    def send(self, task):
+        self.connection.send(task)
+
+    def handles(self):
+        return [self.connection, self.sentinel]
+
+    def get_result(self):
+        if not self.connection.poll():
+            raise EOFError()
+        return self.connection.recv()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.join(1)
+        self.destroy()
+
+    def destroy(self):
+        self.kill()
+        self.join()
+        self.connection.close()
+
+
+class ZygoteMutationWorker(MutationWorker):
+    """
+    Worker which imports tests and builds the suite once, freezes the GC and
+    then forks a copy-on-write child for every mutant.
+
+    The zygote itself never runs a mutant, so it enforces the mutant timeout
+    by killing the child and is never replaced because of a broken mutant.
+    """
+
+    timeout_margin = 1
+
+    def __init__(self, runner, live_time=None, reusable=True):
+        # every mutant runs in its own child, so the zygote stays clean for the next one
+        super().__init__(runner, live_time, reusable=True)
+
+    def prepare(self):
+        self.test_modules = list(self.runner.test_loader.load())
+        self.suite = self.runner.load_test_suite(self.test_modules)
+        gc.freeze()
+
+    def execute(self, task):
+        if task.mutant_id is not None:
+            # schema is loaded before fork, so children only execute it with the switch set
+            with self.runner.stdout_manager:
+                self.schema_loader.load(task.module_name, task.code, task.schema_key)
+        if task.function_patches:
+            # original module is executed before fork, so children only patch it
+            try:
+                with self.runner.stdout_manager:
+                    self.patch_loader.load(task.module_name, task.code)
+            except BaseException:
+                # child fails to load it as well and reports the mutant as incompetent
+                pass
+        reader, writer = Pipe(duplex=False)
+        pid = os.fork()
+        if not pid:
+            try:
+                reader.close()
+                send_result(writer, self.execute_in_child(task))
+            finally:
+                os._exit(0)
+        writer.close()
+        try:
+            if reader.poll(task.live_time or self.live_time):
+                return reader.recv()
+            return None
+        except EOFError:
+            return None
+        finally:
+            reader.close()
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            os.waitpid(pid, 0)
+
+    def execute_in_child(self, task):
+        try:
+            with self.runner.stdout_manager:
+                mutant_module = self.create_mutant_module(task)
+                self.runner.inject_mutant(mutant_module, self.test_modules)
+                if task.likely_killers:
+                    self.suite.prioritize_tests(task.likely_killers)
+                if task.covering_tests is not None:
+                    self.runner.select_covering_tests(task.covering_tests, self.suite)
+                self.suite.set_test_timeouts(task.test_timeouts)
+                return self.suite.run().serialize()
+        except MutantLoadError as error:
+            return create_incompetent_result(error.exception)
+        except SystemExit:
+            return None
+
+
+def create_incompetent_result(exception):
+    return SerializableMutationTestResult(
+        is_incompetent=True,
+        is_survived=False,
+        killer=None,
+        exception_traceback=None,
+        exception=exception,
+        tests_run=0,
+    )
+
+
+def send_result(connection, result):
+    try:
+        connection.send(result)
+    except (TypeError, pickle.PicklingError):
+        # unpicklable results are dropped and reported as timeout, as they always were
+        connection.send(None)
+
+
+class LocalWorkerPool:
+
+    def __init__(self, runner, worker_cls=MutationWorker, reuse_workers=False):
+        self.runner = runner
+        self.worker_cls = worker_cls
+        self.reuse_workers = reuse_workers
+
+    def start_worker(self, live_time):
+        worker = self.worker_cls(self.runner, live_time, reusable=self.reuse_workers)
+        with self.runner.stdout_manager:
+            worker.start()
+        worker.worker_connection.close()
+        return worker
+
+    def close(self):
+        pass
+
+
+class RemoteMutationWorker:
+    """
+    Coordinator side of a `mutpy worker` process connected over a socket.
+
+    The remote worker enforces the mutant timeout itself, the coordinator only
+    gives up on it (and drops the connection) after an additional margin.
+    """
+
+    timeout_margin = 5
+    # mutants are isolated by the remote side
+    reusable = True
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def send(self, task):
+        self.connection.send(task)
+
+    def handles(self):
+        return [self.connection]
+
+    def get_result(self):
+        if not self.connection.poll():
+            raise EOFError()
+        return self.connection.recv()
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.destroy()
+
+    def destroy(self):
+        self.connection.close()
+
+
+class NoWorkerException(Exception):
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    def __str__(self):
+        return 'no worker connected in {} seconds'.format(self.timeout)
+
+
+class RemoteWorkerPool:
+    """
+    Accepts `mutpy worker` connections on `address` whenever a new worker is needed.
+
+    `NoWorkerException` is raised if no compatible worker connects in
+    `accept_timeout` seconds (e.g. when all workers are gone).
+    """
+
+    def __init__(self, address, authkey, accept_timeout=None):
+        self.listener = Listener(address, authkey=authkey)
+        self.authkey = authkey
+        self.accept_timeout = accept_timeout
+        self.closed = False
+        # listener has no accept timeout, so connections are accepted by a thread and waited for in a queue
+        self.connections = queue.Queue()
+        self.accept_thread = threading.Thread(target=self.accept_connections, daemon=True)
+        self.accept_thread.start()
+
+    @property
+    def address(self):
+        return self.listener.address
+
+    def accept_connections(self):
+        while not self.closed:
+            try:
+                connection = self.listener.accept()
+            except (AuthenticationError, EOFError, OSError):
+                continue
+            if self.closed:
+                connection.close()
+                return
+            self.connections.put(connection)
+
+    def start_worker(self, live_time):
+        deadline = time.time() + self.accept_timeout if self.accept_timeout is not None else None
+        while True:
+            timeout = max(deadline - time.time(), 0) if deadline is not None else None
+            try:
+                connection = self.connections.get(timeout=timeout)
+            except queue.Empty:
+                raise NoWorkerException(self.accept_timeout)
+            try:
+                connection.send(RemoteWorkerHello(importlib.util.MAGIC_NUMBER, live_time))
+                if connection.recv():
+                    return RemoteMutationWorker(connection)
+            except (EOFError, OSError):
+                pass
+            connection.close()
+
+    def close(self):
+        self.closed = True
+        try:
+            # accept thread is blocked until somebody connects
+            Client(self.address, authkey=self.authkey).close()
+        except (AuthenticationError, EOFError, OSError):
+            pass
+        self.accept_thread.join(1)
+        self.listener.close()
+        while not self.connections.empty():
+            self.connections.get().close()
+
+
+def run_remote_worker(address, authkey, runner, worker_cls=MutationWorker, reuse_workers=False):
+    """
+    Connect to coordinator and run mutants it sends until it says goodbye
+    (or the connection to it is lost).
+
+    Returns `False` when the coordinator runs an incompatible Python version.
+    """
+    connection = Client(address, authkey=authkey)
+    try:
+        hello = connection.recv()
+        compatible = hello.magic_number == importlib.util.MAGIC_NUMBER
+        connection.send(compatible)
+        if not compatible:
+            return False
+        executor = MutantExecutor(1, hello.live_time, LocalWorkerPool(runner, worker_cls, reuse_workers))
+        try:
+            while True:
+                task = connection.recv()
+                if task is None:
+                    break
+                job = MutantJob(None, None, None, None)
+                executor.submit(job, task)
+                executor.finish()
+                send_result(connection, job.result)
+        finally:
+            executor.shutdown()
+    except (EOFError, ConnectionError):
+        # coordinator is gone, e.g. it finished or was stopped
+        pass
+    finally:
+        connection.close()
+    return True
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return host, int(port)
+    return address
+
+
+class RunningMutantJob:
+
+    def __init__(self, job, worker, live_time):
+        self.job = job
+        self.worker = worker
+        self.timer = utils.Timer()
+        self.deadline = time.time() + live_time
+
+    def time_left(self):
+        return self.deadline - time.time()
+
+
+class MutantExecutor:
+    """
+    Runs mutants on up to `jobs` workers started by `worker_pool`.
+
+    Jobs are handed back in submission order, so that views and the mutation
+    score are updated exactly as in a sequential run. Reusable workers are
+    kept for next mutants, unless the mutant times out or the worker dies,
+    other workers are stopped after a single mutant.
+    """
+
+    def __init__(self, jobs, live_time, worker_pool):
+        self.jobs = jobs
+        self.live_time = live_time
+        self.worker_pool = worker_pool
+        self.submitted = deque()
+        self.running = []
+        self.idle_workers = []
+
+    def submit(self, job, task):
+        self.submitted.append(job)
+        if task is not None:
+            while len(self.running) >= self.jobs:
+                self.wait()
+            worker = self.send_to_worker(task)
+            live_time = task.live_time or self.live_time
+            self.running.append(RunningMutantJob(job, worker, live_time + worker.timeout_margin))
+        return self.pop_finished()
+
+    def send_to_worker(self, task):
+        while True:
+            worker = self.idle_workers.pop() if self.idle_workers else self.worker_pool.start_worker(self.live_time)
+            try:
+                worker.send(task)
+                return worker
+            except OSError:
+                worker.destroy()
+
+    def finish(self):
+        while self.running:
+            self.wait()
+        return self.pop_finished()
+
+    def shutdown(self):
+        for running_job in self.running:
+            running_job.worker.destroy()
+        for worker in self.idle_workers:
+            worker.stop()
+        self.running = []
+        self.idle_workers = []
+
+    def wait(self):
+        handles = {}
+        for running_job in self.running:
+            for handle in running_job.worker.handles():
+                handles[handle] = running_job
+        timeout = max(min(running_job.time_left() for running_job in self.running), 0)
+        ready = {handles[handle] for handle in wait(list(handles), timeout=timeout)}
+        for running_job in self.running[:]:
+            if running_job in ready:
+                self.collect(running_job)
+            elif running_job.time_left() <= 0:
+                self.collect(running_job, timed_out=True)
+            else:
+                continue
+            self.running.remove(running_job)
+
+    def collect(self, running_job, timed_out=False):
+        worker = running_job.worker
+        result = None
+        try:
+            if timed_out:
+                raise EOFError()
+            result = worker.get_result()
+            if worker.reusable:
+                self.idle_workers.append(worker)
+            else:
+                worker.stop()
+        except (EOFError, OSError):
+            worker.destroy()
+        running_job.job.finish(result=result, duration=running_job.timer.stop())
+
+    def pop_finished(self):
+        finished = []
+        while self.submitted and self.submitted[0].done:
+            finished.append(self.submitted.popleft())
+        return finished